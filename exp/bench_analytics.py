@@ -0,0 +1,69 @@
+"""
+Benchmark of the nightly indicators of a universe: a pandas groupby per symbol
+against nsetools.analytics over segment offsets, and the incremental update of
+one new day. Then the correlations of a NIFTY 500 sized universe with missing
+days: pandas' pairwise DataFrame.corr against the blocked correlation.
+
+    python exp/bench_analytics.py
+"""
+import time
+import numpy as np
+import pandas as pd
+from nsetools.analytics import Panel, Indicators, correlation
+
+DAYS = 2500
+SYMBOLS = 2000
+UNIVERSE = 500
+WINDOW = 250
+
+
+def groupby_indicators(df):
+    grouped = df.groupby('symbol')['close']
+    result = {}
+    result['sma_20'] = grouped.transform(lambda s: s.rolling(20).mean())
+    result['sma_50'] = grouped.transform(lambda s: s.rolling(50).mean())
+    result['ema_20'] = grouped.transform(lambda s: s.ewm(span=20, adjust=False, min_periods=20).mean())
+    change = grouped.diff()
+    gain = change.clip(lower=0).groupby(df['symbol']).transform(lambda s: s.ewm(alpha=1 / 14, adjust=False).mean())
+    loss = (-change).clip(lower=0).groupby(df['symbol']).transform(lambda s: s.ewm(alpha=1 / 14, adjust=False).mean())
+    result['rsi_14'] = 100 * gain / (gain + loss)
+    returns = np.log(df['close'] / grouped.shift())
+    result['volatility_20'] = returns.groupby(df['symbol']).transform(lambda s: s.rolling(20).std())
+    return result
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    dates = np.arange('2015-01-01', '2026-01-01', dtype='datetime64[D]')
+    dates = dates[np.is_busday(dates)][:DAYS + 1]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (DAYS + 1, SYMBOLS)), axis=0))
+    data = {'date': np.repeat(dates, SYMBOLS), 'symbol': np.tile(np.arange(SYMBOLS), DAYS + 1),
+            'close': close.ravel()}
+    data['high'] = data['close'] * 1.01
+    data['low'] = data['close'] * 0.99
+    history = {name: values[:-SYMBOLS] for name, values in data.items()}
+    day = {name: values[-SYMBOLS:] for name, values in data.items()}
+
+    started = time.perf_counter()
+    groupby_indicators(pd.DataFrame(history))
+    print("pandas groupby:  %6.2f s" % (time.perf_counter() - started))
+
+    indicators = Indicators(sma=(20, 50), ema=(20,), rsi=(14,), atr=(14,), volatility=(20,))
+    started = time.perf_counter()
+    panel = Panel(history)
+    indicators.compute(panel)
+    print("analytics:       %6.2f s for %d rows" % (time.perf_counter() - started, len(panel['close'])))
+
+    started = time.perf_counter()
+    indicators.update(day)
+    print("update of a day: %6.2f ms" % ((time.perf_counter() - started) * 1000))
+
+    returns = rng.normal(0, 0.02, (WINDOW, UNIVERSE))
+    returns[rng.random(returns.shape) < 0.02] = np.nan
+    started = time.perf_counter()
+    pd.DataFrame(returns).corr(min_periods=20)
+    print("pandas corr:     %6.1f ms" % ((time.perf_counter() - started) * 1000))
+    for dtype in ('float64', 'float32'):
+        started = time.perf_counter()
+        correlation(returns, dtype=dtype)
+        print("correlation %s: %6.1f ms" % (dtype, (time.perf_counter() - started) * 1000))
@@ -0,0 +1,33 @@
+"""
+Benchmark of date parsing: the NSE fast path of match_datetime against
+strptime over the former format list and dateutil, on expiry dates of a
+futures chain as they repeat across records.
+
+    python exp/bench_dates.py
+"""
+import random
+import timeit
+import datetime as dt
+from dateutil.parser import parse
+from nsetools.datemgr import match_datetime
+
+FORMATS = ["%d-%b-%Y", "%d-%m-%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]
+
+
+def strptime(value):
+    for date_format in FORMATS:
+        try:
+            return dt.datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+
+
+if __name__ == '__main__':
+    start = dt.date(2024, 1, 1)
+    days = [(start + dt.timedelta(days=i)) for i in range(0, 365, 7)]
+    values = [random.choice(days).strftime(random.choice(['%d-%b-%Y', '%Y-%m-%d', '%d-%m-%Y']))
+              for _ in range(20000)]
+    for name, parser in (('dateutil', lambda v: parse(v, dayfirst=True)), ('strptime', strptime),
+                         ('fast path', match_datetime)):
+        took = min(timeit.repeat(lambda: [parser(v) for v in values], number=1, repeat=3))
+        print("%-10s %8.1f ms for %d values" % (name, took * 1000, len(values)))
@@ -0,0 +1,43 @@
+"""
+Benchmark: json decode followed by cast_intfloat_string_values_to_intfloat vs
+nsetools.decoder.loads, with and without a learned casting plan, on a NIFTY 500
+sized equity-stockIndices payload.
+
+    python exp/bench_decode.py
+"""
+import os
+import json
+import timeit
+from nsetools import decoder
+from nsetools.utils import cast_intfloat_string_values_to_intfloat
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data', 'equity_stockIndices.json')
+ROWS = 500
+NUMBER = 50
+
+
+def nifty500_payload():
+    payload = json.load(open(DATA))
+    stocks = payload['data'][1:]
+    payload['data'] = payload['data'][:1] + [stocks[i % len(stocks)] for i in range(ROWS)]
+    return json.dumps(payload).encode('utf-8')
+
+
+if __name__ == '__main__':
+    content = nifty500_payload()
+    baseline = lambda: cast_intfloat_string_values_to_intfloat(json.loads(content))
+    reference = baseline()
+    print("payload: %d rows, %d KB" % (ROWS, len(content) // 1024))
+    timings = [('json + cast', baseline)]
+    for name in decoder.DECODERS:
+        fn = lambda name=name: decoder.loads(content, decoder=name)
+        assert fn() == reference, name
+        timings.append(('loads[%s]' % name, fn))
+        planned = lambda name=name: decoder.loads(content, decoder=name, endpoint='bench')
+        assert planned() == reference, name
+        timings.append(('loads[%s]+plan' % name, planned))
+    base = None
+    for label, fn in timings:
+        took = min(timeit.repeat(fn, number=NUMBER, repeat=3)) / NUMBER * 1000
+        base = base or took
+        print("%-20s %8.2f ms  x%.2f" % (label, took, base / took))
@@ -0,0 +1,93 @@
+"""
+Benchmark of a month of F&O bhavcopies: all the NIFTY calls of one expiry over
+30 days, found by range scans of the sorted FnoBhavcopyStore partitions, against
+loading the key columns of every row and masking them, and against parsing the
+daily CSVs.
+
+    python exp/bench_fno.py
+"""
+import os
+import csv
+import time
+import shutil
+import tempfile
+import datetime as dt
+import numpy as np
+from nsetools.store import FnoBhavcopyStore, FNO_COLUMNS
+
+DAYS = 30
+UNDERLYINGS = 200
+EXPIRIES = ['30-Jan-2025', '27-Feb-2025', '27-Mar-2025']
+STRIKES = 160
+SAMPLE = 3
+
+
+def day_rows(rng):
+    # options of every underlying, expiry, strike and option type, and their futures
+    rows = []
+    for i in range(UNDERLYINGS):
+        symbol, instrument = ('NIFTY', 'IDX') if i == 0 else ('SYM%d' % i, 'STK')
+        for expiry in EXPIRIES:
+            rows.append(['FUT' + instrument, symbol, expiry, 0, 'XX'])
+            for strike in range(STRIKES):
+                for option_type in ('CE', 'PE'):
+                    rows.append(['OPT' + instrument, symbol, expiry, 20000 + 50 * strike, option_type])
+    return rows
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp()
+    try:
+        store = FnoBhavcopyStore(os.path.join(directory, 'store'))
+        rows = day_rows(rng)
+        header = [column for _, column, _ in FNO_COLUMNS]
+        codes = {name: [store.dictionaries[name].encode(row[i]) for row in rows]
+                 for i, name in ((0, 'instrument'), (1, 'symbol'), (4, 'option_type'))}
+        expiry = np.array([dt.datetime.strptime(row[2], '%d-%b-%Y').date() for row in rows], dtype='datetime64[D]')
+        strike = np.array([row[3] for row in rows], dtype='float64')
+        dates = [dt.date(2025, 1, 1) + dt.timedelta(days=i) for i in range(DAYS)]
+        # the rows of a bhavcopy come in no particular order
+        order = rng.permutation(len(rows))
+        started = time.perf_counter()
+        for d in dates:
+            arrays = {name: rng.uniform(1, 500, len(rows)) for name, _, kind in FNO_COLUMNS if kind == 'float'}
+            arrays.update({name: rng.integers(0, 1000, len(rows)) for name, _, kind in FNO_COLUMNS if kind == 'int'})
+            arrays.update(codes)
+            arrays['expiry'], arrays['strike'] = expiry, strike
+            store.write_partition(d, {name: np.asarray(values)[order] for name, values in arrays.items()})
+        print("wrote %d partitions of %d rows in %.1f s" % (DAYS, len(rows), time.perf_counter() - started))
+
+        started = time.perf_counter()
+        calls = store.contracts('NIFTY', expiry='30-01-2025', instrument='OPTIDX', option_type='CE')
+        took = time.perf_counter() - started
+        print("range scans: %d rows in %.1f ms" % (len(calls['date']), took * 1000))
+
+        started = time.perf_counter()
+        data = store.load_range(columns=['symbol', 'expiry', 'instrument', 'option_type', 'close'])
+        mask = ((data['symbol'] == store.symbol_code('NIFTY')) & (data['expiry'] == np.datetime64('2025-01-30')) &
+                (data['option_type'] == store.dictionaries['option_type'].codes['CE']) &
+                (data['instrument'] == store.dictionaries['instrument'].codes['OPTIDX']))
+        took = time.perf_counter() - started
+        print("full scan:   %d rows in %.1f ms" % (mask.sum(), took * 1000))
+
+        csv_dir = os.path.join(directory, 'csv')
+        os.makedirs(csv_dir)
+        for d in dates[:SAMPLE]:
+            with open(os.path.join(csv_dir, d.isoformat() + '.csv'), 'w', newline='') as fh:
+                writer = csv.writer(fh)
+                writer.writerow(header)
+                for row in rows:
+                    writer.writerow(row + ['%.2f' % rng.uniform(1, 500)] * 5 + ['10', '1.5', '100', '5'])
+        started = time.perf_counter()
+        found = 0
+        for d in dates[:SAMPLE]:
+            with open(os.path.join(csv_dir, d.isoformat() + '.csv'), newline='') as fh:
+                for row in csv.DictReader(fh):
+                    if (row['SYMBOL'] == 'NIFTY' and row['EXPIRY_DT'] == '30-Jan-2025' and
+                            row['INSTRUMENT'] == 'OPTIDX' and row['OPTION_TYP'] == 'CE'):
+                        found += 1
+        took = (time.perf_counter() - started) * DAYS / SAMPLE
+        print("csv:         %d rows, extrapolated from %d days, %.1f s" % (found * DAYS // SAMPLE, SAMPLE, took))
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,57 @@
+"""
+Import time benchmark, with a regression threshold for short lived CLI tools.
+
+Runs `python -X importtime` in fresh interpreters for each entry point and reports
+the best cumulative import time of the nsetools modules over a few runs. Exits with
+status 1 if an entry point takes longer than its budget.
+
+    python exp/bench_import.py
+"""
+import os
+import re
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+RUNS = 5
+
+# statement -> budget in milliseconds. `import nsetools` used to take about 110 ms,
+# most of it in requests.
+BUDGETS = {
+    'import nsetools': 5,
+    'import nsetools.datemgr': 15,
+    'import nsetools.utils': 30,
+    'from nsetools import Nse': 60,
+}
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def import_time(statement):
+    """Returns the cumulative import time of the top level modules of `statement` in
+    microseconds, and the slowest module it imported."""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            env=env, capture_output=True, text=True, check=True)
+    total, slowest, subtree = 0, (0, None), []
+    # modules are listed after the ones they import, so a top level line closes a subtree
+    for match in _LINE.finditer(result.stderr):
+        own, cumulative, indent, module = match.groups()
+        subtree.append((int(own), module))
+        if not indent:
+            if module != 'site' and not module.startswith('encodings'):
+                total += int(cumulative)
+                slowest = max([slowest] + subtree)
+            subtree = []
+    return total, slowest[1]
+
+
+if __name__ == '__main__':
+    failed = False
+    for statement, budget in BUDGETS.items():
+        took, slowest = min(import_time(statement) for _ in range(RUNS))
+        over = took / 1000 > budget
+        failed = failed or over
+        print("%-28s %7.1f ms  budget %3d ms  slowest %-22s %s"
+              % (statement, took / 1000, budget, slowest, 'OVER' if over else 'ok'))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,56 @@
+"""
+Allocation benchmark: copying vs in-place casting of a large payload.
+
+Scales the recorded quote-derivative payload up to CONTRACTS contracts and reports
+the peak memory allocated while casting it, generically and with a learned plan,
+copying and in place.
+
+    python exp/bench_inplace.py
+"""
+import os
+import json
+import timeit
+import tracemalloc
+from nsetools.utils import cast_intfloat_string_values_to_intfloat, CastPlan
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data', 'quote_derivative.json')
+CONTRACTS = 5000
+NUMBER = 5
+
+
+def derivatives_payload():
+    payload = json.load(open(DATA))
+    stocks = payload['stocks']
+    payload['stocks'] = [stocks[i % len(stocks)] for i in range(CONTRACTS)]
+    return json.dumps(payload)
+
+
+def peak(cast, content):
+    data = json.loads(content)
+    tracemalloc.start()
+    cast(data)
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top
+
+
+if __name__ == '__main__':
+    content = derivatives_payload()
+    reference = cast_intfloat_string_values_to_intfloat(json.loads(content))
+    plan = CastPlan()
+    plan.learn(json.loads(content))
+    casts = [
+        ('generic copy', lambda data: cast_intfloat_string_values_to_intfloat(data)),
+        ('generic inplace', lambda data: cast_intfloat_string_values_to_intfloat(data, inplace=True)),
+        ('plan copy', lambda data: plan.apply(data)),
+        ('plan inplace', lambda data: plan.apply(data, inplace=True)),
+    ]
+    print("payload: %d contracts, %d KB" % (CONTRACTS, len(content) // 1024))
+    base = None
+    for label, cast in casts:
+        assert cast(json.loads(content)) == reference, label
+        top = peak(cast, content)
+        base = base or top
+        took = min(timeit.repeat(lambda: cast(json.loads(content)), number=NUMBER, repeat=3))
+        print("%-16s peak %8.0f KB  saved %3.0f%%  %7.2f ms (incl. decode)"
+              % (label, top / 1024, 100 * (1 - top / base), took / NUMBER * 1000))
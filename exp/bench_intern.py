@@ -0,0 +1,55 @@
+"""
+Memory benchmark: snapshots of a trading day held with and without an InternPool.
+
+Simulates a poller fetching the NIFTY 50 constituents every POLL seconds from
+9:15 to 15:30 and keeping every snapshot, as get_stock_quote_in_index would
+decode them. Reports the memory held by the snapshots and the decode time.
+
+    python exp/bench_intern.py
+"""
+import os
+import json
+import random
+import time
+import tracemalloc
+from nsetools import decoder, urls
+from nsetools.interning import InternPool
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data', 'equity_stockIndices.json')
+POLL = 60
+SNAPSHOTS = (6 * 3600 + 15 * 60) // POLL
+
+
+def trading_day():
+    payload = json.load(open(DATA))
+    contents = []
+    for _ in range(SNAPSHOTS):
+        for record in payload['data']:
+            record['lastPrice'] = round(record['lastPrice'] * random.uniform(0.999, 1.001), 2)
+            record['totalTradedVolume'] += random.randint(0, 1000)
+        contents.append(json.dumps(payload).encode('utf-8'))
+    return contents
+
+
+def measure(contents, name, pool):
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = [decoder.loads(content, decoder=name, endpoint=urls.STOCKS_IN_INDEX_URL, pool=pool)
+            for content in contents]
+    took = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, took, held
+
+
+if __name__ == '__main__':
+    contents = trading_day()
+    rows = sum(len(json.loads(content)['data']) for content in contents)
+    print("snapshots: %d, records: %d" % (SNAPSHOTS, rows))
+    for name in decoder.DECODERS:
+        base, base_took, _ = measure(contents, name, None)
+        pool = InternPool()
+        size, took, _ = measure(contents, name, pool)
+        print("%-7s plain   %7.1f MB  %6.0f ms" % (name, base / 2 ** 20, base_took * 1000))
+        print("%-7s pooled  %7.1f MB  %6.0f ms  saved %.0f%%, %d pooled strings"
+              % (name, size / 2 ** 20, took * 1000, 100 * (1 - size / base), len(pool)))
@@ -0,0 +1,60 @@
+"""
+Memory benchmark: dict quotes vs slotted typed records.
+
+Simulates a poller holding SYMBOLS x SNAPSHOTS future quotes and reports the
+bytes allocated per record by each representation.
+
+    python exp/bench_records.py
+"""
+import copy
+import random
+import tracemalloc
+from nsetools.fields import flatten_future_quote
+from nsetools.records import FutureQuote
+from nsetools.utils import cast_intfloat_string_values_to_intfloat
+
+SYMBOLS = 2000
+SNAPSHOTS = 5
+
+RAW = {
+    'metadata': {'instrumentType': 'Stock Futures', 'expiryDate': '27-Mar-2025',
+                 'lastPrice': 1246.0, 'openPrice': 1245.25, 'highPrice': 1260.85,
+                 'lowPrice': 1236.2, 'closePrice': 0, 'prevClose': 1240.0, 'change': 6.0,
+                 'pChange': 0.48, 'numberOfContractsTraded': 100, 'totalTurnover': 12345.6},
+    'underlyingValue': 1241.55,
+    'marketDeptOrderBook': {
+        'tradeInfo': {'tradedVolume': 5000, 'openInterest': 257812, 'changeinOpenInterest': 7144,
+                      'pchangeinOpenInterest': 2.857, 'marketLot': 500},
+        'otherInfo': {'dailyvolatility': 1.2, 'annualisedVolatility': 22.9},
+    },
+}
+
+
+def payloads():
+    raws = []
+    for _ in range(SYMBOLS * SNAPSHOTS):
+        raw = copy.deepcopy(RAW)
+        raw['metadata']['lastPrice'] = round(random.uniform(100, 5000), 2)
+        raw['underlyingValue'] = round(random.uniform(100, 5000), 2)
+        raws.append(raw)
+    return raws
+
+
+def measure(build, raws):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    held = [build(raw) for raw in raws]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return size / len(held)
+
+
+if __name__ == '__main__':
+    raws = payloads()
+    as_dict = measure(lambda raw: cast_intfloat_string_values_to_intfloat(flatten_future_quote(raw)), raws)
+    as_record = measure(FutureQuote.from_raw, raws)
+    print("records held       : %d" % len(raws))
+    print("dict bytes/record  : %.0f" % as_dict)
+    print("typed bytes/record : %.0f" % as_record)
+    print("saving             : %.0f%%" % (100 * (1 - as_record / as_dict)))
@@ -0,0 +1,78 @@
+"""
+Benchmark of a decade of end of day data: scanning the columnar BhavcopyStore
+against parsing the daily CSVs again.
+
+Writes DAYS synthetic bhavcopies of SYMBOLS rows each, as CSVs and as store
+partitions, then times loading the symbol and close columns of all of them.
+The CSV scan is timed on a sample of days and extrapolated.
+
+    python exp/bench_store.py
+"""
+import os
+import csv
+import time
+import shutil
+import tempfile
+import datetime as dt
+import numpy as np
+from nsetools.datemgr import default_calendar
+from nsetools.store import BhavcopyStore, BHAVCOPY_COLUMNS
+
+DAYS = 2500
+SYMBOLS = 2000
+SAMPLE = 50
+
+HEADER = [column for _, column, _ in BHAVCOPY_COLUMNS] + ['TIMESTAMP']
+
+
+if __name__ == '__main__':
+    calendar = default_calendar()
+    dates = calendar.trading_days(dt.date(2015, 1, 1), dt.date(2025, 12, 31))[:DAYS]
+    directory = tempfile.mkdtemp()
+    try:
+        store = BhavcopyStore(os.path.join(directory, 'store'))
+        codes = np.array([store.dictionaries['symbol'].encode('SYM%d' % i) for i in range(SYMBOLS)])
+        for i in range(SYMBOLS):
+            store.dictionaries['isin'].encode('INE%09d' % i)
+        store.dictionaries['series'].encode('EQ')
+        rng = np.random.default_rng(0)
+        started = time.perf_counter()
+        for d in dates:
+            close = rng.uniform(10, 5000, SYMBOLS)
+            arrays = {name: close for name, _, kind in BHAVCOPY_COLUMNS if kind == 'float'}
+            arrays.update({name: np.zeros(SYMBOLS) for name, _, kind in BHAVCOPY_COLUMNS if kind != 'float'})
+            arrays['symbol'] = arrays['isin'] = codes
+            store.write_partition(d, arrays)
+        print("wrote %d partitions of %d rows in %.1f s" % (len(dates), SYMBOLS, time.perf_counter() - started))
+
+        csv_dir = os.path.join(directory, 'csv')
+        os.makedirs(csv_dir)
+        for d in dates[:SAMPLE]:
+            with open(os.path.join(csv_dir, d.isoformat() + '.csv'), 'w', newline='') as fh:
+                writer = csv.writer(fh)
+                writer.writerow(HEADER)
+                for i in range(SYMBOLS):
+                    writer.writerow(['SYM%d' % i, 'EQ'] + ['%.2f' % rng.uniform(10, 5000)] * 6 +
+                                    ['100', '1000.5', '50', 'INE000000000', d.isoformat()])
+
+        started = time.perf_counter()
+        data = store.load_range(columns=['symbol', 'close'])
+        took = time.perf_counter() - started
+        print("store: %d rows of symbol, close in %.2f s" % (len(data['close']), took))
+
+        started = time.perf_counter()
+        store.history('SYM7', columns=['close'])
+        print("store: index of %d rows loaded in %.2f s" % (len(data['close']), time.perf_counter() - started))
+        for days in (20, 250, DAYS):
+            started = time.perf_counter()
+            history = store.history('SYM42', dates[-days], dates[-1])
+            print("store: history of %4d days in %6.1f ms" % (len(history['close']), (time.perf_counter() - started) * 1000))
+
+        started = time.perf_counter()
+        for name in sorted(os.listdir(csv_dir)):
+            with open(os.path.join(csv_dir, name), newline='') as fh:
+                rows = [(row['SYMBOL'], float(row['CLOSE'])) for row in csv.DictReader(fh)]
+        took = (time.perf_counter() - started) * len(dates) / SAMPLE
+        print("csv:   %d rows, extrapolated from %d days, %.2f s" % (len(dates) * SYMBOLS, SAMPLE, took))
+    finally:
+        shutil.rmtree(directory)
@@ -1,25 +1,16 @@
 #!/usr/bin/env python
-import requests
-import json
-import ast
-import re
 import os
 import pandas as pd
 import datetime as dt
-import pickle
 from argparse import ArgumentParser
-from pprint import pprint
+from nsetools import Nse
+from nsetools.scanners import quote_columns, open_high_low, QUOTE_FIELDS
 
 INVESTMENT_AMOUNT = 10000
-URL = "https://nseindia.com/live_market/dynaContent/live_watch/stock_watch/foSecStockWatch.json"
-# URL = "https://nseindia.com/live_market/dynaContent/live_watch/stock_watch/bankNiftyStockWatch.json"
-# URL = "https://nseindia.com/live_market/dynaContent/live_watch/stock_watch/niftyStockWatch.json"
+# index of the stocks scanned for each category
+INDICES = {'fo': 'SECURITIES IN F&O', 'banks': 'NIFTY BANK', 'nifty': 'NIFTY 50'}
 filter = ["open", "high", "low", "last", "graph"]
 
-drop_columns = ['cAct', 'mPC', 'mVal', 'ntP', 'per',
-                'ptsC', 'trdVol', 'trdVolM', 'wkhicm_adj',
-                'wklocm_adj', 'xDt', 'yPC', 'wkhi', 'wklo']
-
 # create data dir if not available
 file_path = os.path.realpath(__file__)
 dirname = os.path.dirname(file_path)
@@ -49,97 +40,11 @@ parser.add_argument("-bt", "--backtest", action="store", help="provide snap name
 
 cli = parser.parse_args()
 
-if cli.cat == "fo":
-    URL = "https://nseindia.com/live_market/dynaContent/live_watch/stock_watch/foSecStockWatch.json"
-elif cli.cat == "banks":
-    URL = "https://nseindia.com/live_market/dynaContent/live_watch/stock_watch/bankNiftyStockWatch.json"
-elif cli.cat == "nifty":
-    URL = "https://nseindia.com/live_market/dynaContent/live_watch/stock_watch/niftyStockWatch.json"
-else:
+if cli.cat not in INDICES:
     print("provide proper category")
     exit(1)
-
-def download_data(url, fake=False):
-    """download the raw data from web api"""
-    if fake:
-        return pickle.load(open("sample_data.pcl", "rb"))
-    else:
-        res = requests.get(url)
-        string_response = res.content.decode("utf-8")
-        dict_response = ast.literal_eval(string_response)
-        return dict_response["data"]
-
-def prepare_data(data):
-    """return a dataframe after
-        1. cleaning server response
-        2. creating and reindexing dataframe.
-    """
-    for idx, value in enumerate(data):
-        data[idx] = clean_server_response(value)
-
-    # this method of loading dataframe helps in case where we have list
-    # of dictionaries and we want all the dict keys to column headers.
-    stocks = pd.DataFrame.from_records(data).set_index('symbol')
-
-    # drop few columns.
-    stocks.drop(drop_columns, axis=1, inplace=True)
-
-    # re-order columns.
-    stocks = stocks.reindex(['open', 'high', 'low', 'ltP'], axis=1)
-    stocks.columns = ["open", "high", "low", "last"]
-
-    return stocks
-
-def clean_server_response(d):
-    """cleans the server reponse by replacing:
-        '-'     -> None
-        '1,000' -> 1000
-    :param resp_dict:
-    """
-    for key, value in d.items():
-        if type(value) is str or isinstance(value, str):
-            if re.match('-', value):
-                value = None
-            elif re.search(r'^[0-9,.]+$', value):
-                # replace , to '', and type cast to int
-                value = float(re.sub(',', '', value))
-            else:
-                value= str(value)
-        d[key] = value
-    return d
-
-def get_long_stocks(stocks):
-    # read this for chained indexing problems
-    # https://www.dataquest.io/blog/settingwithcopywarning/
-    longs = stocks.query("open==low").copy()
-    longs["pir"] = ((longs["last"] - longs["low"]) * 100) / (longs["high"] - longs["low"])
-    longs = longs.round(2)
-    longs = longs.sort_values("pir", ascending=False)
-    longs = attach_graph(longs)
-    return longs
-
-def attach_graph(df):
-    for idx, row in df.iterrows():
-        rnd = round(row.pir/10)
-        graph = ""
-        for i in range(10):
-            if i == (rnd -1):
-                graph = graph + "^"
-            else:
-                graph = graph + "."
-        df.at[idx, "graph"] = graph
-    return df
-
-def get_short_stocks(stocks):
-    # read this for chained indexing problems
-    # https://www.dataquest.io/blog/settingwithcopywarning/
-    shorts = stocks.query("open==high").copy()
-    shorts["pir"] = ((shorts["high"] - shorts["last"]) * 100) / (shorts["high"] - shorts["low"])
-    shorts = shorts.round(2)
-    shorts = shorts.sort_values("pir", ascending=False)
-    shorts = attach_graph(shorts)
-    return shorts
-
+INDEX = INDICES[cli.cat]
+nse = Nse()
 
 def get_quote(symbol, stocks):
     for stock in stocks:
@@ -147,10 +52,12 @@ def get_quote(symbol, stocks):
             return stock
 
 def summary():
-    data = download_data(URL, fake=False)
-    stocks = prepare_data(data)
-    longs = get_long_stocks(stocks)
-    shorts = get_short_stocks(stocks)
+    quotes = nse.get_stock_quote_in_index(INDEX, fields=list(QUOTE_FIELDS.values()))
+    columns = quote_columns(quotes)
+    stocks = pd.DataFrame(columns).set_index('symbol')
+    scan = open_high_low(columns, output='pandas')
+    longs = scan['longs'].set_index('symbol')
+    shorts = scan['shorts'].set_index('symbol')
     print("Longs: %s, Shorts: %s" % (len(longs), len(shorts)))
     print("========== LONGS ==========")
     print(longs[filter])
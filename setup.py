@@ -43,8 +43,10 @@ setup(
     description="Python library for extracting realtime data from National Stock Exchange",
     license="MIT",
     keywords="nse quote market",
-    install_requires=['six', 'dateutils', 'requests'],
+    install_requires=['dateutils', 'requests'],
+    extras_require={'columnar': ['numpy', 'pandas', 'pyarrow']},
     url="http://vsjha18.github.com/nsetools",
     packages=find_packages(),
+    package_data={'nsetools': ['data/*.csv']},
     long_description=readme,
 )
@@ -22,4 +22,18 @@
     SOFTWARE.
 """
 __VERSION__='2.0.1'
-from .nse import Nse
+
+__all__ = ['Nse']
+
+
+def __getattr__(name):
+    # Nse pulls in the HTTP stack, it is imported on first use so that tools needing
+    # only datemgr, utils and the like start fast
+    if name == 'Nse':
+        from nsetools.nse import Nse
+        return Nse
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
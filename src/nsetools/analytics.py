@@ -0,0 +1,713 @@
+"""
+Bars and indicators of a whole universe, computed from the bhavcopy store at once.
+
+The history of a universe is held as a Panel: flat columns sorted by symbol then
+date, the rows of the i-th symbol being offsets[i]:offsets[i + 1]. Indicators run
+over all the segments together with NumPy instead of a groupby per symbol: the
+windowed ones difference cumulative sums at the window bounds, and the recursive
+ones (EMA, and the Wilder averages of RSI and ATR) take one vectorized step per
+row position, over all the symbols having that many rows.
+
+Indicators keeps the state reached at the end of each symbol, so that appending a
+new day costs O(symbols) instead of computing the whole history again.
+
+Correlations and betas of a universe are computed by blocks of symbols from matrix
+products, over the days each pair of symbols has returns, see risk_matrices.
+
+Example:
+    >>> panel = Panel.from_store(store, '01-01-2015', '31-12-2024')
+    >>> weekly = resample(panel, 'W')
+    >>> indicators = Indicators(sma=(20, 50), rsi=(14,))
+    >>> values = indicators.compute(panel)
+    >>> values['rsi_14'][panel.offsets[1:] - 1]     # the latest RSI of every symbol
+    >>> today = indicators.update(Panel.from_store(store, '25-01-2025', '25-01-2025').data)
+"""
+from nsetools.datemgr import mkdate
+from nsetools.store import EQUITY_SERIES
+
+PANEL_COLUMNS = ('open', 'high', 'low', 'close', 'traded_quantity', 'turnover', 'trades')
+
+# how resample aggregates the columns of the rows of a bar, the other columns keep the
+# value of the last row
+AGGREGATIONS = {
+    'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'last': 'last',
+    'prev_close': 'first', 'traded_quantity': 'sum', 'turnover': 'sum', 'trades': 'sum',
+}
+
+# trading days in a year, to annualize volatility
+TRADING_DAYS = 252
+
+
+class Panel():
+    """Columns of many symbols, sorted by symbol then date, with the offsets of the
+    segment of each symbol.
+    Args:
+        data (dict): Column name to array, with `key` and 'date' columns, in any order.
+        key (str, optional): Column identifying the segments. Defaults to 'symbol'.
+    Attributes:
+        keys (numpy.ndarray): Sorted key of each segment.
+        offsets (numpy.ndarray): Start of each segment, followed by the number of rows.
+    """
+    def __init__(self, data, key='symbol'):
+        import numpy as np
+        order = np.lexsort((data['date'], data[key]))
+        self.key = key
+        self.data = {name: np.asarray(values)[order] for name, values in data.items()}
+        self.keys, starts = np.unique(self.data[key], return_index=True)
+        self.offsets = np.append(starts, len(order)).astype('int64')
+
+    @classmethod
+    def from_sorted(cls, data, keys, offsets, key='symbol'):
+        """Returns a Panel of columns already sorted by segment, without copying them."""
+        panel = cls.__new__(cls)
+        panel.key = key
+        panel.data = data
+        panel.keys = keys
+        panel.offsets = offsets
+        return panel
+
+    @classmethod
+    def from_store(cls, store, start=None, end=None, columns=PANEL_COLUMNS, series=EQUITY_SERIES):
+        """Loads a date range of a BhavcopyStore, keyed by symbol code.
+        Args:
+            store (BhavcopyStore): Store to load from.
+            start, end: Dates in fuzzy format. Default to the whole store.
+            columns (Iterable[str], optional): Columns to load along with the symbol.
+                Defaults to PANEL_COLUMNS.
+            series (Iterable[str], optional): Series to keep, the first one being preferred
+                when a symbol has rows in several on a day. None keeps all the rows.
+                Defaults to EQUITY_SERIES.
+        Returns:
+            Panel: The rows of the range.
+        """
+        import numpy as np
+        names = ['symbol'] + [name for name in columns if name != 'symbol']
+        if series is not None and 'series' not in names:
+            names.append('series')
+        data = store.load_range(start, end, columns=names)
+        if series is None:
+            return cls(data)
+        codes = store.dictionaries['series'].codes
+        # rank of each series code, -1 for the series not kept and for MISSING
+        ranks = np.full(len(store.dictionaries['series']) + 1, -1, dtype='int64')
+        for i, name in enumerate(series):
+            if name in codes:
+                ranks[codes[name]] = i
+        rank = ranks[data['series']]
+        order = np.lexsort((rank, data['date'], data['symbol']))
+        order = order[rank[order] >= 0]
+        sorted_symbol, sorted_date = data['symbol'][order], data['date'][order]
+        # the first row of each (symbol, date) is the one in the preferred series
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (sorted_symbol[1:] != sorted_symbol[:-1]) | (sorted_date[1:] != sorted_date[:-1])
+        order = order[first]
+        data = {name: np.asarray(values)[order] for name, values in data.items()}
+        keys, starts = np.unique(data['symbol'], return_index=True)
+        return cls.from_sorted(data, keys, np.append(starts, len(order)).astype('int64'))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    def lengths(self):
+        """Returns the number of rows of each segment."""
+        import numpy as np
+        return np.diff(self.offsets)
+
+    def positions(self):
+        """Returns the position of each row within its segment."""
+        return _positions(self.offsets)
+
+    def segment(self, key):
+        """Returns the columns of the segment of a key, as views."""
+        import numpy as np
+        i = np.searchsorted(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            raise KeyError(key)
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return {name: values[lo:hi] for name, values in self.data.items()}
+
+
+def _positions(offsets):
+    import numpy as np
+    lengths = np.diff(offsets)
+    return np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+
+
+def _previous(values, offsets):
+    # value of the previous row of the same segment, NaN on the first rows
+    import numpy as np
+    previous = np.empty(len(values), dtype='float64')
+    previous[1:] = values[:-1]
+    previous[offsets[:-1][np.diff(offsets) > 0]] = np.nan
+    return previous
+
+
+def _last_valid(values, offsets):
+    # each value, or the last value before it in its segment which isn't NaN
+    import numpy as np
+    index = np.arange(len(values))
+    valid = ~np.isnan(values)
+    filled = np.maximum.accumulate(np.where(valid, index, -1))
+    starts = np.repeat(offsets[:-1], np.diff(offsets))
+    result = np.full(len(values), np.nan)
+    found = filled >= starts
+    result[found] = values[filled[found]]
+    return result
+
+
+def _step(average, values, alpha):
+    # one step of an exponential average, started at the first value and carried over NaNs
+    import numpy as np
+    with np.errstate(invalid='ignore'):
+        stepped = alpha * values + (1 - alpha) * average
+    return np.where(np.isnan(average), values, np.where(np.isnan(values), average, stepped))
+
+
+def rolling_sum(values, offsets, window):
+    """Returns the sum of the last `window` values of each row within its segment, NaN
+    until a segment has `window` rows and for the windows holding a NaN.
+    Args:
+        values (numpy.ndarray): Values of a Panel column.
+        offsets (numpy.ndarray): Offsets of the segments, see Panel.
+        window (int): Number of rows.
+    Returns:
+        numpy.ndarray: float64 sums.
+    """
+    import numpy as np
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    values = np.asarray(values, dtype='float64')
+    missing = np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    counts = np.concatenate(([0], np.cumsum(missing)))
+    # the rows before window - 1 are the first rows of their segment as well
+    result = np.full(len(values), np.nan)
+    result[window - 1:] = sums[window:] - sums[:len(sums) - window]
+    result[window - 1:][counts[window:] - counts[:len(counts) - window] > 0] = np.nan
+    result[_positions(offsets) < window - 1] = np.nan
+    return result
+
+
+def sma(values, offsets, window):
+    """Returns the simple moving average of `window` rows, see rolling_sum."""
+    return rolling_sum(values, offsets, window) / window
+
+
+def _recursive(values, offsets, alpha, first=0):
+    # y = x at position `first` of each segment, then y = alpha * x + (1 - alpha) * y[-1],
+    # one step per position over the segments which are long enough, NaN before `first`.
+    # a NaN x, like a halted day, carries y over, and y starts at the first x not NaN
+    import numpy as np
+    values = np.asarray(values, dtype='float64')
+    result = np.full(len(values), np.nan)
+    lengths = np.diff(offsets)
+    order = np.argsort(-lengths, kind='stable')
+    starts = offsets[:-1][order]
+    # number of segments having more than p rows, which are the first ones of `order`
+    active = np.searchsorted(-lengths[order], -np.arange(lengths.max(initial=0)), side='left')
+    for p in range(first, len(active)):
+        rows = starts[:active[p]] + p
+        if p == first:
+            result[rows] = values[rows]
+        else:
+            result[rows] = _step(result[rows - 1], values[rows], alpha)
+    return result
+
+
+def _mask(result, offsets, minimum):
+    import numpy as np
+    result[_positions(offsets) < minimum] = np.nan
+    return result
+
+
+def ema(values, offsets, span):
+    """Returns the exponential moving average of weight 2 / (span + 1), started at the
+    first value of each segment and NaN until a segment has `span` rows. This is pandas'
+    ewm(span=span, adjust=False, min_periods=span), the average being carried over the
+    NaN values like with ignore_na=True.
+    """
+    return _mask(_recursive(values, offsets, 2.0 / (span + 1)), offsets, span - 1)
+
+
+def _gains_losses(close, offsets):
+    import numpy as np
+    close = np.asarray(close, dtype='float64')
+    # changes from the last close which isn't NaN
+    change = close - _previous(_last_valid(close, offsets), offsets)
+    return np.maximum(change, 0.0), np.maximum(-change, 0.0)
+
+
+def _rsi(gains, losses):
+    import numpy as np
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100.0 * gains / (gains + losses)
+
+
+def rsi(close, offsets, window=14):
+    """Returns the relative strength index, with Wilder's smoothing of the gains and
+    losses from the second row of each segment, NaN until a segment has `window`
+    changes. A NaN close carries the averages over, the next change being taken from
+    the last close.
+    """
+    gains, losses = _gains_losses(close, offsets)
+    alpha = 1.0 / window
+    result = _rsi(_recursive(gains, offsets, alpha, first=1), _recursive(losses, offsets, alpha, first=1))
+    return _mask(result, offsets, window)
+
+
+def true_range(high, low, close, offsets):
+    """Returns the true range of each row, the high - low range on the first row of a
+    segment."""
+    import numpy as np
+    high = np.asarray(high, dtype='float64')
+    low = np.asarray(low, dtype='float64')
+    previous = _previous(_last_valid(np.asarray(close, dtype='float64'), offsets), offsets)
+    result = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    return result
+
+
+def atr(high, low, close, offsets, window=14):
+    """Returns the average true range, with Wilder's smoothing, NaN until a segment has
+    `window` rows."""
+    tr = true_range(high, low, close, offsets)
+    return _mask(_recursive(tr, offsets, 1.0 / window), offsets, window - 1)
+
+
+def log_returns(close, offsets):
+    """Returns the log returns of each row, NaN on the first row of a segment and for
+    a NaN close, the next return being taken from the last close."""
+    import numpy as np
+    close = np.asarray(close, dtype='float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.log(close / _previous(_last_valid(close, offsets), offsets))
+
+
+def volatility(close, offsets, window=20, annualize=TRADING_DAYS):
+    """Returns the rolling standard deviation of the log returns of `window` rows,
+    multiplied by sqrt(annualize), NaN until a segment has `window` returns.
+    Args:
+        close (numpy.ndarray): Closing prices of a Panel.
+        offsets (numpy.ndarray): Offsets of the segments, see Panel.
+        window (int, optional): Number of returns. Defaults to 20.
+        annualize (int, optional): Periods in a year, or 1 for the daily volatility.
+            Defaults to TRADING_DAYS.
+    Returns:
+        numpy.ndarray: float64 volatilities.
+    """
+    import numpy as np
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    returns = log_returns(close, offsets)
+    sums = rolling_sum(returns, offsets, window)
+    squares = rolling_sum(returns * returns, offsets, window)
+    variance = np.maximum((squares - sums * sums / window) / (window - 1), 0.0)
+    return _mask(np.sqrt(variance * annualize), offsets, window)
+
+
+def resample(panel, freq='W', aggregations=AGGREGATIONS):
+    """Returns the weekly or monthly bars of a Panel.
+    Args:
+        panel (Panel): Daily rows.
+        freq (str, optional): 'W' for weeks starting on Monday, 'M' for calendar months.
+            Defaults to 'W'.
+        aggregations (dict, optional): Column name to 'first', 'last', 'max', 'min' or 'sum'.
+            The other columns, like 'date', take the value of the last row of the bar.
+            Defaults to AGGREGATIONS.
+    Returns:
+        Panel: One row per symbol and period, dated on its last trading day.
+    Example:
+        >>> monthly = resample(Panel.from_store(store), 'M')
+        >>> monthly.segment(store.symbol_code('INFY'))['close']
+    """
+    import numpy as np
+    dates = panel.data['date'].astype('datetime64[D]')
+    if freq == 'W':
+        # 1970-01-01 is a Thursday
+        periods = (dates.astype('int64') + 3) // 7
+    elif freq == 'M':
+        periods = dates.astype('datetime64[M]').astype('int64')
+    else:
+        raise ValueError("freq must be 'W' or 'M'")
+    offsets = panel.offsets
+    boundary = np.ones(len(periods), dtype=bool)
+    boundary[1:] = periods[1:] != periods[:-1]
+    boundary[offsets[:-1]] = True
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(periods)) - 1
+    data = {}
+    for name, values in panel.data.items():
+        how = aggregations.get(name, 'last')
+        if len(starts) == 0:
+            data[name] = values[:0]
+        elif how == 'first':
+            data[name] = values[starts]
+        elif how == 'last':
+            data[name] = values[ends]
+        elif how == 'max':
+            data[name] = np.maximum.reduceat(values, starts)
+        elif how == 'min':
+            data[name] = np.minimum.reduceat(values, starts)
+        elif how == 'sum':
+            data[name] = np.add.reduceat(values, starts)
+        else:
+            raise ValueError("unknown aggregation %r of %r" % (how, name))
+    bar_offsets = np.searchsorted(starts, offsets).astype('int64')
+    return Panel.from_sorted(data, panel.keys, bar_offsets, panel.key)
+
+
+class Indicators():
+    """Indicators of a universe, computed on a Panel and then updated one day at a time.
+
+    compute() returns the indicators of every row of a Panel and keeps, for every key,
+    what the next day needs: the last closes and returns within the longest window, the
+    previous close and the exponential averages. update() then computes the indicators
+    of a new day from that state in O(symbols).
+    Args:
+        sma, ema, rsi, atr, volatility (Iterable[int], optional): Windows of each indicator,
+            whose values are named like 'sma_20'.
+        annualize (int, optional): See volatility. Defaults to TRADING_DAYS.
+    Example:
+        >>> indicators = Indicators()
+        >>> indicators.compute(Panel.from_store(store, end='24-01-2025'))
+        >>> indicators.update(Panel.from_store(store, '25-01-2025', '25-01-2025').data)['sma_20']
+    """
+    def __init__(self, sma=(20, 50), ema=(20,), rsi=(14,), atr=(14,), volatility=(20,),
+                 annualize=TRADING_DAYS):
+        self.windows = {'sma': tuple(sma), 'ema': tuple(ema), 'rsi': tuple(rsi),
+                        'atr': tuple(atr), 'volatility': tuple(volatility)}
+        for kind, windows in self.windows.items():
+            if any(window < (2 if kind == 'volatility' else 1) for window in windows):
+                raise ValueError("invalid %s window in %s" % (kind, windows))
+        self.annualize = annualize
+        self._size = 0
+
+    def names(self):
+        """Returns the names of the indicators, like 'sma_20'."""
+        return ['%s_%d' % (kind, window) for kind, windows in self.windows.items() for window in windows]
+
+    def _reset(self, size):
+        import numpy as np
+        self._size = size
+        self.count = np.zeros(size, dtype='int64')
+        self.previous = np.full(size, np.nan)
+        # ring buffers, the value of the n-th row of a key being at n % width
+        self.closes = np.full((size, max(self.windows['sma'], default=1)), np.nan)
+        self.returns = np.full((size, max(self.windows['volatility'], default=2)), np.nan)
+        self.averages = {}
+        for window in self.windows['ema']:
+            self.averages['ema', window] = np.full(size, np.nan)
+        for window in self.windows['rsi']:
+            self.averages['gain', window] = np.full(size, np.nan)
+            self.averages['loss', window] = np.full(size, np.nan)
+        for window in self.windows['atr']:
+            self.averages['atr', window] = np.full(size, np.nan)
+
+    def _grow(self, size):
+        import numpy as np
+        if size <= self._size:
+            return
+        grown = max(size, 2 * self._size)
+        pad = grown - self._size
+        self.count = np.append(self.count, np.zeros(pad, dtype='int64'))
+        self.previous = np.append(self.previous, np.full(pad, np.nan))
+        self.closes = np.vstack([self.closes, np.full((pad, self.closes.shape[1]), np.nan)])
+        self.returns = np.vstack([self.returns, np.full((pad, self.returns.shape[1]), np.nan)])
+        for name, values in self.averages.items():
+            self.averages[name] = np.append(values, np.full(pad, np.nan))
+        self._size = grown
+
+    def compute(self, panel):
+        """Returns the indicators of all the rows of a Panel keyed by int codes, like the
+        symbol codes of Panel.from_store, and keeps the state reached at its end.
+        Args:
+            panel (Panel): Daily rows with 'close', and 'high' and 'low' for ATR.
+        Returns:
+            dict: Indicator name to float64 array, aligned with the rows of the panel.
+        """
+        import numpy as np
+        offsets = panel.offsets
+        close = np.asarray(panel['close'], dtype='float64')
+        keys = panel.keys.astype('int64')
+        self._reset(int(keys.max()) + 1 if len(keys) else 0)
+        lengths = np.diff(offsets)
+        last = offsets[1:] - 1
+        result = {}
+        for window in self.windows['sma']:
+            result['sma_%d' % window] = sma(close, offsets, window)
+        for window in self.windows['ema']:
+            average = _recursive(close, offsets, 2.0 / (window + 1))
+            self.averages['ema', window][keys] = average[last]
+            result['ema_%d' % window] = _mask(average, offsets, window - 1)
+        if self.windows['rsi']:
+            gains, losses = _gains_losses(close, offsets)
+        for window in self.windows['rsi']:
+            gain = _recursive(gains, offsets, 1.0 / window, first=1)
+            loss = _recursive(losses, offsets, 1.0 / window, first=1)
+            self.averages['gain', window][keys] = gain[last]
+            self.averages['loss', window][keys] = loss[last]
+            result['rsi_%d' % window] = _mask(_rsi(gain, loss), offsets, window)
+        if self.windows['atr']:
+            tr = true_range(panel['high'], panel['low'], close, offsets)
+        for window in self.windows['atr']:
+            average = _recursive(tr, offsets, 1.0 / window)
+            self.averages['atr', window][keys] = average[last]
+            result['atr_%d' % window] = _mask(average, offsets, window - 1)
+        for window in self.windows['volatility']:
+            result['volatility_%d' % window] = volatility(close, offsets, window, self.annualize)
+
+        self.count[keys] = lengths
+        self.previous[keys] = _last_valid(close, offsets)[last]
+        returns = log_returns(close, offsets)
+        # the i-th most recent close and return of every key, into their ring slots
+        for buffer, values, skip in ((self.closes, close, 0), (self.returns, returns, 1)):
+            width = buffer.shape[1]
+            for i in range(width):
+                n = lengths - 1 - i
+                valid = n >= skip
+                buffer[keys[valid], (n[valid] - skip) % width] = values[offsets[:-1][valid] + n[valid]]
+        return result
+
+    def update(self, day):
+        """Appends one day and returns its indicators.
+        Args:
+            day (dict): Columns of the rows of the day: 'symbol' codes, 'close', and
+                'high' and 'low' for ATR, each key appearing once, like the data of a
+                Panel of that day.
+        Returns:
+            dict: Indicator name to float64 array, aligned with the rows of `day`.
+        """
+        import numpy as np
+        keys = np.asarray(day['symbol'], dtype='int64')
+        close = np.asarray(day['close'], dtype='float64')
+        self._grow(int(keys.max()) + 1 if len(keys) else 0)
+        count = self.count[keys]
+        previous = self.previous[keys]
+        result = {}
+
+        width = self.closes.shape[1]
+        self.closes[keys, count % width] = close
+        for window in self.windows['sma']:
+            slots = (count[:, None] - np.arange(window)) % width
+            values = self.closes[keys[:, None], slots].sum(axis=1) / window
+            result['sma_%d' % window] = np.where(count + 1 >= window, values, np.nan)
+
+        for window in self.windows['ema']:
+            averages = self.averages['ema', window]
+            average = _step(averages[keys], close, 2.0 / (window + 1))
+            averages[keys] = average
+            result['ema_%d' % window] = np.where(count + 1 >= window, average, np.nan)
+
+        change = close - previous
+        gains, losses = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+        for window in self.windows['rsi']:
+            gain, loss = self.averages['gain', window], self.averages['loss', window]
+            new_gain = _step(gain[keys], gains, 1.0 / window)
+            new_loss = _step(loss[keys], losses, 1.0 / window)
+            gain[keys], loss[keys] = new_gain, new_loss
+            result['rsi_%d' % window] = np.where(count >= window, _rsi(new_gain, new_loss), np.nan)
+
+        if self.windows['atr']:
+            high = np.asarray(day['high'], dtype='float64')
+            low = np.asarray(day['low'], dtype='float64')
+            tr = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+        for window in self.windows['atr']:
+            averages = self.averages['atr', window]
+            average = _step(averages[keys], tr, 1.0 / window)
+            averages[keys] = average
+            result['atr_%d' % window] = np.where(count + 1 >= window, average, np.nan)
+
+        width = self.returns.shape[1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = np.log(close / previous)
+        seen = count >= 1
+        self.returns[keys[seen], (count[seen] - 1) % width] = returns[seen]
+        for window in self.windows['volatility']:
+            slots = (count[:, None] - 1 - np.arange(window)) % width
+            values = self.returns[keys[:, None], slots].std(axis=1, ddof=1) * np.sqrt(self.annualize)
+            result['volatility_%d' % window] = np.where(count >= window, values, np.nan)
+
+        self.count[keys] = count + 1
+        self.previous[keys] = np.where(np.isnan(close), previous, close)
+        return result
+
+
+# ETF tracking NIFTY 50, the bhavcopy of equities having no index rows
+BENCHMARK = 'NIFTYBEES'
+# columns of the universe per block of the correlation matrix
+BLOCK_SIZE = 128
+# cache of risk_matrices, by store, universe, window, end date and options
+RISK_CACHE_SIZE = 32
+_risk_cache = {}
+
+
+def return_matrix(store, symbols, start=None, end=None, adjust=False):
+    """Returns the daily returns of symbols as a dates x symbols matrix, NaN on the days
+    a symbol, or the day before, has no close.
+    Args:
+        store (BhavcopyStore): Store to load from.
+        symbols (Iterable[str]): Symbols, the columns of the matrix.
+        start, end: Dates in fuzzy format. Default to the whole store.
+        adjust (Union[bool, CorporateActions], optional): Adjusts the closes for splits
+            and bonuses, see BhavcopyStore.history. Defaults to False.
+    Returns:
+        tuple: The datetime64[D] dates of the returns, and the float64 returns.
+    """
+    import numpy as np
+    symbols = list(symbols)
+    panel = Panel.from_store(store, start, end, columns=['close'])
+    dates = np.unique(panel['date'])
+    closes = np.full((len(dates), len(symbols)), np.nan)
+    # column of each symbol code, -1 for the symbols outside of the universe
+    columns = np.full(max(len(store.dictionaries['symbol']), 1), -1, dtype='int64')
+    for j, symbol in enumerate(symbols):
+        code = store.symbol_code(symbol)
+        if code is not None:
+            columns[code] = j
+    column = columns[panel['symbol']]
+    kept = column >= 0
+    closes[np.searchsorted(dates, panel['date'][kept]), column[kept]] = panel['close'][kept]
+    if adjust is not False and len(dates):
+        actions = store.actions if adjust is True else adjust
+        for j, symbol in enumerate(symbols):
+            closes[:, j] *= actions.adjustments(symbol, dates, dates[-1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = closes[1:] / closes[:-1] - 1
+    return dates[1:], returns
+
+
+def _moments(x, y):
+    # pairwise complete sums of two blocks of columns, NaN being missing, as matrix
+    # products: counts, sums of x and y, of their squares and of their products
+    import numpy as np
+    mx, my = ~np.isnan(x), ~np.isnan(y)
+    x0, y0 = np.where(mx, x, 0), np.where(my, y, 0)
+    mx, my = mx.astype(x.dtype), my.astype(y.dtype)
+    n = mx.T @ my
+    sx, sy = x0.T @ my, mx.T @ y0
+    sxx, syy = (x0 * x0).T @ my, mx.T @ (y0 * y0)
+    sxy = x0.T @ y0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+    return n, cov, var_x, var_y
+
+
+def _demean(returns, dtype):
+    import numpy as np
+    # centering first keeps the sums of products small, which float32 needs
+    returns = np.asarray(returns, dtype=dtype)
+    counts = np.maximum((~np.isnan(returns)).sum(axis=0), 1)
+    return returns - (np.nansum(returns, axis=0) / counts).astype(dtype)
+
+
+def correlation(returns, block=BLOCK_SIZE, dtype='float64', min_periods=20):
+    """Returns the correlation matrix of the columns of a returns matrix, each pair over
+    the days both have a return.
+
+    The matrix is computed by blocks of `block` columns, each one from a few matrix
+    products of the two blocks of returns, and only the blocks on and above the
+    diagonal are computed.
+    Args:
+        returns (numpy.ndarray): dates x symbols returns, NaN when missing.
+        block (int, optional): Columns per block. Defaults to BLOCK_SIZE.
+        dtype (str, optional): 'float64', or 'float32' for half the memory and twice the
+            speed, at about 6 significant digits. Defaults to 'float64'.
+        min_periods (int, optional): Days in common below which a correlation is NaN.
+            Defaults to 20.
+    Returns:
+        numpy.ndarray: symbols x symbols correlations of `dtype`.
+    """
+    import numpy as np
+    returns = _demean(returns, dtype)
+    size = returns.shape[1]
+    result = np.full((size, size), np.nan, dtype=dtype)
+    for i in range(0, size, block):
+        x = returns[:, i:i + block]
+        for j in range(i, size, block):
+            y = returns[:, j:j + block]
+            n, cov, var_x, var_y = _moments(x, y)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = cov / np.sqrt(var_x * var_y)
+            values[n < min_periods] = np.nan
+            np.clip(values, -1, 1, out=values)
+            result[i:i + block, j:j + block] = values
+            result[j:j + block, i:i + block] = values.T
+    return result
+
+
+def beta(returns, benchmark, dtype='float64', min_periods=20):
+    """Returns the beta of each column of a returns matrix to the benchmark returns,
+    over the days both have a return.
+    Args:
+        returns (numpy.ndarray): dates x symbols returns, NaN when missing.
+        benchmark (numpy.ndarray): Returns of the benchmark on the same dates.
+        dtype (str, optional): 'float64' or 'float32'. Defaults to 'float64'.
+        min_periods (int, optional): Days in common below which a beta is NaN.
+            Defaults to 20.
+    Returns:
+        numpy.ndarray: Beta of each symbol, of `dtype`.
+    """
+    import numpy as np
+    returns = _demean(returns, dtype)
+    benchmark = _demean(np.asarray(benchmark).reshape(-1, 1), dtype)
+    n, cov, _, var_benchmark = _moments(returns, benchmark)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = (cov / var_benchmark)[:, 0]
+    values[n[:, 0] < min_periods] = np.nan
+    return values
+
+
+def risk_matrices(store, universe, window=250, end=None, benchmark=BENCHMARK, block=BLOCK_SIZE,
+                  dtype='float64', min_periods=20, adjust=False):
+    """Returns the correlations of the returns of a universe and their betas to a
+    benchmark, over the `window` trading days up to `end`.
+
+    Results are cached by store, universe, window and end date, along with the other
+    options and the generation of the store, so that any ingest, a new day or a
+    re-ingested one, moves on to new results. The arrays of the results are shared
+    between the calls hitting the cache and are read-only, copy them to modify them.
+    Args:
+        store (BhavcopyStore): Store of the history.
+        universe (Iterable[str]): Symbols, like the ones of get_stocks_in_index('NIFTY 500').
+        window (int, optional): Number of daily returns. Defaults to 250.
+        end (optional): Date in fuzzy format. Defaults to the last date of the store.
+        benchmark (str, optional): Symbol of the store to compute betas to. Defaults to
+            BENCHMARK, an ETF tracking NIFTY 50.
+        block, dtype, min_periods: See correlation.
+        adjust (Union[bool, CorporateActions], optional): See return_matrix.
+    Returns:
+        dict: 'symbols' and 'dates' of the returns, 'correlation' matrix and 'beta' of
+            each symbol, NaN when the benchmark isn't in the store.
+    Example:
+        >>> universe = nse.get_stocks_in_index('NIFTY 500')
+        >>> risk = risk_matrices(store, universe, window=250)
+        >>> risk['correlation'].shape, risk['beta'][risk['symbols'].index('INFY')]
+        ((500, 500), 0.87)
+    """
+    import numpy as np
+    dates = [d for d in store.dates() if end is None or d <= mkdate(end)]
+    end = dates[-1] if dates else None
+    symbols = tuple(universe)
+    key = (store.directory, store.generation(), symbols, window, end, benchmark, block,
+           np.dtype(dtype).name, min_periods, adjust if isinstance(adjust, bool) else id(adjust))
+    result = _risk_cache.get(key)
+    if result is None:
+        start = dates[-window - 1] if len(dates) > window else None
+        returns_dates, returns = return_matrix(store, symbols + (benchmark,), start, end, adjust)
+        result = {
+            'symbols': list(symbols),
+            'dates': returns_dates,
+            'correlation': correlation(returns[:, :-1], block, dtype, min_periods),
+            'beta': beta(returns[:, :-1], returns[:, -1], dtype, min_periods),
+        }
+        for name in ('dates', 'correlation', 'beta'):
+            result[name].setflags(write=False)
+        if len(_risk_cache) >= RISK_CACHE_SIZE:
+            _risk_cache.pop(next(iter(_risk_cache)))
+        _risk_cache[key] = result
+    # a dict of its own for every caller, so that replacing a value doesn't reach the cache
+    return dict(result, symbols=list(result['symbols']))
@@ -23,10 +23,9 @@
 """
 
 from abc import ABCMeta, abstractmethod
-import six
 
 
-class AbstractBaseExchange(six.with_metaclass(ABCMeta, object)):
+class AbstractBaseExchange(metaclass=ABCMeta):
 
     @abstractmethod
     def get_stock_codes(self):
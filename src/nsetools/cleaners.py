@@ -1,7 +1,7 @@
 """
 Module for various data structure cleaning tasks
 """
-from datetime import datetime
+from nsetools.datemgr import match_datetime
 dirty_data = """
 {
     "fname": "Jon",
@@ -27,14 +27,10 @@ dirty_data = """
 def parse_values(obj):
     for key, value in obj.items():
         if isinstance(value, str):
-            # Try to parse as datetime if the string matches the format
-            date_formats = ["%d-%b-%Y", "%d-%m-%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]
-            for date_format in date_formats:
-                try:
-                    obj[key] = datetime.strptime(value, date_format)
-                    break
-                except ValueError:
-                    pass
+            # Try to parse as datetime if the string matches one of the NSE formats
+            parsed = match_datetime(value)
+            if parsed is not None:
+                obj[key] = parsed
             else:
                 # If the string couldn't be parsed as datetime, try numeric conversion
                 try:
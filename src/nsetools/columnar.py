@@ -0,0 +1,200 @@
+"""
+Columnar output for the list returning Nse APIs.
+
+Columns are built straight from the decoded JSON, without creating intermediate
+per row dicts. NumPy, pandas and pyarrow are optional and imported only when
+the corresponding output is asked for.
+"""
+from nsetools.fields import CATEGORICAL_FIELDS, PRICE_FIELDS
+from nsetools.fixedpoint import SCALES, CONVERTERS, ScaledDict, validate_numeric
+
+OUTPUTS = ('records', 'numpy', 'pandas', 'arrow')
+
+# placeholders used by NSE in place of a missing number
+MISSING_VALUES = frozenset(['', '-'])
+
+
+def validate_output(output, typed=False, fields=None, numeric='float', parse_dates=False):
+    """Raises ValueError if `output` is not a supported output format, or if typed
+    records, field projection, a fixed-point numeric mode or date parsing are asked
+    along with an incompatible option."""
+    if output not in OUTPUTS:
+        raise ValueError("output must be one of %s" % ", ".join(OUTPUTS))
+    if typed and output != 'records':
+        raise ValueError("typed records are available only with 'records' output")
+    if fields is not None and (typed or output != 'records'):
+        raise ValueError("fields are available only with untyped 'records' output")
+    validate_numeric(numeric)
+    if numeric != 'float' and (typed or fields is not None):
+        raise ValueError("fixed-point numbers aren't available with typed records or fields")
+    if parse_dates and (typed or output != 'records' or numeric != 'float'):
+        raise ValueError("parse_dates is available only with untyped 'records' output of float numbers")
+
+
+def column_names(records):
+    """Returns the union of scalar keys of the records in the order they are first seen.
+    Nested values (dicts and lists) can't be held in a typed column and are skipped.
+    """
+    names = {}
+    for record in records:
+        for key, value in record.items():
+            if key not in names and not isinstance(value, (dict, list)):
+                names[key] = True
+    return list(names)
+
+
+def _numeric_column(np, values, round_digits, floating=False):
+    """Converts values to an int64 or float64 array, float64 always with `floating`,
+    raises ValueError if any value is not numeric."""
+    converted = []
+    is_int = not floating
+    for value in values:
+        kind = type(value)
+        if kind is int:
+            converted.append(value)
+        elif kind is float:
+            converted.append(value)
+            is_int = False
+        elif kind is str:
+            try:
+                converted.append(int(value))
+            except ValueError:
+                is_int = False
+                if value in MISSING_VALUES:
+                    converted.append(float('nan'))
+                else:
+                    converted.append(float(value))
+        elif value is None:
+            converted.append(float('nan'))
+            is_int = False
+        else:
+            raise ValueError("not a numeric value: %r" % (value,))
+    if is_int:
+        try:
+            return np.array(converted, dtype=np.int64)
+        except OverflowError:
+            pass
+    column = np.array(converted, dtype=np.float64)
+    if round_digits is not None:
+        np.round(column, round_digits, out=column)
+    return column
+
+
+def _fixed_point_column(np, values, scale, numeric):
+    """Converts values to an int64 (or Decimal for numeric='decimal') array in units of
+    10**-scale. Missing values are masked. Returns None if any value is not numeric."""
+    convert = CONVERTERS[numeric]
+    converted = []
+    mask = []
+    for value in values:
+        number = convert(value, scale)
+        if number is not None:
+            converted.append(number)
+            mask.append(False)
+        elif value is None or value in MISSING_VALUES:
+            converted.append(0 if numeric == 'fixed' else None)
+            mask.append(True)
+        else:
+            return None
+    column = np.array(converted, dtype=np.int64 if numeric == 'fixed' else object)
+    if any(mask):
+        return np.ma.MaskedArray(column, mask=mask)
+    return column
+
+
+def _numpy_column(np, values, round_digits, floating=False):
+    if values and all(type(value) is bool for value in values):
+        return np.array(values, dtype=bool)
+    try:
+        return _numeric_column(np, values, round_digits, floating)
+    except ValueError:
+        return np.array(values, dtype=object)
+
+
+def build_columns(columns, output, round_digits=2, numeric='float'):
+    """Converts raw column values to the requested columnar output.
+    Args:
+        columns (dict): Mapping of column name to the list of its raw values.
+        output (str): One of 'numpy', 'pandas' or 'arrow'.
+        round_digits (int, optional): Number of decimal places float columns are rounded
+            to, same as cast_intfloat_string_values_to_intfloat. Defaults to 2.
+        numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold the columns
+            registered in nsetools.fixedpoint.SCALES as int64 in units of 10**-scale /
+            Decimal. Defaults to 'float'.
+    Returns:
+        Union[dict, pandas.DataFrame, pyarrow.Table]: dict of NumPy arrays for 'numpy',
+            DataFrame for 'pandas' and Table for 'arrow'. Prices are float64 and the
+            repeating string fields like symbol and series are categorical. With a
+            fixed-point numeric mode the scale of every fixed-point column is found in
+            `scales` of the ScaledDict for 'numpy', in attrs['scales'] of the DataFrame
+            and in the b'scale' metadata of the arrow field.
+    """
+    validate_output(output, numeric=numeric)
+    import numpy as np
+
+    arrays = {}
+    scales = {}
+    for name, values in columns.items():
+        scale = SCALES.get(name) if numeric != 'float' else None
+        if scale is not None:
+            column = _fixed_point_column(np, values, scale, numeric)
+            if column is not None:
+                arrays[name] = column
+                scales[name] = scale
+                continue
+        arrays[name] = _numpy_column(np, values, round_digits, name in PRICE_FIELDS)
+    if output == 'numpy':
+        return ScaledDict(arrays, scales=scales) if numeric != 'float' else arrays
+    elif output == 'pandas':
+        import pandas as pd
+        frame = {}
+        for name, array in arrays.items():
+            if name in CATEGORICAL_FIELDS and array.dtype == object:
+                frame[name] = pd.Categorical(array)
+            elif isinstance(array, np.ma.MaskedArray) and array.dtype == np.int64:
+                frame[name] = pd.arrays.IntegerArray(array.data, np.ma.getmaskarray(array))
+            elif isinstance(array, np.ma.MaskedArray):
+                frame[name] = array.filled(None)
+            else:
+                frame[name] = array
+        frame = pd.DataFrame(frame)
+        if numeric != 'float':
+            frame.attrs['scales'] = scales
+        return frame
+    elif output == 'arrow':
+        import pyarrow as pa
+        fields = []
+        table = []
+        for name, array in arrays.items():
+            mask = np.ma.getmask(array) if isinstance(array, np.ma.MaskedArray) else None
+            if name in scales and numeric == 'decimal':
+                array = pa.array(array.tolist(), type=pa.decimal128(38, scales[name]))
+            elif array.dtype == object:
+                array = pa.array(array.tolist())
+                if name in CATEGORICAL_FIELDS:
+                    array = array.dictionary_encode()
+            elif mask is not None:
+                array = pa.array(array.data, mask=mask)
+            else:
+                array = pa.array(array)
+            metadata = {'scale': str(scales[name])} if name in scales else None
+            fields.append(pa.field(name, array.type, metadata=metadata))
+            table.append(array)
+        return pa.Table.from_arrays(table, schema=pa.schema(fields))
+    raise ValueError("records output can't be built from columns")
+
+
+def records_to_columns(records, output, round_digits=2, numeric='float'):
+    """Converts a list of flat records, as decoded from NSE, to columnar output.
+    Args:
+        records (list[dict]): Records as decoded from the NSE response.
+        output (str): One of 'numpy', 'pandas' or 'arrow'.
+        round_digits (int, optional): Decimal places for float columns. Defaults to 2.
+        numeric (str, optional): 'float', 'fixed' or 'decimal', see build_columns.
+            Defaults to 'float'.
+    Example:
+        >>> records_to_columns([{'symbol': 'INFY', 'lastPrice': '1580.5'}], 'numpy')
+        {'symbol': array(['INFY'], dtype=object), 'lastPrice': array([1580.5])}
+    """
+    columns = {name: [record.get(name) for record in records] for name in column_names(records)}
+    return build_columns(columns, output, round_digits, numeric)
@@ -0,0 +1,191 @@
+"""
+Corporate actions and the price adjustments they imply.
+
+The gainers and losers records carry the last corporate action of a stock, as an
+ex-date (ca_ex_dt) and a free text purpose (ca_purpose). The purposes changing the
+number of shares are parsed into a price factor:
+
+    Face Value Split (Sub-Division) - From Rs 5/- Per Share To Re 1/- Per Share  -> 1/5
+    Bonus 1:1                                                                    -> 1/2
+
+Dividends, rights and the like don't change the number of shares, they are kept in
+the table but not adjusted for.
+
+For each symbol the ex-dates are kept sorted along with the product of the factors of
+the ex-dates from each one on. The adjustment of a price of date t as of a date T is
+then the product of the factors of the ex-dates in (t, T], the ratio of two such
+products found by binary search, so a series is adjusted with one multiply.
+
+Example:
+    >>> actions = CorporateActions()
+    >>> actions.add_records(nse.get_top_gainers())
+    >>> actions.actions('INFY')
+    [(datetime.date(2024, 8, 12), 'Bonus 1:1', 0.5)]
+    >>> store.history('INFY', '01-01-2024', '31-12-2024', adjust=actions)['close']
+"""
+import os
+import re
+import json
+import datetime as dt
+from nsetools.datemgr import mkdate
+
+# prices of the columns multiplied by the adjustment, quantities are divided by it
+PRICE_COLUMNS = frozenset(['open', 'high', 'low', 'close', 'last', 'prev_close'])
+QUANTITY_COLUMNS = frozenset(['traded_quantity'])
+
+_BONUS = re.compile(r'bonus\s*(\d+(?:\.\d+)?)\s*:\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+# the face values of a split, like "From Rs 10/- Per Share To Re 1/- Per Share" or
+# "Rs.10 To Rs.2"
+_SPLIT = re.compile(r'split\D*?(?:from\s*)?(?:rs|re|inr)?\.?\s*(\d+(?:\.\d+)?)'
+                    r'[^\d]*?\bto\s*(?:rs|re|inr)?\.?\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+
+
+def parse_purpose(purpose):
+    """Returns the price factor of a corporate action purpose, like 0.2 for a split
+    of a face value of 5 into 1, or None if the purpose doesn't change the number of
+    shares. A purpose with several actions, like a bonus and a split, returns the
+    product of their factors.
+    Args:
+        purpose (str): ca_purpose of a record.
+    Returns:
+        float: Factor of the prices before the ex-date, or None.
+    Example:
+        >>> parse_purpose('Bonus 1:1')
+        0.5
+        >>> parse_purpose('Dividend - Rs 10 Per Share') is None
+        True
+    """
+    if not purpose:
+        return None
+    factor = None
+    for match in _BONUS.finditer(purpose):
+        new, held = float(match.group(1)), float(match.group(2))
+        if new > 0 and held > 0:
+            factor = (factor or 1.0) * held / (new + held)
+    for match in _SPLIT.finditer(purpose):
+        old, new = float(match.group(1)), float(match.group(2))
+        if old > 0 and new > 0 and old != new:
+            factor = (factor or 1.0) * new / old
+    return factor
+
+
+class CorporateActions():
+    """Table of corporate actions, one entry per symbol, ex-date and purpose.
+    Args:
+        path (str, optional): JSON file the table is loaded from and saved to.
+            Defaults to None, for a table in memory.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        # symbol -> {ex-date ordinal: {purpose: factor or None}}
+        self._actions = {}
+        # symbol -> (sorted ex-date ordinals, product of the factors from each one on)
+        self._index = {}
+        self.dirty = False
+        if path is not None and os.path.exists(path):
+            with open(path) as fh:
+                for symbol, ex_date, purpose in json.load(fh):
+                    self.add(symbol, dt.date.fromisoformat(ex_date), purpose)
+            self.dirty = False
+
+    def __len__(self):
+        return sum(len(purposes) for dates in self._actions.values() for purposes in dates.values())
+
+    def add(self, symbol, ex_date, purpose):
+        """Adds an action, returning its factor. Adding the same purpose of a symbol
+        on the same ex-date again doesn't apply it twice.
+        Args:
+            symbol (str): Symbol.
+            ex_date: Ex-date in fuzzy format.
+            purpose (str): Purpose, like ca_purpose.
+        Returns:
+            float: Factor of the action, see parse_purpose.
+        """
+        ordinal = mkdate(ex_date).toordinal()
+        purposes = self._actions.setdefault(symbol, {}).setdefault(ordinal, {})
+        if purpose not in purposes:
+            purposes[purpose] = parse_purpose(purpose)
+            self._index.pop(symbol, None)
+            self.dirty = True
+        return purposes[purpose]
+
+    def add_records(self, records):
+        """Adds the actions of records with ca_ex_dt and ca_purpose, like the ones of
+        get_top_gainers and get_top_losers. Records without either are skipped.
+        Returns the number of records added."""
+        added = 0
+        for record in records:
+            ex_date, purpose = record.get('ca_ex_dt'), record.get('ca_purpose')
+            if ex_date and purpose and ex_date != '-':
+                self.add(record['symbol'], ex_date, purpose)
+                added += 1
+        return added
+
+    def actions(self, symbol):
+        """Returns the (ex-date, purpose, factor) actions of a symbol, by ex-date."""
+        return [(dt.date.fromordinal(ordinal), purpose, factor)
+                for ordinal, purposes in sorted(self._actions.get(symbol, {}).items())
+                for purpose, factor in purposes.items()]
+
+    def save(self):
+        if self.dirty and self.path is not None:
+            rows = [[symbol, d.isoformat(), purpose]
+                    for symbol in sorted(self._actions) for d, purpose, _ in self.actions(symbol)]
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as fh:
+                json.dump(rows, fh)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+    def _cumulative(self, symbol):
+        import numpy as np
+        index = self._index.get(symbol)
+        if index is None:
+            dates = self._actions.get(symbol, {})
+            ordinals, factors = [], []
+            for ordinal in sorted(dates):
+                factor = 1.0
+                for value in dates[ordinal].values():
+                    if value is not None:
+                        factor *= value
+                if factor != 1.0:
+                    ordinals.append(ordinal)
+                    factors.append(factor)
+            # after[i] is the product of the factors of the ex-dates from the i-th one on
+            after = np.append(np.cumprod(np.array(factors[::-1], dtype='float64'))[::-1], 1.0)
+            index = self._index[symbol] = (np.array(ordinals, dtype='int64'), after)
+        return index
+
+    def adjustments(self, symbol, dates, as_of=None):
+        """Returns the factors adjusting the prices of a symbol on `dates` to the share
+        count as of a date: the product of the factors of the ex-dates after each date,
+        up to `as_of` included.
+        Args:
+            symbol (str): Symbol.
+            dates (numpy.ndarray): Dates, as datetime64[D] or date ordinals.
+            as_of (optional): Date in fuzzy format, the prices of later dates being scaled
+                back to its share count. Defaults to after all known actions.
+        Returns:
+            numpy.ndarray: float64 factors, 1 where nothing happened in between.
+        """
+        import numpy as np
+        ordinals, after = self._cumulative(symbol)
+        dates = np.asarray(dates)
+        if dates.dtype.kind == 'M':
+            dates = dates.astype('datetime64[D]').astype('int64') + dt.date(1970, 1, 1).toordinal()
+        factors = after[np.searchsorted(ordinals, dates, side='right')]
+        if as_of is not None:
+            factors = factors / after[np.searchsorted(ordinals, mkdate(as_of).toordinal(), side='right')]
+        return factors
+
+    def adjust(self, symbol, history, as_of=None):
+        """Adjusts, in place, the prices and quantities of a history with a 'date'
+        column, like the ones of BhavcopyStore.history. Quantities become float64.
+        Returns the history."""
+        factors = self.adjustments(symbol, history['date'], as_of)
+        for name, values in history.items():
+            if name in PRICE_COLUMNS:
+                history[name] = values * factors
+            elif name in QUANTITY_COLUMNS:
+                history[name] = values / factors
+        return history
@@ -1,68 +1,350 @@
+import os
+import re
+import warnings
 import datetime as dt
-from dateutil.relativedelta import relativedelta
-from dateutil.parser import parse
-from dateutil import rrule
-from nsetools.errors import DateFormatError
+from array import array
+from functools import lru_cache
+from nsetools.errors import DateFormatError, HolidaysNotCoveredWarning
+
+HOLIDAYS_FILE = os.path.join(os.path.dirname(__file__), 'data', 'holidays.csv')
+
+# (month, day) of the holidays falling on the same date every year, used for the years
+# not covered by the holidays file
+FIXED_HOLIDAYS = (
+    (1, 26),   # republic day
+    (5, 1),    # labour day
+    (8, 15),   # independence day
+    (10, 2),   # gandhi jayanti
+    (12, 25),  # christmas
+)
+
+
+def _to_date(d):
+    if type(d) == dt.datetime:
+        return d.date()
+    elif type(d) != dt.date:
+        raise DateFormatError("only date objects or datetime objects")
+    return d
+
+
+class TradingCalendar():
+    """NSE trading calendar with constant time lookups.
+
+    Trading days, weekdays which are not holidays, are precomputed for a window of
+    whole years as a flag per day, the running count of trading days and the ordinals
+    of the trading days. Every lookup is then an index into these arrays. The window
+    grows on its own when a date outside of it is asked for.
+
+    The first lookup of a year which `covered_years` doesn't hold warns with
+    HolidaysNotCoveredWarning, as only the FIXED_HOLIDAYS of that year are known.
+
+    Args:
+        holidays (Iterable[date]): Known holidays.
+        covered_years (Iterable[int], optional): Years for which `holidays` is the complete
+            list. Other years fall back to FIXED_HOLIDAYS. Defaults to the years of `holidays`.
+
+    Example:
+        >>> calendar = TradingCalendar.from_csv()
+        >>> calendar.next_trading_day(dt.date(2025, 3, 13))
+        datetime.date(2025, 3, 17)
+        >>> calendar.trading_days_between(dt.date(2025, 3, 1), dt.date(2025, 3, 31))
+        19
+    """
+
+    def __init__(self, holidays, covered_years=None):
+        holidays = [_to_date(d) for d in holidays]
+        self.holidays = frozenset(d.toordinal() for d in holidays)
+        if covered_years is None:
+            covered_years = [d.year for d in holidays]
+        self.covered_years = frozenset(covered_years)
+        self._warned_years = set()
+        today = dt.date.today().year
+        years = list(self.covered_years) + [today]
+        self._build(min(years) - 1, max(years) + 1)
+
+    @classmethod
+    def from_csv(cls, path=HOLIDAYS_FILE):
+        """Loads the holidays from a CSV file with a `date` column in ISO format. Lines
+        starting with # are ignored. Defaults to the holiday lists shipped with nsetools."""
+        import csv
+        with open(path, newline='') as f:
+            rows = csv.DictReader(line for line in f if not line.startswith('#'))
+            return cls(dt.date.fromisoformat(row['date'].strip()) for row in rows)
+
+    def _is_holiday(self, ordinal, year):
+        if year in self.covered_years:
+            return ordinal in self.holidays
+        d = dt.date.fromordinal(ordinal)
+        return (d.month, d.day) in FIXED_HOLIDAYS
+
+    def _build(self, first_year, last_year):
+        start = dt.date(first_year, 1, 1).toordinal()
+        end = dt.date(last_year, 12, 31).toordinal()
+        weekday = dt.date.fromordinal(start).weekday()
+        flags = bytearray(end - start + 1)
+        # 1 for the days of the years whose holidays are known
+        covered = bytearray(end - start + 1)
+        # cumulative[i]: number of trading days from start up to and including start + i
+        cumulative = array('l')
+        days = array('l')
+        count = 0
+        year = first_year
+        next_year = dt.date(year + 1, 1, 1).toordinal()
+        for i, ordinal in enumerate(range(start, end + 1)):
+            if ordinal == next_year:
+                year += 1
+                next_year = dt.date(year + 1, 1, 1).toordinal()
+            if year in self.covered_years:
+                covered[i] = 1
+            if (weekday + i) % 7 < 5 and not self._is_holiday(ordinal, year):
+                flags[i] = 1
+                count += 1
+                days.append(ordinal)
+            cumulative.append(count)
+        self.first_year, self.last_year = first_year, last_year
+        self._start, self._end = start, end
+        self._flags, self._cumulative, self._days = flags, cumulative, days
+        self._covered = covered
+        self._busdaycalendar = None
+
+    def _warn_not_covered(self, first_year, last_year):
+        years = [year for year in range(first_year, last_year + 1)
+                 if year not in self.covered_years and year not in self._warned_years]
+        if years:
+            self._warned_years.update(years)
+            warnings.warn("no holiday list for %s, only the fixed date holidays are known"
+                          % ", ".join(map(str, years)), HolidaysNotCoveredWarning, stacklevel=3)
+
+    def _index(self, d):
+        """Returns the index of date `d` in the window, growing the window if needed."""
+        ordinal = _to_date(d).toordinal()
+        if ordinal < self._start or ordinal > self._end:
+            year = dt.date.fromordinal(ordinal).year
+            self._build(min(year, self.first_year), max(year, self.last_year))
+        i = ordinal - self._start
+        if not self._covered[i]:
+            year = dt.date.fromordinal(ordinal).year
+            self._warn_not_covered(year, year)
+        return i
+
+    def is_trading_day(self, d):
+        """Returns True if the market is open on the given date or datetime."""
+        i = self._index(d)
+        return self._flags[i] == 1
+
+    def is_holiday(self, d):
+        """Returns True if the given weekday is a known holiday, False for weekends and
+        trading days."""
+        d = _to_date(d)
+        return d.weekday() < 5 and not self.is_trading_day(d)
+
+    def next_trading_day(self, d):
+        """Returns the first trading day strictly after the given date."""
+        d = _to_date(d)
+        i = self._index(d)
+        count = self._cumulative[i]
+        if count >= len(self._days):
+            self._build(self.first_year, self.last_year + 1)
+        return dt.date.fromordinal(self._days[count])
+
+    def previous_trading_day(self, d):
+        """Returns the last trading day strictly before the given date."""
+        d = _to_date(d)
+        i = self._index(d)
+        count = self._cumulative[i] - self._flags[i]
+        if count == 0:
+            self._build(self.first_year - 1, self.last_year)
+            return self.previous_trading_day(d)
+        return dt.date.fromordinal(self._days[count - 1])
+
+    def nearest_trading_day(self, d):
+        """Returns the given date if it is a trading day, else the previous trading day."""
+        d = _to_date(d)
+        return d if self.is_trading_day(d) else self.previous_trading_day(d)
+
+    def shift(self, d, n):
+        """Returns the trading day `n` trading days after (or before, if negative) the given
+        trading day, or the nearest trading day before it if it is not one."""
+        d = self.nearest_trading_day(d)
+        i = self._index(d)
+        position = self._cumulative[i] - 1 + n
+        while position < 0:
+            self._build(self.first_year - 1, self.last_year)
+            position = self._cumulative[d.toordinal() - self._start] - 1 + n
+        while position >= len(self._days):
+            self._build(self.first_year, self.last_year + 1)
+        return dt.date.fromordinal(self._days[position])
+
+    def _span(self, frm, to):
+        # positions in self._days of the first and one past the last trading day in [frm, to]
+        frm, to = _to_date(frm), _to_date(to)
+        self._index(to)
+        i, j = self._index(frm), self._index(to)
+        self._warn_not_covered(frm.year, to.year)
+        first = self._cumulative[i] - self._flags[i]
+        return first, max(first, self._cumulative[j])
+
+    def trading_days_between(self, frm, to):
+        """Returns the number of trading days from `frm` to `to`, both included."""
+        first, last = self._span(frm, to)
+        return last - first
+
+    def trading_days(self, frm, to):
+        """Returns the list of trading days from `frm` to `to`, both included."""
+        first, last = self._span(frm, to)
+        return [dt.date.fromordinal(ordinal) for ordinal in self._days[first:last]]
+
+    @property
+    def busdaycalendar(self):
+        """numpy.busdaycalendar of the current window, for the NumPy busday functions."""
+        if self._busdaycalendar is None:
+            import numpy as np
+            holidays = [dt.date.fromordinal(self._start + i) for i, flag in enumerate(self._flags)
+                        if not flag and (self._start + i) % 7 not in (0, 6)]
+            self._busdaycalendar = np.busdaycalendar(weekmask='1111100', holidays=holidays)
+        return self._busdaycalendar
+
+    def trading_days_array(self, frm, to):
+        """Returns the trading days from `frm` to `to`, both included, as a NumPy
+        datetime64[D] array computed with vectorized busday arithmetic."""
+        import numpy as np
+        frm, to = np.datetime64(_to_date(frm), 'D'), np.datetime64(_to_date(to), 'D')
+        self._index(frm.item())
+        self._index(to.item())
+        calendar = self.busdaycalendar
+        first = np.busday_offset(frm, 0, roll='forward', busdaycal=calendar)
+        count = np.busday_count(first, to + 1, busdaycal=calendar)
+        if count <= 0:
+            return np.array([], dtype='datetime64[D]')
+        return np.busday_offset(first, np.arange(count), busdaycal=calendar)
+
+
+_CALENDAR = None
+
+
+def default_calendar():
+    """Returns the TradingCalendar of the holiday lists shipped with nsetools, loaded
+    on first use."""
+    global _CALENDAR
+    if _CALENDAR is None:
+        _CALENDAR = TradingCalendar.from_csv()
+    return _CALENDAR
 
 
 def get_nearest_business_day(d):
     """ takes datetime object"""
-    if d.isoweekday() == 7 or d.isoweekday() == 6:
-        d = d - relativedelta(days=1)
-        return get_nearest_business_day(d)
-
-    # republic day
-    elif d.month == 1 and d.day == 26:
-        d = d - relativedelta(days=1)
-        return get_nearest_business_day(d)
-    # labour day
-    elif d.month == 5 and d.day == 1:
-        d = d - relativedelta(days=1)
-        return get_nearest_business_day(d)
-    # independece day
-    elif d.month == 8 and d.day == 15:
-        d = d - relativedelta(days=1)
-        return get_nearest_business_day(d)
-    # Gandhi Jayanti
-    elif d.month == 10 and d.day == 2:
-        d = d - relativedelta(days=1)
-        return get_nearest_business_day(d)
-    # chirstmas
-    elif d.month == 12 and d.day == 25:
-        d = d - relativedelta(days=1)
-        return get_nearest_business_day(d)
-    else:
-        return d
+    nearest = default_calendar().nearest_trading_day(d)
+    return d - dt.timedelta(days=(_to_date(d) - nearest).days)
 
 def is_known_holiday(d):
     """accepts datetime/date object and returns boolean"""
-    if type(d) == dt.datetime:
-        d = d.date()
-    elif type(d) != dt.date:
-        raise DateFormatError("only date objects or datetime objects")
-    else:
-        # fine do nothing
-        pass 
-
-    # declare the list of holidays here.
-    # republic day.
-    if d.month  == 1 and d.day == 26:
-        return True
-    # labour day
-    elif d.month == 5 and d.day == 1:
-        d = d - relativedelta(days=1)
-        return get_nearest_business_day(d)
-    # independence day
-    elif d.month == 8 and d.day == 15:
-        return True
-    # gandhi jayanti
-    elif d.month == 10 and d.day == 2:
-        return True
-    # christmas
-    elif d.month == 12 and d.day == 25:
-        return True
-    else:
-        return False
+    d = _to_date(d)
+    if d.year in default_calendar().covered_years:
+        return default_calendar().is_holiday(d)
+    return (d.month, d.day) in FIXED_HOLIDAYS
+
+# number of distinct strings remembered by the date parsers
+DATE_CACHE_SIZE = 4096
+
+_MONTHS = {name: i for i, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+_TIME = r'(?:[ T](\d{2}):(\d{2})(?::(\d{2}))?)?\s*\Z'
+# formats used by NSE: 27-Mar-2025, 2025-03-27 and 27-03-2025, optionally followed by a time
+_DATE_PATTERNS = (
+    (re.compile(r'\s*(\d{1,2})-([A-Za-z]{3})-(\d{4})' + _TIME), (2, 1, 0)),
+    (re.compile(r'\s*(\d{4})-(\d{1,2})-(\d{1,2})' + _TIME), (0, 1, 2)),
+    (re.compile(r'\s*(\d{1,2})-(\d{1,2})-(\d{4})' + _TIME), (2, 1, 0)),
+)
+
+
+def _from_groups(groups, order):
+    year, month, day = order
+    m = groups[month]
+    if m.isalpha():
+        m = _MONTHS.get(m.lower())
+        if m is None:
+            raise ValueError("unknown month %r" % groups[month])
+    return dt.datetime(int(groups[year]), int(m), int(groups[day]),
+                       int(groups[3] or 0), int(groups[4] or 0), int(groups[5] or 0))
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def match_datetime(text):
+    """Parses a string in one of the date formats used by NSE, like 27-Mar-2025,
+    2025-03-27 or 27-03-2025, optionally followed by a time like 15:30:00.
+    Results, including misses, are memoized.
+    Args:
+        text (str): String to parse.
+    Returns:
+        datetime: Parsed datetime, or None if `text` is not in a known format or not a
+            valid date.
+    Example:
+        >>> match_datetime('27-Mar-2025')
+        datetime.datetime(2025, 3, 27, 0, 0)
+    """
+    for pattern, order in _DATE_PATTERNS:
+        match = pattern.match(text)
+        if match is not None:
+            try:
+                return _from_groups(match.groups(), order)
+            except ValueError:
+                return None
+    return None
+
+
+def _format_parser(pattern, order):
+    @lru_cache(maxsize=DATE_CACHE_SIZE)
+    def parse(text):
+        match = pattern.match(text)
+        if match is None:
+            raise ValueError("%r doesn't match %s" % (text, pattern.pattern))
+        return _from_groups(match.groups(), order)
+    return parse
+
+_FORMAT_PARSERS = tuple((pattern, _format_parser(pattern, order)) for pattern, order in _DATE_PATTERNS)
+
+
+def date_parser(text):
+    """Returns the parser of the NSE date format `text` is in, so that values known to
+    share a format are parsed without trying the other formats.
+    Args:
+        text (str): Sample value.
+    Returns:
+        callable: Memoized function taking a string in the same format and returning a
+            datetime, raising ValueError for any other string. None if `text` is not in
+            one of the formats of match_datetime.
+    Example:
+        >>> parse = date_parser('27-Mar-2025')
+        >>> parse('24-Apr-2025')
+        datetime.datetime(2025, 4, 24, 0, 0)
+    """
+    for pattern, parse in _FORMAT_PARSERS:
+        if pattern.match(text) is not None:
+            return parse
+    return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _fuzzy_datetime(text):
+    from dateutil.parser import parse
+    return parse(text, dayfirst=True)
+
+
+def parse_datetime(text):
+    """Parses a date string, using the fast path of match_datetime for the formats used
+    by NSE and dateutil for anything else.
+    Args:
+        text (str): String to parse.
+    Returns:
+        datetime: Parsed datetime.
+    Raises:
+        ValueError: If `text` can't be parsed.
+    """
+    parsed = match_datetime(text)
+    if parsed is None:
+        parsed = _fuzzy_datetime(text)
+    return parsed
+
 
 def mkdate(d):
     """tries its best to return a valid date. it can accept pharse like today,
@@ -74,11 +356,11 @@ def mkdate(d):
         if d == "today":
             return_date = dt.date.today()
         elif d == "yesterday":
-            return_date = dt.date.today() - relativedelta(days=1)
+            return_date = dt.date.today() - dt.timedelta(days=1)
         elif d == "day before yesterday":
-            return_date = dt.date.today() - relativedelta(days=2)
+            return_date = dt.date.today() - dt.timedelta(days=2)
         else:
-            return_date = parse(d, dayfirst=True).date()
+            return_date = parse_datetime(d).date()
     elif type(d) == dt.datetime:
         return_date = d.date()
     elif type(d) == dt.date:
@@ -94,11 +376,6 @@ def usable_date(d):
 
 def get_date_range(frm, to, skip_dates=[]):
     """accepts fuzzy format date and returns business adjusted date ranges"""
-    # for x in rrule.rrule(rrule.DAILY, dtstart=s, until=dt.datetime.now(), byweekday=[0, 1, 2, 3, 4]): print(x)
     frm = usable_date(frm)
     to = usable_date(to)
-    datelist = []
-    for date in rrule.rrule(rrule.DAILY, dtstart=frm, until=to, byweekday=[0, 1, 2, 3, 4]):
-        if not is_known_holiday(date):
-            datelist.append(date.date())
-    return datelist
+    return default_calendar().trading_days(frm, to)
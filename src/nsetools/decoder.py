@@ -0,0 +1,150 @@
+"""
+Decoding of NSE responses with numeric casting folded into the decode.
+
+With the standard library decoder, numbers are cast while the JSON is being parsed,
+through object_hook, so the payload is walked only once. If orjson is installed it
+is used instead, followed by a walk which casts the freshly decoded payload in
+place. orjson rejects the NaN and Infinity literals the standard library takes,
+such payloads are decoded again with the standard library. Either way the result is identical to
+cast_intfloat_string_values_to_intfloat(json.loads(content)).
+"""
+import json
+from nsetools.utils import (cast_intfloat_string_values_to_intfloat, cast_intfloat_string_value,
+                            cast_with_plan)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _cast_list(values, round_digits):
+    """Casts the scalar items of a freshly decoded list in place. Dicts inside it have
+    already been cast by the object hook."""
+    for i, value in enumerate(values):
+        kind = type(value)
+        if kind is str:
+            values[i] = cast_intfloat_string_value(value, round_digits)
+        elif kind is float:
+            values[i] = round(value, round_digits)
+        elif kind is list:
+            _cast_list(value, round_digits)
+    return values
+
+
+def _stdlib_loads(content, round_digits):
+    def object_hook(obj):
+        for key, value in obj.items():
+            kind = type(value)
+            if kind is str:
+                obj[key] = cast_intfloat_string_value(value, round_digits)
+            elif kind is float:
+                obj[key] = round(value, round_digits)
+            elif kind is list:
+                _cast_list(value, round_digits)
+        return obj
+
+    data = json.loads(content, object_hook=object_hook)
+    if isinstance(data, list):
+        return _cast_list(data, round_digits)
+    return data
+
+
+def _cast_tree(data, round_digits):
+    """Casts a freshly decoded payload in place."""
+    if type(data) is dict:
+        for key, value in data.items():
+            kind = type(value)
+            if kind is str:
+                data[key] = cast_intfloat_string_value(value, round_digits)
+            elif kind is float:
+                data[key] = round(value, round_digits)
+            elif kind is dict or kind is list:
+                _cast_tree(value, round_digits)
+    elif type(data) is list:
+        for i, value in enumerate(data):
+            kind = type(value)
+            if kind is str:
+                data[i] = cast_intfloat_string_value(value, round_digits)
+            elif kind is float:
+                data[i] = round(value, round_digits)
+            elif kind is dict or kind is list:
+                _cast_tree(value, round_digits)
+    return data
+
+
+def _orjson_raw_loads(content):
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        # NaN / Infinity literals, which json.loads takes like res.json() used to
+        return json.loads(content)
+
+
+def _orjson_loads(content, round_digits):
+    return _cast_tree(_orjson_raw_loads(content), round_digits)
+
+
+# name -> (raw loads, casting loads)
+DECODERS = {
+    'json': (json.loads, _stdlib_loads),
+}
+if orjson is not None:
+    DECODERS['orjson'] = (_orjson_raw_loads, _orjson_loads)
+
+DEFAULT_DECODER = 'orjson' if orjson is not None else 'json'
+
+
+def register_decoder(name, raw_loads, casting_loads=None):
+    """Registers a decoder which can then be picked by name in `loads`.
+    Args:
+        name (str): Name of the decoder.
+        raw_loads (callable): Function which decodes bytes or str to python objects.
+        casting_loads (callable, optional): Function taking (content, round_digits) which
+            decodes and casts in one go. Defaults to raw_loads followed by
+            cast_intfloat_string_values_to_intfloat.
+    """
+    if casting_loads is None:
+        def casting_loads(content, round_digits):
+            return cast_intfloat_string_values_to_intfloat(raw_loads(content), round_digits)
+    DECODERS[name] = (raw_loads, casting_loads)
+
+
+def loads(content, cast=True, round_digits=2, decoder=None, endpoint=None, pool=None, dates=None):
+    """Decodes an NSE JSON response, casting numeric strings and rounding floats on the way.
+    Args:
+        content (Union[bytes, str]): Body of the response.
+        cast (bool, optional): If False, the payload is only decoded. Defaults to True.
+        round_digits (int, optional): Number of decimal places float values are rounded to.
+            Defaults to 2.
+        decoder (str, optional): Name of the decoder, see DECODERS. Defaults to
+            DEFAULT_DECODER, which is orjson when installed and the stdlib otherwise.
+        endpoint (str, optional): Key of the endpoint the payload comes from, usually its
+            URL template. If provided, the payload is cast as per the casting plan learned
+            for the endpoint, see nsetools.utils.cast_with_plan. Defaults to None.
+        pool (nsetools.interning.InternPool, optional): If provided, keys and categorical
+            values of the payload are interned through it. Defaults to None.
+        dates (Iterable[str], optional): Keys whose date strings are parsed to datetimes
+            in the same pass, with the format learned per endpoint, only along with
+            `endpoint`. Defaults to None.
+    Returns:
+        Union[dict, list]: Decoded data.
+    Raises:
+        ValueError: If `dates` is given without `endpoint`.
+    Example:
+        >>> loads(b'{"lastPrice": "1580.555", "change": -10.149999}')
+        {'lastPrice': 1580.56, 'change': -10.15}
+    """
+    if dates and endpoint is None:
+        # unrelated payloads would share a single plan, drifting on every call
+        raise ValueError("dates are parsed only along with an endpoint")
+    raw_loads, casting_loads = DECODERS[decoder or DEFAULT_DECODER]
+    if not cast:
+        data = raw_loads(content)
+    elif endpoint is not None:
+        data = cast_with_plan(raw_loads(content), endpoint, round_digits, inplace=True, dates=dates)
+    else:
+        data = casting_loads(content, round_digits)
+    if pool is not None:
+        pool.intern_tree(data)
+    return data
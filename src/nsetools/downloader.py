@@ -24,23 +24,122 @@
 """
 import io
 import os
+import json
+import shutil
+import hashlib
+import time
 import zipfile
+import tempfile
 import datetime as dt
-from urllib.request import Request
-from nsetools.datemgr import mkdate, usable_date, get_date_range
-from nsetools import Nse
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from nsetools.datemgr import mkdate, usable_date, get_date_range, default_calendar
+from nsetools import urls
+from nsetools.errors import BhavcopyNotAvailableError
 from abc import ABCMeta, abstractmethod
 
+FETCHED = 'fetched'
+FAILED = 'failed'
+# NSE has no bhavcopy for the date, which isn't a trading day as per the calendar.
+# a trading day without a bhavcopy is FAILED instead, as the URL may be wrong or retired
+MISSING = 'missing'
+
+# size of the chunks responses and archive members are streamed in
+CHUNK_SIZE = 1 << 16
+# responses up to this size are spooled in memory, larger ones to a temporary file
+SPOOL_SIZE = 1 << 22
+
+
+class Manifest():
+    """Status of every date a downloader has dealt with, kept as JSON next to the files
+    so that a restarted download resumes where it stopped.
+
+    Example:
+        >>> manifest = Manifest('/tmp/bhavcopy/manifest.json')
+        >>> manifest.status(dt.date(2025, 1, 24))
+        'fetched'
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.dates = {}
+        if os.path.exists(path):
+            with open(path) as fh:
+                self.dates = json.load(fh).get('dates', {})
+
+    def status(self, d):
+        """Returns the status of the date, FETCHED, FAILED, MISSING or None if unknown."""
+        entry = self.dates.get(d.isoformat())
+        return entry['status'] if entry else None
+
+    def mark(self, d, status, **info):
+        """Records the status of the date along with any extra info, like the error."""
+        self.dates[d.isoformat()] = dict(info, status=status)
+
+    def entry(self, d):
+        """Returns the recorded info of the date, like its status, sha256 and size, or None."""
+        return self.dates.get(d.isoformat())
+
+    def by_status(self, status):
+        """Returns the sorted dates having the given status."""
+        return sorted(dt.date.fromisoformat(d) for d, entry in self.dates.items()
+                      if entry['status'] == status)
+
+    def save(self):
+        """Writes the manifest, through a temporary file so that it is never left partial."""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump({'dates': self.dates}, fh, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def file_checksum(path, chunk_size=1 << 16):
+    """Returns the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _HashingWriter():
+    """File wrapper keeping the sha256 and size of what is written through it."""
+    def __init__(self, fh):
+        self.fh = fh
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+        return self.fh.write(data)
+
+
 class BaseBhavcopyDownloader(metaclass=ABCMeta):
-    """Base class for all types of bhavcopy downloader"""
-    def __init__(self, from_date, to_date=dt.datetime.now().date(), skip_dates=[]):
-        """accepts date in fuzzy format"""
-        self.bhavcopy_base_url = "https://www.nseindia.com/content/historical/EQUITIES/%s/%s/cm%s%s%sbhav.csv.zip"
-        self.bhavcopy_base_filename = "cm%s%s%sbhav.csv"
+    """Base class for all types of bhavcopy downloader
+
+    Dates are downloaded by a pool of `workers` threads sharing one Session. A failed
+    date is retried `retries` times with an exponential backoff starting at `backoff`
+    seconds, while a date for which NSE has no bhavcopy is given up at once: as MISSING
+    if it isn't a trading day, else as FAILED so that the next run tries it again.
+    """
+    bhavcopy_base_url = urls.BHAVCOPY_BASE_URL
+    bhavcopy_base_filename = urls.BHAVCOPY_BASE_FILENAME
+
+    def __init__(self, from_date, to_date=None, skip_dates=[], session=None,
+                 workers=8, retries=3, backoff=1.0):
+        """accepts date in fuzzy format, to_date defaults to today"""
         self.from_date = from_date
-        self.to_date = to_date
+        # evaluated here rather than as the default value, which would be the import date
+        self.to_date = to_date if to_date is not None else dt.date.today()
         self.skip_dates = skip_dates
-        self.nse = Nse()
+        if session is None:
+            from nsetools.ua import Session
+            session = Session()
+        self.session = session
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
         self.dates = self.generate_dates()
 
     def generate_dates(self):
@@ -62,19 +161,113 @@ class BaseBhavcopyDownloader(metaclass=ABCMeta):
         filename = self.bhavcopy_base_filename % (day_of_month, mon, year)
         return filename
 
-    def download_one(self, d):
-        """download bhavcopy for the given date"""
-        # this will keep this method usable for any arbitrary date.
-        d = mkdate(d)
+    @contextmanager
+    def open_bhavcopy(self, d):
+        """Context manager opening the CSV of the bhavcopy of the given date as a binary
+        file. The archive is streamed to a spooled temporary file, in memory up to
+        SPOOL_SIZE, and the CSV is decompressed as it is read.
+        Raises:
+            BhavcopyNotAvailableError: If NSE has no bhavcopy for the date.
+        """
         # ex_url = "https://www.nseindia.com/content/historical/EQUITIES/2011/NOV/cm08NOV2011bhav.csv.zip"
         url = self.get_bhavcopy_url(d)
-        print(url)
         filename = self.get_bhavcopy_filename(d)
-        # response = requests.get(url, headers=self.headers)
-        response = self.nse.opener.open(Request(url, None, self.nse.headers))
-        zip_file_handle = io.BytesIO(response.read())
-        zf = zipfile.ZipFile(zip_file_handle)
-        return zf.read(filename).decode("utf-8")
+        response = self.session.fetch(url, use_cache=False, stream=True)
+        try:
+            if response.status_code == 404:
+                raise BhavcopyNotAvailableError("no bhavcopy for %s" % d.isoformat())
+            response.raise_for_status()
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    spool.write(chunk)
+                spool.seek(0)
+                with zipfile.ZipFile(spool) as zf:
+                    names = zf.namelist()
+                    # archives hold a single CSV, whose name may differ in case
+                    with zf.open(filename if filename in names else names[0]) as member:
+                        yield member
+        finally:
+            response.close()
+
+    def download_to(self, d, fh):
+        """Streams the CSV of the bhavcopy of the given date into the binary file `fh`.
+        Returns:
+            tuple: sha256 hex digest and size of the CSV.
+        """
+        writer = _HashingWriter(fh)
+        with self.open_bhavcopy(mkdate(d)) as member:
+            shutil.copyfileobj(member, writer, CHUNK_SIZE)
+        return writer.digest.hexdigest(), writer.size
+
+    def download_one(self, d):
+        """download bhavcopy for the given date"""
+        # this will keep this method usable for any arbitrary date.
+        buffer = io.BytesIO()
+        self.download_to(d, buffer)
+        return buffer.getvalue().decode("utf-8")
+
+    def iter_rows(self, d):
+        """Yields the rows of the bhavcopy of the given date as dicts, parsed while the
+        CSV is decompressed, so memory use doesn't grow with the size of the bhavcopy.
+        Example:
+            >>> next(downloader.iter_rows('24-01-2025'))['SYMBOL']
+            '20MICRONS'
+        """
+        import csv
+        with self.open_bhavcopy(mkdate(d)) as member:
+            for row in csv.DictReader(io.TextIOWrapper(member, encoding="utf-8", newline="")):
+                # the trailing comma of the lines makes an unnamed empty column
+                row.pop("", None)
+                yield row
+
+    def retry(self, func, *args):
+        """Calls func(*args), retrying on failures other than BhavcopyNotAvailableError."""
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args)
+            except BhavcopyNotAvailableError:
+                raise
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def download_with_retry(self, d):
+        """Same as download_one, with retries."""
+        return self.retry(self.download_one, d)
+
+    def fetch_one(self, d):
+        """Downloads the bhavcopy of a date from a worker thread, returns the info recorded
+        for it. Defaults to the content, subclasses store it and record where."""
+        return {'content': self.download_with_retry(d)}
+
+    def fetch_all(self, dates, handle):
+        """Downloads the dates in parallel and calls `handle(d, status, info)` from the calling
+        thread as each of them completes, with status FETCHED (info as per fetch_one),
+        MISSING or FAILED (info holding the error). A date without a bhavcopy is MISSING
+        only if it isn't a trading day as per the calendar."""
+        def fetch(d):
+            try:
+                return FETCHED, self.fetch_one(d)
+            except BhavcopyNotAvailableError:
+                if d >= dt.date.today():
+                    # the bhavcopy of the day is published after the close
+                    return FAILED, {'error': "not published yet"}
+                if default_calendar().is_trading_day(d):
+                    return FAILED, {'error': "no bhavcopy for a trading day"}
+                return MISSING, {}
+            except Exception as err:
+                return FAILED, {'error': "%s: %s" % (type(err).__name__, err)}
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {pool.submit(fetch, d): d for d in dates}
+            for future in as_completed(futures):
+                status, info = future.result()
+                handle(futures[future], status, info)
+        finally:
+            # on interruption, drop the dates not started yet
+            pool.shutdown(wait=True, cancel_futures=True)
 
     @abstractmethod
     def download(self):
@@ -86,31 +279,127 @@ class BaseBhavcopyDownloader(metaclass=ABCMeta):
 
 
 class BhavcopyFileSystemDownloader(BaseBhavcopyDownloader):
+    """Downloads bhavcopies as YYYY-MM-DD.csv files in a directory, along with a
+    manifest.json recording which dates were fetched, failed or missing.
+
+    Example:
+        >>> downloader = BhavcopyFileSystemDownloader('/tmp/bhavcopy', from_date='01-01-2018')
+        >>> result = downloader.download()
+        >>> len(result['failed'])
+        0
+    """
+    manifest_filename = 'manifest.json'
+    # dates completed between two saves of the manifest
+    save_every = 50
+
     def __init__(self, directory, *args, **kwargs):
         if (os.path.exists(directory) and os.path.isdir(directory) and os.access(directory, os.W_OK)):
             super().__init__(*args, **kwargs)
             self.directory = directory
+            self.manifest = Manifest(os.path.join(directory, self.manifest_filename))
         else:
             raise Exception("directory path must be valid and writtable, please check manually")
 
-    def download(self):
-        for date in self.dates:
-            print("downloading for " + str(date))
-            try:
-                content = self.download_one(date)
-            except Exception as err:
-                print("unable to download for the date: %s" %  date.strftime("%Y-%m-%d"))
-            else:
-                fh = open(self.directory + "/" + date.strftime("%Y-%m-%d") + ".csv", "w")
-                fh.write(content)
-                fh.close()
-    
-    def update(self):
-        pass 
+    def get_path(self, d):
+        """Returns the path of the bhavcopy of the given date."""
+        return os.path.join(self.directory, d.strftime("%Y-%m-%d") + ".csv")
+
+    def is_done(self, d, verify=False):
+        """Returns True if the date needs no download: NSE has no bhavcopy for it, or its
+        file is on disk with the size recorded in the manifest. With `verify` the sha256
+        of the file is checked as well, to catch corrupted files of the right size, and
+        the dates recorded as MISSING are tried again.
+        Files on disk which the manifest doesn't know of are taken in as they are.
+        """
+        entry = self.manifest.entry(d)
+        if entry is not None and entry['status'] == MISSING and not verify:
+            return True
+        path = self.get_path(d)
+        if not os.path.exists(path):
+            return False
+        if entry is None or entry['status'] != FETCHED or 'sha256' not in entry:
+            self.manifest.mark(d, FETCHED, sha256=file_checksum(path), size=os.path.getsize(path))
+            return True
+        if os.path.getsize(path) != entry['size']:
+            return False
+        return not verify or file_checksum(path) == entry['sha256']
+
+    def save_one(self, d):
+        """Streams the bhavcopy of the date to its file, returns its sha256 and size."""
+        # written under a temporary name first, so an interrupted write isn't taken as done
+        path = self.get_path(d)
+        try:
+            with open(path + ".tmp", "wb") as fh:
+                sha256, size = self.download_to(d, fh)
+        except BaseException:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+            raise
+        os.replace(path + ".tmp", path)
+        return {'sha256': sha256, 'size': size}
+
+    def fetch_one(self, d):
+        return self.retry(self.save_one, d)
+
+    def download(self, dates=None, verify=False):
+        """Downloads the bhavcopies of the dates which are not done yet, see is_done.
+        Args:
+            dates (Iterable, optional): Dates in fuzzy format. Defaults to the range of the
+                downloader.
+            verify (bool, optional): If True the checksums of the files on disk are verified
+                and corrupted files, along with the MISSING dates, are downloaded again.
+                Defaults to False.
+        Returns:
+            dict: Dates of this run by status, 'fetched', 'failed' and 'missing'.
+        """
+        dates = self.dates if dates is None else [mkdate(d) for d in dates]
+        result = {FETCHED: [], FAILED: [], MISSING: []}
+
+        def handle(d, status, info):
+            self.manifest.mark(d, status, **info)
+            result[status].append(d)
+            if sum(map(len, result.values())) % self.save_every == 0:
+                self.manifest.save()
+
+        try:
+            self.fetch_all([d for d in dates if not self.is_done(d, verify)], handle)
+        finally:
+            self.manifest.save()
+        for status_dates in result.values():
+            status_dates.sort()
+        return result
+
+    def update(self, verify=False):
+        """Brings the directory up to date: fetches the trading days from `from_date` to today
+        which are not in the manifest yet, along with the ones whose file is missing,
+        partial or, with `verify`, corrupted. A nightly run costs the new days only.
+        Args:
+            verify (bool, optional): If True every file is checked against its sha256 and
+                the MISSING dates are tried again. Defaults to False, where files are
+                checked by size.
+        Returns:
+            dict: Dates of this run by status, 'fetched', 'failed' and 'missing'.
+        """
+        self.to_date = dt.date.today()
+        self.dates = self.generate_dates()
+        return self.download(verify=verify)
+
+
+class FnoBhavcopyFileSystemDownloader(BhavcopyFileSystemDownloader):
+    """Downloads F&O bhavcopies as YYYY-MM-DD.csv files in a directory, like
+    BhavcopyFileSystemDownloader, to be ingested into a FnoBhavcopyStore.
+
+    Example:
+        >>> downloader = FnoBhavcopyFileSystemDownloader('/tmp/fno-bhavcopy', from_date='01-01-2024')
+        >>> downloader.update()
+        >>> FnoBhavcopyStore('/tmp/fno-store').ingest_directory('/tmp/fno-bhavcopy')
+    """
+    bhavcopy_base_url = urls.FNO_BHAVCOPY_BASE_URL
+    bhavcopy_base_filename = urls.FNO_BHAVCOPY_BASE_FILENAME
 
 
 if __name__ == '__main__':
     b = BhavcopyFileSystemDownloader(directory="/tmp/bhavcopy", from_date="01-01-2018")
-    b.download()
+    print({status: len(dates) for status, dates in b.download().items()})
 
-# https://stackoverflow.com/questions/49183801/ssl-certificate-verify-failed-with-urllib
\ No newline at end of file
+# https://stackoverflow.com/questions/49183801/ssl-certificate-verify-failed-with-urllib
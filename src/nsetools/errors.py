@@ -5,4 +5,9 @@ class BhavcopyNotAvailableError(Exception):
 
 class DateFormatError(Exception):
     """in case the date format is errorneous"""
-    pass
\ No newline at end of file
+    pass
+
+class HolidaysNotCoveredWarning(UserWarning):
+    """warned when a trading calendar is asked about a year its holiday list doesn't
+    cover, whose holidays are then guessed from the fixed date ones"""
+    pass
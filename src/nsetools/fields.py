@@ -0,0 +1,90 @@
+"""
+Field mappings used to flatten convoluted NSE responses
+"""
+
+# get_future_quote flattens quote-derivative records, each entry maps output key
+# to its path in the raw record. premium is derived as lastPrice - underlyingValue.
+# !! there is bug in spelling of the key 'dailyvolatility', it is not camel cased
+# fixing that in the output key for uniformity
+FUTURE_QUOTE_FIELDS = (
+    ('expiryDate', ('metadata', 'expiryDate')),
+    ('lastPrice', ('metadata', 'lastPrice')),
+    ('premium', None),
+    ('openPrice', ('metadata', 'openPrice')),
+    ('highPrice', ('metadata', 'highPrice')),
+    ('lowPrice', ('metadata', 'lowPrice')),
+    ('closePrice', ('metadata', 'closePrice')),
+    ('prevClose', ('metadata', 'prevClose')),
+    ('change', ('metadata', 'change')),
+    ('pChange', ('metadata', 'pChange')),
+    ('numberOfContractsTraded', ('metadata', 'numberOfContractsTraded')),
+    ('totalTurnover', ('metadata', 'totalTurnover')),
+    ('underlyingValue', ('underlyingValue',)),
+    ('tradedVolume', ('marketDeptOrderBook', 'tradeInfo', 'tradedVolume')),
+    ('openInterest', ('marketDeptOrderBook', 'tradeInfo', 'openInterest')),
+    ('changeInOpenInterest', ('marketDeptOrderBook', 'tradeInfo', 'changeinOpenInterest')),
+    ('pchangeinOpenInterest', ('marketDeptOrderBook', 'tradeInfo', 'pchangeinOpenInterest')),
+    ('marketLot', ('marketDeptOrderBook', 'tradeInfo', 'marketLot')),
+    ('dailyVolatility', ('marketDeptOrderBook', 'otherInfo', 'dailyvolatility')),
+    ('annualisedVolatility', ('marketDeptOrderBook', 'otherInfo', 'annualisedVolatility')),
+)
+
+# values of these fields repeat across records and snapshots
+CATEGORICAL_FIELDS = frozenset([
+    'symbol', 'series', 'identifier', 'expiryDate', 'key', 'index',
+    'indexSymbol', 'market_type', 'ca_purpose',
+])
+
+# prices, changes and percentages, which are float64 columns even when all the
+# values of a snapshot happen to be whole numbers
+PRICE_FIELDS = frozenset([
+    # stock quote
+    'lastPrice', 'change', 'pChange', 'previousClose', 'open', 'close', 'vwap',
+    'stockIndClosePrice', 'lowerCP', 'upperCP', 'basePrice', 'min', 'max',
+    # index quote and stocks of an index
+    'last', 'variation', 'percentChange', 'high', 'low', 'dayHigh', 'dayLow',
+    'yearHigh', 'yearLow', 'indicativeClose', 'previousDay', 'oneWeekAgo',
+    'oneMonthAgo', 'oneYearAgo', 'perChange365d', 'perChange30d',
+    # future quote
+    'openPrice', 'highPrice', 'lowPrice', 'closePrice', 'prevClose', 'underlyingValue',
+    'premium', 'settlementPrice',
+    # top gainers / losers and 52 week high / low
+    'open_price', 'high_price', 'low_price', 'ltp', 'prev_price', 'net_price',
+    'perChange', 'new52WHL', 'prev52WHL',
+])
+
+# fields holding dates, parsed to datetimes with parse_dates
+DATE_FIELDS = frozenset(['expiryDate', 'prevHLDate', 'ca_ex_dt'])
+
+
+def get_path(record, path):
+    """Returns the value at `path` (tuple of keys) in a nested record."""
+    for key in path:
+        record = record[key]
+    return record
+
+
+def _premium(record):
+    return record['metadata']['lastPrice'] - record['underlyingValue']
+
+
+def flatten_future_quote(record):
+    """Flattens a raw quote-derivative record as per FUTURE_QUOTE_FIELDS."""
+    flat = {}
+    for name, path in FUTURE_QUOTE_FIELDS:
+        flat[name] = _premium(record) if path is None else get_path(record, path)
+    return flat
+
+
+def future_quote_columns(records):
+    """Returns FUTURE_QUOTE_FIELDS of raw quote-derivative records as columns.
+    Returns:
+        dict: Mapping of output key to the list of its values, one per record.
+    """
+    columns = {}
+    for name, path in FUTURE_QUOTE_FIELDS:
+        if path is None:
+            columns[name] = [_premium(record) for record in records]
+        else:
+            columns[name] = [get_path(record, path) for record in records]
+    return columns
@@ -0,0 +1,171 @@
+"""
+Exact fixed-point numbers, the `numeric=` mode of Nse APIs.
+
+By default numbers are cast to float and rounded to 2 decimal places. In the
+'fixed' mode the fields registered in SCALES are held as integers in units of
+10**-scale instead, like prices in paise, and in the 'decimal' mode as Decimal
+quantized to the scale. Either way sums and averages over them are exact. Fields
+which are not registered are cast the usual way.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from nsetools.utils import cast_intfloat_string_value, cast_intfloat_string_values_to_intfloat
+
+NUMERIC_MODES = ('float', 'fixed', 'decimal')
+
+PRICE_SCALE = 2
+PERCENT_SCALE = 4
+
+# field name -> number of decimal places it is held with
+SCALES = {}
+
+
+@lru_cache(maxsize=1024)
+def _shared_scales(fields):
+    # dicts with the same scaled fields share one mapping, so it must not be modified
+    return {field: SCALES[field] for field in fields}
+
+
+def register_scale(scale, *fields):
+    """Registers the scale, in decimal places, of the given field names.
+    Example:
+        >>> register_scale(2, 'settlementPrice')
+    """
+    for field in fields:
+        SCALES[field] = scale
+    _shared_scales.cache_clear()
+
+
+register_scale(
+    PRICE_SCALE,
+    # stock quote
+    'lastPrice', 'change', 'previousClose', 'open', 'close', 'vwap', 'stockIndClosePrice',
+    'lowerCP', 'upperCP', 'basePrice', 'min', 'max',
+    # index quote and stocks of an index
+    'last', 'variation', 'high', 'low', 'dayHigh', 'dayLow', 'yearHigh', 'yearLow',
+    'indicativeClose', 'previousDay', 'oneWeekAgo', 'oneMonthAgo', 'oneYearAgo',
+    'pe', 'pb', 'dy',
+    # future quote
+    'openPrice', 'highPrice', 'lowPrice', 'closePrice', 'prevClose', 'underlyingValue',
+    'premium', 'totalTurnover', 'settlementPrice',
+    # top gainers / losers and 52 week high / low
+    'open_price', 'high_price', 'low_price', 'ltp', 'prev_price', 'turnover',
+    'new52WHL', 'prev52WHL',
+)
+register_scale(
+    PERCENT_SCALE,
+    'pChange', 'percentChange', 'perChange', 'net_price', 'perChange365d', 'perChange30d',
+    'nearWKH', 'nearWKL', 'pchangeinOpenInterest', 'dailyvolatility', 'dailyVolatility',
+    'annualisedVolatility',
+)
+
+
+def validate_numeric(numeric):
+    """Raises ValueError if `numeric` is not a supported numeric mode."""
+    if numeric not in NUMERIC_MODES:
+        raise ValueError("numeric must be one of %s" % ", ".join(NUMERIC_MODES))
+
+
+def to_decimal(value):
+    """Returns `value` as an exact Decimal, or None if it is not a finite number.
+    Floats are taken as per their shortest repr, the way they were written in the JSON.
+    """
+    kind = type(value)
+    if kind is int:
+        return Decimal(value)
+    elif kind is float:
+        value = repr(value)
+    elif kind is not str:
+        return None
+    try:
+        number = Decimal(value.strip())
+    except InvalidOperation:
+        return None
+    return number if number.is_finite() else None
+
+
+def to_fixed(value, scale):
+    """Returns `value` as an integer in units of 10**-scale, rounded half away from zero,
+    or None if it is not a number.
+    Example:
+        >>> to_fixed('1580.555', 2)
+        158056
+    """
+    number = to_decimal(value)
+    if number is None:
+        return None
+    return int(number.scaleb(scale).to_integral_value(ROUND_HALF_UP))
+
+
+def to_scaled_decimal(value, scale):
+    """Returns `value` as a Decimal quantized to `scale` decimal places, rounded half away
+    from zero, or None if it is not a number."""
+    number = to_decimal(value)
+    if number is None:
+        return None
+    return number.quantize(Decimal(1).scaleb(-scale), ROUND_HALF_UP)
+
+
+def from_fixed(value, scale):
+    """Converts an integer in units of 10**-scale back to float."""
+    return value / 10 ** scale
+
+
+# numeric mode -> function converting (value, scale), None if value is not a number
+CONVERTERS = {'fixed': to_fixed, 'decimal': to_scaled_decimal}
+
+
+class ScaledDict(dict):
+    """dict returned by the fixed-point modes. `scales` maps every field of the dict held
+    as a fixed-point number to its scale in decimal places. It is shared between dicts
+    with the same fields, treat it as read-only."""
+    __slots__ = ('scales',)
+
+    def __init__(self, *args, scales=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scales = _shared_scales(()) if scales is None else scales
+
+
+def _to_fixed_point(data, convert, round_digits):
+    kind = type(data)
+    if kind is dict:
+        casted = ScaledDict()
+        scaled = []
+        for key, value in data.items():
+            scale = SCALES.get(key)
+            if scale is not None:
+                number = convert(value, scale)
+                if number is not None:
+                    casted[key] = number
+                    scaled.append(key)
+                    continue
+            casted[key] = _to_fixed_point(value, convert, round_digits)
+        casted.scales = _shared_scales(tuple(scaled))
+        return casted
+    elif kind is list:
+        return [_to_fixed_point(value, convert, round_digits) for value in data]
+    return cast_intfloat_string_value(data, round_digits)
+
+
+def to_fixed_point(data, numeric='fixed', round_digits=2):
+    """Casts decoded NSE data, holding the fields registered in SCALES as fixed-point numbers.
+    Args:
+        data (Union[dict, list]): Decoded data, uncast.
+        numeric (str, optional): 'fixed' for integers in units of 10**-scale, 'decimal'
+            for Decimal, or 'float' for the usual cast_intfloat_string_values_to_intfloat.
+            Defaults to 'fixed'.
+        round_digits (int, optional): Decimal places floats of unregistered fields are
+            rounded to. Defaults to 2.
+    Returns:
+        Union[dict, list]: A new data structure where dicts are ScaledDict, carrying the
+            scale of their fixed-point fields.
+    Example:
+        >>> quote = to_fixed_point({'lastPrice': '1580.55', 'pChange': -1.23456, 'symbol': 'INFY'})
+        >>> quote, quote.scales
+        ({'lastPrice': 158055, 'pChange': -12346, 'symbol': 'INFY'}, {'lastPrice': 2, 'pChange': 4})
+    """
+    validate_numeric(numeric)
+    if numeric == 'float':
+        return cast_intfloat_string_values_to_intfloat(data, round_digits)
+    return _to_fixed_point(data, CONVERTERS[numeric], round_digits)
+
@@ -0,0 +1,96 @@
+"""
+Bounded string interning for long running pollers.
+
+Every decoded response carries fresh copies of the same keys ('lastPrice',
+'pChange', ...) and of the same categorical values ('INFY', 'EQ', ...). An
+InternPool hands out one shared instance of each, so snapshots kept in memory
+share their strings instead of each holding its own copies. Unlike sys.intern
+the pool is bounded, it is cleared when full and refills with what is in use.
+"""
+from operator import is_
+from nsetools.fields import CATEGORICAL_FIELDS
+
+# fields whose values repeat across records and snapshots: the categorical ones and the
+# per stock constants and timestamps of quotes
+INTERNED_FIELDS = CATEGORICAL_FIELDS | frozenset([
+    'companyName', 'industry', 'isin', 'listingDate', 'lastUpdateTime', 'timestamp',
+    'date365dAgo', 'date30dAgo', 'chart365dPath', 'chart30dPath', 'chartTodayPath',
+])
+
+
+class InternPool():
+    """Pool of shared string instances.
+    Args:
+        maxsize (int, optional): Number of strings after which the pool is cleared.
+            Defaults to 65536.
+        fields (Iterable[str], optional): Keys whose string values are interned along
+            with the keys. Defaults to INTERNED_FIELDS, like symbol, series, identifier
+            and expiryDate.
+    Example:
+        >>> pool = InternPool()
+        >>> a, b = pool.intern_tree(loads(content)), pool.intern_tree(loads(content))
+        >>> a[0]['symbol'] is b[0]['symbol']
+        True
+    """
+    def __init__(self, maxsize=65536, fields=INTERNED_FIELDS):
+        self.maxsize = maxsize
+        self.fields = frozenset(fields)
+        self._strings = {}
+        # tuple of keys of a dict -> its pooled shape, see _shape
+        self._shapes = {}
+
+    def __len__(self):
+        return len(self._strings)
+
+    def clear(self):
+        self._strings.clear()
+        self._shapes.clear()
+
+    def intern(self, value):
+        """Returns the pooled instance equal to the string `value`, pooling it if needed."""
+        strings = self._strings
+        pooled = strings.get(value)
+        if pooled is None:
+            if len(strings) >= self.maxsize:
+                strings.clear()
+            strings[value] = pooled = value
+        return pooled
+
+    def _shape(self, keys):
+        # pooled keys of dicts with the given keys, and the ones among them in fields
+        shapes = self._shapes
+        shape = shapes.get(keys)
+        if shape is None:
+            if len(shapes) >= self.maxsize:
+                shapes.clear()
+            pooled = tuple(map(self.intern, keys))
+            shapes[keys] = shape = (pooled, tuple(key for key in pooled if key in self.fields))
+        return shape
+
+    def intern_tree(self, data):
+        """Interns, in place, the keys of all the dicts in `data` and the string values of
+        `fields`. Returns `data`.
+        """
+        kind = type(data)
+        if kind is dict:
+            keys = tuple(data)
+            pooled, fields = self._shape(keys)
+            if not all(map(is_, keys, pooled)):
+                # keys can't be swapped in place, refill the same dict in the same order
+                values = list(data.values())
+                data.clear()
+                data.update(zip(pooled, values))
+            for field in fields:
+                value = data[field]
+                if type(value) is str:
+                    data[field] = self.intern(value)
+            for value in data.values():
+                kind = type(value)
+                if kind is dict or kind is list:
+                    self.intern_tree(value)
+        elif kind is list:
+            for value in data:
+                kind = type(value)
+                if kind is dict or kind is list:
+                    self.intern_tree(value)
+        return data
@@ -23,13 +23,16 @@
 
 """
 
-import requests
-import csv
-from datetime import datetime as dt 
 from nsetools.bases import AbstractBaseExchange
 from nsetools import urls
 from nsetools.ua import Session
-from nsetools.utils import cast_intfloat_string_values_to_intfloat
+from nsetools.utils import cast_with_plan, compile_fields
+from nsetools.decoder import loads
+from nsetools.fields import flatten_future_quote, future_quote_columns, DATE_FIELDS
+from nsetools.columnar import validate_output, build_columns, records_to_columns
+from nsetools.records import Quote, IndexQuote, FutureQuote, MoverRecord
+from nsetools.fixedpoint import to_fixed_point
+from nsetools.datemgr import parse_datetime
 
 class Nse(AbstractBaseExchange):
     """
@@ -37,20 +40,31 @@ class Nse(AbstractBaseExchange):
     National Stock Exchange
     """
     __CODECACHE__ = None
+    intern_pool = None
 
-    def __init__(self, session_refresh_interval=120):
+    def __init__(self, session_refresh_interval=120, scheduler=None, intern_pool=None):
         """Initialize a new NSE object.
         Initializes a session management for making API calls to NSE (National Stock Exchange).
         Args:
             session_refresh_interval (int, optional): Time interval in seconds after which the session 
                 should be refreshed. Defaults to 120 seconds.
+            scheduler (MarketScheduler, optional): Market hours aware scheduler used to stretch
+                the response cache outside market hours. Defaults to None.
+            intern_pool (InternPool, optional): Pool through which keys and categorical values
+                like symbol and series of every response are interned, so snapshots held by
+                long running pollers share their strings. Defaults to None.
         Note:
             The session refresh interval helps maintain an active connection with NSE servers by
             periodically creating a new session to prevent timeouts.
         """
         
         self.session_refresh_interval = session_refresh_interval 
-        self.session = Session(session_refresh_interval)
+        self.session = Session(session_refresh_interval, scheduler=scheduler)
+        self.intern_pool = intern_pool
+
+    def _loads(self, res, **kwargs):
+        """Decodes a response, see nsetools.decoder.loads, through the intern pool if any."""
+        return loads(res.content, pool=self.intern_pool, **kwargs)
 
     #############################
     ###      STOCKS APIS      ###
@@ -70,6 +84,7 @@ class Nse(AbstractBaseExchange):
             >>> print(codes[:5])
             ['20MICRONS', '3IINFOTECH', '3MINDIA', '3PLAND', '63MOONS']
         """
+        import csv
         res = self.session.fetch(urls.STOCKS_CSV_URL)
         csv_content = res.text.splitlines()
         symbols = []
@@ -100,7 +115,7 @@ class Nse(AbstractBaseExchange):
         stock_codes = self.get_stock_codes()
         return code.upper() in stock_codes
 
-    def get_quote(self, code, all_data=False):
+    def get_quote(self, code, all_data=False, typed=False, fields=None, numeric='float'):
         """Gets the stock quote for a given NSE stock symbol.
 
         This function fetches real-time or delayed quote data from NSE for the specified stock code.
@@ -109,13 +124,21 @@ class Nse(AbstractBaseExchange):
             code (str): NSE stock symbol/code for which quote is to be fetched
             all_data (bool, optional): If True returns complete quote data, if False returns only price info. 
             Defaults to False.
+            typed (bool, optional): If True returns price info as a slotted `Quote` record
+            instead of a dict. Can't be combined with all_data. Defaults to False.
+            fields (list[str], optional): Dotted paths relative to the returned data, like
+            'intraDayHighLow.max' or with all_data 'priceInfo.vwap'. If provided, only these
+            paths are extracted and cast, and a dict of path to value is returned. Defaults to None.
+            numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold prices and
+            percentages exactly as integers in units of 10**-scale / Decimal, see
+            nsetools.fixedpoint. Defaults to 'float'.
 
         Returns:
             dict: A dictionary containing quote data.
 
         Raises:
             requests.exceptions.RequestException: If there is an error in HTTP request
-            ValueError: If the response JSON is invalid
+            ValueError: If the response JSON is invalid, or typed is asked with all_data or fields
 
         Example:
             >>> nse = Nse()
@@ -137,19 +160,43 @@ class Nse(AbstractBaseExchange):
             'weekHighLow': {'min': 4890}
             }
         """
+        if typed and all_data:
+            raise ValueError("typed quote is available only for price info")
+        if typed and fields is not None:
+            raise ValueError("fields are available only with untyped quote")
+        validate_output('records', typed, fields, numeric)
         code = code.upper()
         # TODO: implement if the code is valid
         res = self.session.fetch(urls.QUOTE_API_URL % code)
-        res = res.json()['priceInfo'] if all_data is False else res.json()
-        return cast_intfloat_string_values_to_intfloat(res)
+        if typed:
+            return Quote.from_raw(self._loads(res, cast=False)['priceInfo'])
+        if fields is not None:
+            res = self._loads(res, cast=False)
+            return compile_fields(fields)(res['priceInfo'] if all_data is False else res)
+        if numeric != 'float':
+            res = to_fixed_point(self._loads(res, cast=False), numeric)
+            return res['priceInfo'] if all_data is False else res
+        res = self._loads(res, endpoint=urls.QUOTE_API_URL)
+        return res['priceInfo'] if all_data is False else res
     
-    def get_52_week_high(self):
+    def get_52_week_high(self, output='records', numeric='float', parse_dates=False):
         """Retrieves a list of stocks that have hit their 52-week high.
 
         This method fetches data for stocks that have reached new 52-week high prices on the NSE.
 
+        Args:
+            output (str, optional): One of 'records', 'numpy', 'pandas' or 'arrow'.
+                Defaults to 'records'.
+            numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold prices and
+                percentages exactly as integers in units of 10**-scale / Decimal, see
+                nsetools.fixedpoint. Defaults to 'float'.
+            parse_dates (bool, optional): If True the dates, like prevHLDate, are parsed to
+                datetimes while the numbers are cast, only with 'records' output of float
+                numbers. Defaults to False.
+
         Returns:
-            list[dict]: A list of dictionaries containing 52-week high data.
+            list[dict]: A list of dictionaries containing 52-week high data, or the
+            columnar equivalent as per `output`.
 
         Example:
             >>> nse.get_52_week_high()
@@ -166,16 +213,33 @@ class Nse(AbstractBaseExchange):
                 {...}
             ]
         """
+        validate_output(output, numeric=numeric, parse_dates=parse_dates)
         res = self.session.fetch(urls.FIFTYTWO_WEEK_HIGH_URL)
-        return cast_intfloat_string_values_to_intfloat(res.json())['data']
+        if output != 'records':
+            return records_to_columns(self._loads(res, cast=False)['data'], output, numeric=numeric)
+        if numeric != 'float':
+            return to_fixed_point(self._loads(res, cast=False)['data'], numeric)
+        return self._loads(res, endpoint=urls.FIFTYTWO_WEEK_HIGH_URL,
+                           dates=DATE_FIELDS if parse_dates else None)['data']
     
-    def get_52_week_low(self):
+    def get_52_week_low(self, output='records', numeric='float', parse_dates=False):
         """Retrieves a list of stocks that have hit their 52-week low.
 
         This method fetches data for stocks that have reached new 52-week low prices on the NSE.
 
+        Args:
+            output (str, optional): One of 'records', 'numpy', 'pandas' or 'arrow'.
+                Defaults to 'records'.
+            numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold prices and
+                percentages exactly as integers in units of 10**-scale / Decimal, see
+                nsetools.fixedpoint. Defaults to 'float'.
+            parse_dates (bool, optional): If True the dates, like prevHLDate, are parsed to
+                datetimes while the numbers are cast, only with 'records' output of float
+                numbers. Defaults to False.
+
         Returns:
-            list[dict]: A list of dictionaries containing 52-week low data.
+            list[dict]: A list of dictionaries containing 52-week low data, or the
+            columnar equivalent as per `output`.
 
         Example:
             >>> nse.get_52_week_low()
@@ -192,14 +256,20 @@ class Nse(AbstractBaseExchange):
                 {...}
             ]
         """
+        validate_output(output, numeric=numeric, parse_dates=parse_dates)
         res = self.session.fetch(urls.FIFTYTWO_WEEK_LOW_URL)
-        return cast_intfloat_string_values_to_intfloat(res.json())['data']
+        if output != 'records':
+            return records_to_columns(self._loads(res, cast=False)['data'], output, numeric=numeric)
+        if numeric != 'float':
+            return to_fixed_point(self._loads(res, cast=False)['data'], numeric)
+        return self._loads(res, endpoint=urls.FIFTYTWO_WEEK_LOW_URL,
+                           dates=DATE_FIELDS if parse_dates else None)['data']
     
     #############################
     ###       INDEX APIS      ###
     #############################
     
-    def get_index_quote(self, index="NIFTY 50"):
+    def get_index_quote(self, index="NIFTY 50", typed=False, fields=None, numeric='float'):
         """Gets the quote for a specific index from NSE.
 
         This function retrieves detailed quote information for a given index code from the
@@ -207,6 +277,11 @@ class Nse(AbstractBaseExchange):
 
         Args:
             index (str): The index code/symbol (e.g. "NIFTY 50", "BANKNIFTY", etc.)
+            typed (bool, optional): If True returns a slotted `IndexQuote` record instead
+                of a dict. Defaults to False.
+            fields (list[str], optional): Dotted paths like 'last' or 'percentChange'. If
+                provided, only these paths are extracted and cast, and a dict of path to
+                value is returned. Defaults to None.
 
         Returns:
             dict: A dictionary containing index quote details
@@ -233,6 +308,7 @@ class Nse(AbstractBaseExchange):
             }
         """
         
+        validate_output('records', typed, fields, numeric)
         url = urls.ALL_INDICES_URL
         all_index_quote = self.get_all_index_quote()
         index_list = [ i['indexSymbol'] for i in all_index_quote]
@@ -240,7 +316,13 @@ class Nse(AbstractBaseExchange):
         index = ' '.join(index.split())
         if index in index_list:
             response = list(filter(lambda idx: idx['indexSymbol'] == index, all_index_quote))[0]
-            return cast_intfloat_string_values_to_intfloat(response)
+            if typed:
+                return IndexQuote.from_raw(response)
+            if fields is not None:
+                return compile_fields(fields)(response)
+            if numeric != 'float':
+                return to_fixed_point(response, numeric)
+            return cast_with_plan(response, urls.ALL_INDICES_URL, inplace=True)
         else:
             raise Exception('Wrong index code')
     
@@ -261,16 +343,29 @@ class Nse(AbstractBaseExchange):
         """
         return [ i['indexSymbol'] for i in self.get_all_index_quote()]
     
-    def get_all_index_quote(self):
+    def get_all_index_quote(self, output='records', typed=False, fields=None, numeric='float'):
         """Gets information for all NSE indices in one request.
 
         This method fetches quotes and information for all available indices on the
         National Stock Exchange (NSE) through a single API call.
 
+        Args:
+            output (str, optional): One of 'records', 'numpy', 'pandas' or 'arrow'.
+                Defaults to 'records'.
+            typed (bool, optional): If True returns slotted `IndexQuote` records instead
+                of dicts, only with 'records' output. Defaults to False.
+            fields (list[str], optional): Dotted paths like 'last' or 'percentChange'. If
+                provided, only these paths are extracted and cast from every index, only with
+                untyped 'records' output. Defaults to None.
+            numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold prices and
+                percentages exactly as integers in units of 10**-scale / Decimal, see
+                nsetools.fixedpoint. Defaults to 'float'.
+
         Returns:
             list[dict]: A list of dictionaries where each dictionary contains quote
             information for an index. The quote information includes details like
-            index name, current value, change, percentage change etc.
+            index name, current value, change, percentage change etc. Columnar
+            equivalent is returned as per `output`.
 
         Example:
             >>> nse = Nse()
@@ -294,11 +389,23 @@ class Nse(AbstractBaseExchange):
             URLError: If there is an error accessing the NSE API endpoint
             ValueError: If the response JSON cannot be parsed properly
         """
+        validate_output(output, typed, fields, numeric)
         url = urls.ALL_INDICES_URL
         res = self.session.fetch(url)
-        return res.json()['data']
+        data = self._loads(res, cast=False)['data']
+        if output != 'records':
+            return records_to_columns(data, output, numeric=numeric)
+        if typed:
+            return [IndexQuote.from_raw(record) for record in data]
+        if fields is not None:
+            project = compile_fields(fields)
+            return [project(record) for record in data]
+        if numeric != 'float':
+            return to_fixed_point(data, numeric)
+        return data
     
-    def get_top_gainers(self, index="NIFTY"):
+    def get_top_gainers(self, index="NIFTY", output='records', typed=False, numeric='float',
+                        parse_dates=False):
         """Gets the list of top gaining stocks for the specified index.
 
         This function retrieves real-time data for stocks that have gained the most value
@@ -314,9 +421,20 @@ class Nse(AbstractBaseExchange):
             - SecLwr20: Securities lower than 20
             - FNO: Futures & Options
             - ALL: All stocks
+            output (str, optional): One of 'records', 'numpy', 'pandas' or 'arrow'.
+                Defaults to 'records'.
+            typed (bool, optional): If True returns slotted `MoverRecord` records instead
+                of dicts, only with 'records' output. Defaults to False.
+            numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold prices and
+                percentages exactly as integers in units of 10**-scale / Decimal, see
+                nsetools.fixedpoint. Defaults to 'float'.
+            parse_dates (bool, optional): If True the corporate action dates (ca_ex_dt) are
+                parsed to datetimes while the numbers are cast, only with untyped 'records'
+                output of float numbers. Defaults to False.
 
         Returns:
-            list[dict]: List of dictionaries containing top gainer details.
+            list[dict]: List of dictionaries containing top gainer details, or the
+            columnar equivalent as per `output`.
             
         Raises:
             ConnectionError: If unable to fetch data from NSE
@@ -342,9 +460,10 @@ class Nse(AbstractBaseExchange):
             'perChange': 3.93
             }
         """
-        return self._get_top_gainers_losers('gainers', index)
+        return self._get_top_gainers_losers('gainers', index, output, typed, numeric, parse_dates)
 
-    def get_top_losers(self, index="NIFTY"):  # Changed from None to "NIFTY"
+    def get_top_losers(self, index="NIFTY", output='records', typed=False, numeric='float',
+                       parse_dates=False):  # Changed from None to "NIFTY"
         """Gets the top losers from specified index from NSE.
 
         The function fetches real-time data for stocks that have declined the most in terms
@@ -360,6 +479,16 @@ class Nse(AbstractBaseExchange):
                     - SecLwr20
                     - FNO
                     - ALL
+            output (str, optional): One of 'records', 'numpy', 'pandas' or 'arrow'.
+                Defaults to 'records'.
+            typed (bool, optional): If True returns slotted `MoverRecord` records instead
+                of dicts, only with 'records' output. Defaults to False.
+            numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold prices and
+                percentages exactly as integers in units of 10**-scale / Decimal, see
+                nsetools.fixedpoint. Defaults to 'float'.
+            parse_dates (bool, optional): If True the corporate action dates (ca_ex_dt) are
+                parsed to datetimes while the numbers are cast, only with untyped 'records'
+                output of float numbers. Defaults to False.
 
         Returns:
             list: List of dictionaries containing stock information with following keys:
@@ -375,7 +504,7 @@ class Nse(AbstractBaseExchange):
             >>> losers[0]
             {'symbol': 'TATAMOTORS', 'series': 'EQ', 'openPrice': 375.0, ...}
         """
-        return self._get_top_gainers_losers('losers', index)  # Changed from 'gainers' to 'losers'
+        return self._get_top_gainers_losers('losers', index, output, typed, numeric, parse_dates)  # Changed from 'gainers' to 'losers'
     
     def get_advances_declines(self, index='nifty 50'):
         """Gets the advances/declines data for given index.
@@ -424,10 +553,11 @@ class Nse(AbstractBaseExchange):
         index = index.upper()
         url = urls.STOCKS_IN_INDEX_URL % index
         res = self.session.fetch(url)
-        res_dict = res.json()
+        res_dict = self._loads(res, cast=False)
         return  [stock['symbol'] for stock in res_dict['data']][1:]
     
-    def get_stock_quote_in_index(self, index="NIFTY 50", include_index=False):
+    def get_stock_quote_in_index(self, index="NIFTY 50", include_index=False, output='records', fields=None,
+                                 numeric='float'):
         """Gets stock quotes for all stocks in a given index.
         This function fetches real-time quotes for all stocks that are part of the specified index
         from NSE (National Stock Exchange).
@@ -436,8 +566,17 @@ class Nse(AbstractBaseExchange):
             include_index (bool, optional): Whether to include the index itself in results.
                 If True, includes both stocks and index. If False, returns only stocks.
                 Defaults to False.
+            output (str, optional): One of 'records', 'numpy', 'pandas' or 'arrow'.
+                Defaults to 'records'.
+            fields (list[str], optional): Dotted paths like 'lastPrice' or 'meta.industry'.
+                If provided, only these paths are extracted and cast from every stock, only
+                with 'records' output. Defaults to None.
+            numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold prices and
+                percentages exactly as integers in units of 10**-scale / Decimal, see
+                nsetools.fixedpoint. Defaults to 'float'.
         Returns:
-            list: A list of dictionaries containing stock quote data.
+            list: A list of dictionaries containing stock quote data, or the columnar
+                equivalent as per `output`.
                 Each dictionary contains various fields including:
                 - symbol: Stock symbol
                 - open: Opening price
@@ -456,22 +595,37 @@ class Nse(AbstractBaseExchange):
             >>> nifty_quotes_with_index = nse.get_stock_quote_in_index("NIFTY 50", include_index=True)
         """
         
+        validate_output(output, fields=fields, numeric=numeric)
         index = index.upper()
         url = urls.STOCKS_IN_INDEX_URL % index
         res = self.session.fetch(url)
-        res_dict = res.json()
-        res_dict = cast_intfloat_string_values_to_intfloat(res_dict)
+        if output != 'records' or fields is not None or numeric != 'float':
+            records = self._loads(res, cast=False)['data']
+            if include_index is False:
+                records = [record for record in records if record['priority'] == 0]
+            if fields is not None:
+                project = compile_fields(fields)
+                return [project(record) for record in records]
+            if output == 'records':
+                return to_fixed_point(records, numeric)
+            return records_to_columns(records, output, numeric=numeric)
+        res_dict = self._loads(res, endpoint=urls.STOCKS_IN_INDEX_URL)
         if include_index is False:
             return  [record for record in res_dict['data'] if record['priority'] == 0]
         else:
             return res_dict['data']
 
-    def _get_top_gainers_losers(self, direction, index):
+    def _get_top_gainers_losers(self, direction, index, output='records', typed=False, numeric='float',
+                                parse_dates=False):
         """Internal method to fetch top gainers or losers for a given index.
 
         Args:
             direction (str): Either 'gainers' or 'losers'
             index (str): Index name - one of NIFTY, BANKNIFTY, NIFTYNEXT50, SecGtr20, SecLwr20, FNO, ALL
+            output (str, optional): One of 'records', 'numpy', 'pandas' or 'arrow'
+            typed (bool, optional): If True returns `MoverRecord` records instead of dicts
+            numeric (str, optional): One of 'float', 'fixed' or 'decimal'
+            parse_dates (bool, optional): If True ca_ex_dt is parsed to datetimes
 
         Returns:
             list: List of dictionaries containing top gainers/losers data for the specified index
@@ -495,15 +649,23 @@ class Nse(AbstractBaseExchange):
         }.get(index)
         if index is None:
             raise ValueError("Index must be one of NIFTY 50, NIFTY BANK, NIFTY NEXT 50, SecGtr20, SecLwr20, FNO, ALL")
+        validate_output(output, typed, numeric=numeric, parse_dates=parse_dates)
         url = urls.TOP_GAINERS_URL if direction == 'gainers' else urls.TOP_LOSERS_URL
         res = self.session.fetch(url)
-        return cast_intfloat_string_values_to_intfloat(res.json())[index]['data']
+        if output != 'records':
+            return records_to_columns(self._loads(res, cast=False)[index]['data'], output, numeric=numeric)
+        if typed:
+            return [MoverRecord.from_raw(record) for record in self._loads(res, cast=False)[index]['data']]
+        if numeric != 'float':
+            return to_fixed_point(self._loads(res, cast=False)[index]['data'], numeric)
+        return self._loads(res, endpoint=url, dates=DATE_FIELDS if parse_dates else None)[index]['data']
 
     #############################
     ###    DERIVATIVE APIS    ###
     #############################
 
-    def get_future_quote(self, code, expiry_date=None):
+    def get_future_quote(self, code, expiry_date=None, output='records', typed=False, numeric='float',
+                         parse_dates=False):
         """Get future quote for given stock code.
 
         This function fetches futures trading data for a given stock code from NSE's derivatives segment.
@@ -514,10 +676,21 @@ class Nse(AbstractBaseExchange):
             code (str): Stock code for which futures data needs to be fetched
             expiry_date (str, optional): Expiry date in format DD-MMM-YYYY (e.g. "27-Mar-2025"). 
                            Defaults to None.
+            output (str, optional): One of 'records', 'numpy', 'pandas' or 'arrow'.
+                           Defaults to 'records'.
+            typed (bool, optional): If True returns slotted `FutureQuote` records instead of dicts,
+                           only with 'records' output. Defaults to False.
+            numeric (str, optional): 'float', or 'fixed' / 'decimal' to hold prices and
+                           percentages exactly as integers in units of 10**-scale / Decimal, see
+                           nsetools.fixedpoint. Defaults to 'float'.
+            parse_dates (bool, optional): If True expiryDate is parsed to a datetime while the
+                           numbers are cast, only with untyped 'records' output of float numbers.
+                           Defaults to False.
 
         Returns:
             Union[dict, list]: If expiry_date provided returns dict with futures data for that expiry,
-                      else returns list of dicts with data for all expiries.
+                      else returns list of dicts with data for all expiries. For columnar `output`
+                      one row per expiry is returned, limited to `expiry_date` if provided.
 
         Example:
             >>> nse = Nse()
@@ -534,46 +707,37 @@ class Nse(AbstractBaseExchange):
              {...}]
         """
 
+        validate_output(output, typed, numeric=numeric, parse_dates=parse_dates)
         url = urls.QUOTE_DRIVATIVE_URL % code.upper()
         res = self.session.fetch(url)
-        res_dict = res.json()
+        res_dict = self._loads(res, cast=False)
         # list containing all options and futures data
         data = res_dict['stocks']
         # filter out only future data
         future_data = [s for s in data if s['metadata']['instrumentType'] == "Stock Futures"]
+        if output != 'records':
+            if expiry_date:
+                future_data = [s for s in future_data if s['metadata']['expiryDate'] == expiry_date]
+            return build_columns(future_quote_columns(future_data), output, numeric=numeric)
+        if typed:
+            records = [FutureQuote.from_raw(record) for record in future_data]
+            if expiry_date:
+                return [record for record in records if record.expiryDate == expiry_date][0]
+            return records
         # future data is very convoluted, so flatten-out the desired data
-        # !! there is bug in spelling of the key 'dailyvolatility', it is not camel cased
-        # fixing that in my code for uniformity
-        filtered_data = [
-            {
-                'expiryDate': record['metadata']['expiryDate'],
-                'lastPrice': record['metadata']['lastPrice'],
-                'premium': record['metadata']['lastPrice'] - record['underlyingValue'],
-                'openPrice': record['metadata']['openPrice'],
-                'highPrice': record['metadata']['highPrice'],
-                'lowPrice': record['metadata']['lowPrice'],
-                'closePrice': record['metadata']['closePrice'],
-                'prevClose': record['metadata']['prevClose'],
-                'change': record['metadata']['change'],
-                'pChange': record['metadata']['pChange'],
-                'numberOfContractsTraded': record['metadata']['numberOfContractsTraded'],
-                'totalTurnover': record['metadata']['totalTurnover'],
-                'underlyingValue': record['underlyingValue'],
-                'tradedVolume': record['marketDeptOrderBook']['tradeInfo']['tradedVolume'],
-                'openInterest': record['marketDeptOrderBook']['tradeInfo']['openInterest'],
-                'changeInOpenInterest': record['marketDeptOrderBook']['tradeInfo']['changeinOpenInterest'],
-                'pchangeinOpenInterest': record['marketDeptOrderBook']['tradeInfo']['pchangeinOpenInterest'],
-                'marketLot': record['marketDeptOrderBook']['tradeInfo']['marketLot'],
-                'dailyVolatility': record['marketDeptOrderBook']['otherInfo']['dailyvolatility'],
-                'annualisedVolatility': record['marketDeptOrderBook']['otherInfo']['annualisedVolatility']
-            }
-            for record in future_data
-        ]
+        filtered_data = [flatten_future_quote(record) for record in future_data]
+        if numeric != 'float':
+            filtered_data = to_fixed_point(filtered_data, numeric)
+        else:
+            filtered_data = cast_with_plan(filtered_data, urls.QUOTE_DRIVATIVE_URL, inplace=True,
+                                           dates=DATE_FIELDS if parse_dates else None)
         # if expiry_date is provided, filter out data for that expiry date
         if expiry_date:
+            if parse_dates:
+                expiry_date = parse_datetime(expiry_date)
             # pick only the first record, there should be only one record for a given expiry date
             filtered_data = [record for record in filtered_data if record['expiryDate'] == expiry_date][0]
-        return cast_intfloat_string_values_to_intfloat(filtered_data)
+        return filtered_data
     
     def __str__(self):
         """Returns a string representation of the NSE driver class.
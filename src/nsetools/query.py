@@ -0,0 +1,357 @@
+"""
+Small query language to screen records, used by dict_to_table.
+
+A query combines comparisons of dotted paths with and, or, not and parentheses:
+
+    pChange > 2 and totalTradedVolume > 1e6
+    (lastPrice - open) / open * 100 >= 1.5 or series not in ('EQ', 'BE')
+    not meta.isFNOSec and 'EQ' in meta.activeSeries
+
+Paths and keywords are case-insensitive. Text is quoted, though on the right side of
+a comparison a bare word which is not a key of the record is taken as text, so the
+older single predicate queries like "symbol==INFY" keep working.
+
+A query is compiled once to a Python function, with an accessor per path which
+remembers the actual casing of the keys, and compiled queries are cached.
+"""
+import re
+import operator
+from functools import lru_cache
+
+_TOKEN = re.compile(r'''
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<name>[A-Za-z_]\w*(?:\.\w+)*)
+      | (?P<op>==|!=|>=|<=|=|>|<|\+|-|\*|/|%|\(|\)|\[|\]|,)
+    )''', re.VERBOSE)
+
+_COMPARISONS = {
+    '==': operator.eq, '=': operator.eq, '!=': operator.ne,
+    '>': operator.gt, '<': operator.lt, '>=': operator.ge, '<=': operator.le,
+}
+_ARITHMETIC = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul,
+    '/': operator.truediv, '%': operator.mod,
+}
+_CONSTANTS = {'true': True, 'false': False, 'none': None, 'null': None}
+_KEYWORDS = frozenset(['and', 'or', 'not', 'in'])
+_CONSTANT_NAME = re.compile(r'_c\d+\Z')
+
+# the single predicate syntax of the earlier dict_to_table, where the value is not quoted
+_LEGACY = re.compile(r'\s*([A-Za-z_][\w.]*)\s*(==|!=|>=|<=|>|<)\s*([^=<>!\s].*?)\s*\Z')
+
+
+def _tokenize(expr):
+    tokens = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        match = _TOKEN.match(expr, pos)
+        if match is None:
+            raise ValueError("Invalid query %r at position %d" % (expr, pos))
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'name' and text.lower() in _KEYWORDS:
+            kind, text = 'op', text.lower()
+        tokens.append((kind, text))
+        pos = match.end()
+    tokens.append(('end', None))
+    return tokens
+
+
+def _find_key(record, part):
+    part = part.lower()
+    for key in record:
+        if type(key) is str and key.lower() == part:
+            return key
+    return None
+
+
+class _Path():
+    """Case-insensitive accessor of a dotted path, remembering the keys it found."""
+    __slots__ = ('path', 'parts', 'keys', 'text')
+
+    def __init__(self, path, text=False):
+        self.path = path
+        self.parts = tuple(path.split('.'))
+        self.keys = list(self.parts)
+        # if True, a path of one part which is missing from the record is taken as text
+        self.text = text and len(self.parts) == 1
+
+    def __call__(self, record):
+        current = record
+        keys = self.keys
+        for i, part in enumerate(self.parts):
+            if isinstance(current, dict):
+                key = keys[i]
+                if key not in current:
+                    key = _find_key(current, part)
+                    if key is None:
+                        return self.path if self.text and i == 0 else None
+                    keys[i] = key
+                current = current[key]
+            elif isinstance(current, (list, tuple)) and part.isdigit():
+                index = int(part)
+                if index >= len(current):
+                    return None
+                current = current[index]
+            else:
+                return None
+        return current
+
+
+def _compare(op, left, right):
+    if left is None:
+        # missing values only match "== none"
+        return op is operator.eq and right is None
+    try:
+        return op(left, right)
+    except TypeError:
+        return False
+
+
+def _arithmetic(op, left, right):
+    if left is None or right is None:
+        return None
+    try:
+        return op(left, right)
+    except (TypeError, ZeroDivisionError):
+        return None
+
+
+def _contains(value, values):
+    if values is None or value is None:
+        return False
+    try:
+        return value in values
+    except TypeError:
+        return False
+
+
+def _not_contains(value, values):
+    # like "!=", missing values don't match "not in" either
+    if values is None or value is None:
+        return False
+    try:
+        return value not in values
+    except TypeError:
+        return False
+
+
+class _Compiler():
+    """Recursive descent parser emitting the source of the query function."""
+
+    def __init__(self, expr):
+        self.tokens = _tokenize(expr)
+        self.pos = 0
+        self.namespace = {'_compare': _compare, '_arithmetic': _arithmetic,
+                          '_contains': _contains, '_not_contains': _not_contains}
+        self.paths = {}
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def take(self, text=None):
+        kind, value = self.tokens[self.pos]
+        if text is not None and (kind != 'op' or value != text):
+            raise ValueError("Expected %r in query, found %r" % (text, value))
+        self.pos += 1
+        return kind, value
+
+    def accept(self, text):
+        kind, value = self.tokens[self.pos]
+        if kind == 'op' and value == text:
+            self.pos += 1
+            return True
+        return False
+
+    def constant(self, value):
+        name = '_c%d' % len(self.namespace)
+        self.namespace[name] = value
+        return name
+
+    def path(self, path, text=False):
+        key = (path, text)
+        if key not in self.paths:
+            name = '_p%d' % len(self.paths)
+            self.namespace[name] = _Path(path, text)
+            self.paths[key] = name
+        return '%s(record)' % self.paths[key]
+
+    def compile(self):
+        source = self.or_expr()
+        if self.peek()[0] != 'end':
+            raise ValueError("Unexpected %r in query" % (self.peek()[1],))
+        return source
+
+    def or_expr(self):
+        parts = [self.and_expr()]
+        while self.accept('or'):
+            parts.append(self.and_expr())
+        return parts[0] if len(parts) == 1 else '(%s)' % ' or '.join(parts)
+
+    def and_expr(self):
+        parts = [self.not_expr()]
+        while self.accept('and'):
+            parts.append(self.not_expr())
+        return parts[0] if len(parts) == 1 else '(%s)' % ' and '.join(parts)
+
+    def not_expr(self):
+        if self.accept('not'):
+            return '(not %s)' % self.not_expr()
+        return self.comparison()
+
+    def comparison(self):
+        left = self.arith()
+        kind, value = self.peek()
+        if kind == 'op' and value in _COMPARISONS:
+            self.take()
+            right = self.arith(text=True)
+            return '_compare(%s, %s, %s)' % (self.constant(_COMPARISONS[value]), left, right)
+        negate = False
+        if kind == 'op' and value == 'not' and self.tokens[self.pos + 1] == ('op', 'in'):
+            self.take()
+            negate = True
+        if self.accept('in'):
+            return '%s(%s, %s)' % ('_not_contains' if negate else '_contains', left, self.values())
+        return left
+
+    def values(self):
+        # literal lists are compiled to a set when their items are hashable
+        kind, value = self.peek()
+        if kind == 'op' and value in ('(', '['):
+            close = ')' if value == '(' else ']'
+            self.take()
+            items = []
+            while not self.accept(close):
+                if items:
+                    self.take(',')
+                    if self.accept(close):
+                        break
+                items.append(self.arith(text=True))
+            if all(_CONSTANT_NAME.match(item) for item in items):
+                values = tuple(self.namespace[item] for item in items)
+                try:
+                    return self.constant(frozenset(values))
+                except TypeError:
+                    return self.constant(values)
+            return '(%s,)' % ', '.join(items)
+        return self.arith()
+
+    def arith(self, text=False):
+        left = self.term(text)
+        while self.peek()[0] == 'op' and self.peek()[1] in ('+', '-'):
+            op = _ARITHMETIC[self.take()[1]]
+            left = '_arithmetic(%s, %s, %s)' % (self.constant(op), left, self.term())
+        return left
+
+    def term(self, text=False):
+        left = self.factor(text)
+        while self.peek()[0] == 'op' and self.peek()[1] in ('*', '/', '%'):
+            op = _ARITHMETIC[self.take()[1]]
+            left = '_arithmetic(%s, %s, %s)' % (self.constant(op), left, self.factor())
+        return left
+
+    def factor(self, text=False):
+        kind, value = self.take()
+        if kind == 'number':
+            number = float(value) if any(c in value for c in '.eE') else int(value)
+            return self.constant(number)
+        elif kind == 'string':
+            return self.constant(value[1:-1])
+        elif kind == 'name':
+            if value.lower() in _CONSTANTS:
+                return self.constant(_CONSTANTS[value.lower()])
+            return self.path(value, text)
+        elif kind == 'op' and value == '-':
+            operand = self.factor()
+            if _CONSTANT_NAME.match(operand) and type(self.namespace[operand]) in (int, float):
+                return self.constant(-self.namespace[operand])
+            return '_arithmetic(%s, %s, %s)' % (self.constant(operator.sub), self.constant(0), operand)
+        elif kind == 'op' and value == '(':
+            source = self.or_expr()
+            self.take(')')
+            return source
+        raise ValueError("Unexpected %r in query" % (value,))
+
+
+def _legacy_value(value):
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+class Query():
+    """A compiled query, see compile_query.
+    Calling it with a record returns True if the record matches.
+    """
+    __slots__ = ('expr', 'source', 'match')
+
+    def __init__(self, expr, source, match):
+        self.expr = expr
+        self.source = source
+        self.match = match
+
+    def __call__(self, record):
+        return bool(self.match(record))
+
+    def filter(self, records):
+        """Returns the records matching the query, in order."""
+        match = self.match
+        return [record for record in records if match(record)]
+
+    def __repr__(self):
+        return "Query(%r)" % self.expr
+
+
+@lru_cache(maxsize=1024)
+def compile_query(expr):
+    """Compiles a query to a Query. Compiled queries are cached by expression.
+    Args:
+        expr (str): Query, see the module documentation for the syntax.
+    Returns:
+        Query: Callable returning True for the records which match.
+    Raises:
+        ValueError: If the query is invalid.
+    Example:
+        >>> query = compile_query("pChange > 2 and totalTradedVolume > 1e6")
+        >>> query({'pChange': 2.5, 'totalTradedVolume': 1200000})
+        True
+    """
+    try:
+        compiler = _Compiler(expr)
+        source = compiler.compile()
+    except ValueError:
+        legacy = _LEGACY.match(expr)
+        if legacy is None or _KEYWORDS.intersection(legacy.group(3).lower().split()):
+            raise
+        path, op, value = legacy.groups()
+        compiler = _Compiler('')
+        source = '_compare(%s, %s, %s)' % (compiler.constant(_COMPARISONS[op]),
+                                           compiler.path(path),
+                                           compiler.constant(_legacy_value(value)))
+    code = "def match(record):\n    return %s\n" % source
+    exec(code, compiler.namespace)
+    return Query(expr, source, compiler.namespace['match'])
+
+
+def filter(records, expr):
+    """Returns the records matching the query `expr`, in order.
+    Args:
+        records (list[dict]): Records, like the ones returned by Nse APIs.
+        expr (Union[str, Query]): Query, or one compiled with compile_query.
+    Returns:
+        list[dict]: Matching records.
+    Raises:
+        ValueError: If the query is invalid.
+    Example:
+        >>> filter(nse.get_stock_quote_in_index(), "pChange > 2 and series in ('EQ', 'BE')")
+    """
+    if not isinstance(expr, Query):
+        expr = compile_query(expr)
+    return expr.filter(records)
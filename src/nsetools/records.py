@@ -0,0 +1,147 @@
+"""
+Slotted typed records for quotes, produced by the `typed=True` mode of Nse APIs.
+
+A dict per quote repeats every key and carries a hash table, a record class with
+__slots__ stores only the values. Constructors are generated from the field
+mappings, so building a record is a single call without per field lookups
+in Python loops.
+"""
+from nsetools.fields import FUTURE_QUOTE_FIELDS
+from nsetools.utils import cast_intfloat_string_value
+
+
+def _future_premium(raw):
+    return raw['metadata']['lastPrice'] - raw['underlyingValue']
+
+
+class Record():
+    """Base class of all the typed records.
+
+    Subclasses are created with `make_record` and carry:
+        _fields: attribute names in order.
+        _layout: for every field, path of keys at which it is placed by to_dict().
+    """
+    __slots__ = ()
+    _fields = ()
+    _layout = ()
+
+    def to_dict(self):
+        """Returns the record as a dict, in the same shape as the dict mode of the API."""
+        data = {}
+        for name, path in zip(self._fields, self._layout):
+            node = data
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = getattr(self, name)
+        return data
+
+    def __iter__(self):
+        for name in self._fields:
+            yield getattr(self, name)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ", ".join("%s=%r" % (name, getattr(self, name)) for name in self._fields)
+        return "%s(%s)" % (self.__class__.__name__, values)
+
+
+def make_record(name, fields, nested=False, doc=None):
+    """Creates a slotted record class with a generated constructor.
+    Args:
+        name (str): Name of the class.
+        fields (tuple): (attribute, source) pairs where source is a tuple of keys to reach
+            the value in the raw NSE record, or a callable which derives it from the raw record.
+        nested (bool, optional): If True, to_dict() rebuilds the nested shape of the source,
+            else it returns a flat dict. Defaults to False.
+        doc (str, optional): Docstring of the class.
+    Returns:
+        type: Subclass of Record with a `from_raw(raw, round_digits=2)` classmethod which
+            builds the record from a raw NSE record, casting values the same way as
+            cast_intfloat_string_values_to_intfloat.
+    """
+    names = tuple(attr for attr, _ in fields)
+    namespace = {'_cast': cast_intfloat_string_value}
+    init_lines = ["def __init__(self, %s):" % ", ".join("%s=None" % n for n in names)]
+    init_lines += ["    self.%s = %s" % (n, n) for n in names] or ["    pass"]
+
+    raw_lines = ["def from_raw(cls, raw, round_digits=2):"]
+    args = []
+    for i, (attr, source) in enumerate(fields):
+        if callable(source):
+            namespace['_derive%d' % i] = source
+            expr = "_derive%d(raw)" % i
+        else:
+            expr = "raw"
+            for key in source[:-1]:
+                expr = "%s.get(%r, _EMPTY)" % (expr, key)
+            expr = "%s.get(%r)" % (expr, source[-1])
+        args.append("_cast(%s, round_digits)" % expr)
+    raw_lines.append("    return cls(%s)" % ", ".join(args))
+    namespace['_EMPTY'] = {}
+    exec("\n".join(init_lines) + "\n\n" + "\n".join(raw_lines), namespace)
+
+    layout = tuple(
+        source if nested and not callable(source) else (attr,) for attr, source in fields)
+    cls = type(name, (Record,), {
+        '__slots__': names,
+        '__doc__': doc,
+        '__init__': namespace['__init__'],
+        'from_raw': classmethod(namespace['from_raw']),
+        '_fields': names,
+        '_layout': layout,
+    })
+    return cls
+
+
+Quote = make_record('Quote', (
+    ('lastPrice', ('lastPrice',)),
+    ('change', ('change',)),
+    ('pChange', ('pChange',)),
+    ('previousClose', ('previousClose',)),
+    ('open', ('open',)),
+    ('close', ('close',)),
+    ('vwap', ('vwap',)),
+    ('stockIndClosePrice', ('stockIndClosePrice',)),
+    ('lowerCP', ('lowerCP',)),
+    ('upperCP', ('upperCP',)),
+    ('pPriceBand', ('pPriceBand',)),
+    ('basePrice', ('basePrice',)),
+    ('intraDayLow', ('intraDayHighLow', 'min')),
+    ('intraDayHigh', ('intraDayHighLow', 'max')),
+    ('intraDayValue', ('intraDayHighLow', 'value')),
+    ('weekLow', ('weekHighLow', 'min')),
+    ('weekLowDate', ('weekHighLow', 'minDate')),
+    ('weekHigh', ('weekHighLow', 'max')),
+    ('weekHighDate', ('weekHighLow', 'maxDate')),
+    ('weekValue', ('weekHighLow', 'value')),
+    ('weekLowDateFormat', ('weekHighLow', 'minDateFormat')),
+    ('weekHighDateFormat', ('weekHighLow', 'maxDateFormat')),
+    ('iNavValue', ('iNavValue',)),
+    ('checkINAV', ('checkINAV',)),
+    ('tickSize', ('tickSize',)),
+    ('ieq', ('ieq',)),
+), nested=True, doc="Price info of a stock quote, see Nse.get_quote")
+
+IndexQuote = make_record('IndexQuote', tuple((key, (key,)) for key in (
+    'key', 'index', 'indexSymbol', 'last', 'variation', 'percentChange', 'open', 'high',
+    'low', 'previousClose', 'yearHigh', 'yearLow', 'indicativeClose', 'pe', 'pb', 'dy',
+    'declines', 'advances', 'unchanged', 'perChange365d', 'date365dAgo', 'perChange30d',
+    'date30dAgo', 'previousDay', 'oneWeekAgo', 'oneMonthAgo', 'oneYearAgo',
+    'chart365dPath', 'chart30dPath', 'chartTodayPath',
+)), doc="Quote of an index, see Nse.get_index_quote")
+
+FutureQuote = make_record('FutureQuote', tuple(
+    (attr, _future_premium if path is None else path) for attr, path in FUTURE_QUOTE_FIELDS
+), doc="Quote of a stock future for one expiry, see Nse.get_future_quote")
+
+MoverRecord = make_record('MoverRecord', tuple((key, (key,)) for key in (
+    'symbol', 'series', 'open_price', 'high_price', 'low_price', 'ltp', 'prev_price',
+    'net_price', 'trade_quantity', 'turnover', 'market_type', 'ca_ex_dt', 'ca_purpose',
+    'perChange',
+)), doc="Top gainer or loser record, see Nse.get_top_gainers")
@@ -0,0 +1,132 @@
+"""
+Intraday scanners over the quotes of the stocks of an index.
+
+The open=high/open=low scan looks for stocks which opened at their low of the day
+(longs) or at their high (shorts), ranked by their position in the day's range
+(pir): how far the last price is from the open, in percent of the range, drawn as
+a sparkline of where it stands:
+
+    symbol   open    high    low     last    pir    graph
+    INFY     1900.0  1950.0  1900.0  1940.0  80.0   .......^..
+
+Quotes are taken from get_stock_quote_in_index, whose 'SECURITIES IN F&O' index is
+the F&O universe, and everything is computed on NumPy columns.
+
+Example:
+    >>> scan = scan_open_high_low(nse, 'SECURITIES IN F&O')
+    >>> [stock['symbol'] for stock in scan['longs'][:5]]
+"""
+from nsetools.columnar import MISSING_VALUES
+
+# paths of the quotes of get_stock_quote_in_index the scans use, and their columns
+QUOTE_FIELDS = {'symbol': 'symbol', 'open': 'open', 'high': 'dayHigh', 'low': 'dayLow',
+                'last': 'lastPrice'}
+
+GRAPH_WIDTH = 10
+SCAN_OUTPUTS = ('records', 'numpy', 'pandas')
+
+
+def quote_columns(quotes):
+    """Returns the symbol, open, high, low and last columns of quotes as NumPy arrays,
+    NaN for the missing prices.
+    Args:
+        quotes (list[dict]): Quotes of get_stock_quote_in_index.
+    Returns:
+        dict: Column name to array.
+    """
+    import numpy as np
+    columns = {'symbol': np.array([quote.get('symbol') for quote in quotes], dtype=object)}
+    for name, path in QUOTE_FIELDS.items():
+        if name != 'symbol':
+            values = [quote.get(path) for quote in quotes]
+            columns[name] = np.array([float('nan') if value is None or value in MISSING_VALUES else value
+                                      for value in values], dtype='float64')
+    return columns
+
+
+def sparklines(pir, width=GRAPH_WIDTH):
+    """Returns the sparkline of each position in range: `width` dots with a '^' in the
+    tenth of the range of the position, all dots for 0 or NaN.
+    Example:
+        >>> sparklines(np.array([80.0, 5.0]))
+        array(['.......^..', '..........'], dtype=object)
+    """
+    import numpy as np
+    # one line per slot, the slot of a position in range being its rounded tenth
+    lines = np.array(['.' * width] + ['.' * (i - 1) + '^' + '.' * (width - i) for i in range(1, width + 1)],
+                     dtype=object)
+    slots = np.round(np.nan_to_num(pir, nan=0.0) * width / 100)
+    return lines[np.clip(slots, 0, width).astype('int64')]
+
+
+def _scan(columns, match, pir, decimals):
+    import numpy as np
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pir = np.round(pir[match], decimals)
+    # ranked by position in range, the flat ones without a range last
+    order = np.argsort(np.where(np.isnan(pir), np.inf, -pir), kind='stable')
+    result = {name: np.round(values[match][order], decimals) if values.dtype.kind == 'f'
+              else values[match][order] for name, values in columns.items()}
+    result['pir'] = pir[order]
+    result['graph'] = sparklines(result['pir'])
+    return result
+
+
+def _to_output(columns, output):
+    if output == 'numpy':
+        return columns
+    if output == 'pandas':
+        import pandas as pd
+        return pd.DataFrame(columns)
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*[columns[name].tolist() for name in names])]
+
+
+def open_high_low(quotes, tolerance=0.0, output='records', decimals=2):
+    """Scans quotes for the stocks which opened at their low (longs) or high (shorts).
+    Args:
+        quotes (Union[list[dict], dict]): Quotes of get_stock_quote_in_index, or the
+            columns of quote_columns.
+        tolerance (float, optional): Distance of the open from the low or high, in percent
+            of the open, up to which they are taken as equal. Defaults to 0.
+        output (str, optional): One of 'records', 'numpy' or 'pandas'. Defaults to 'records'.
+        decimals (int, optional): Decimals of the prices and pir. Defaults to 2.
+    Returns:
+        dict: 'longs' and 'shorts', with their symbol, open, high, low, last, their
+            position in range 'pir' and its 'graph', by decreasing pir.
+    Raises:
+        ValueError: If `output` is not supported.
+    Example:
+        >>> scan = open_high_low(nse.get_stock_quote_in_index('NIFTY 50'))
+        >>> scan['longs'][0]
+        {'symbol': 'INFY', 'open': 1900.0, 'high': 1950.0, 'low': 1900.0, 'last': 1940.0,
+         'pir': 80.0, 'graph': '.......^..'}
+    """
+    import numpy as np
+    if output not in SCAN_OUTPUTS:
+        raise ValueError("output must be one of %s" % ", ".join(SCAN_OUTPUTS))
+    columns = quote_columns(quotes) if isinstance(quotes, list) else quotes
+    open_, high, low, last = columns['open'], columns['high'], columns['low'], columns['last']
+    margin = np.abs(open_) * tolerance / 100
+    with np.errstate(invalid='ignore', divide='ignore'):
+        span = high - low
+        longs = _scan(columns, np.abs(open_ - low) <= margin, (last - low) * 100 / span, decimals)
+        shorts = _scan(columns, np.abs(open_ - high) <= margin, (high - last) * 100 / span, decimals)
+    return {'longs': _to_output(longs, output), 'shorts': _to_output(shorts, output)}
+
+
+def scan_open_high_low(nse=None, index='SECURITIES IN F&O', tolerance=0.0, output='records', decimals=2):
+    """Fetches the quotes of the stocks of an index and scans them, see open_high_low.
+    Only the fields the scan uses are extracted from the response.
+    Args:
+        nse (Nse, optional): Nse instance. Defaults to a new one.
+        index (str, optional): Index, like 'NIFTY 50' or 'NIFTY BANK'. Defaults to
+            'SECURITIES IN F&O', the stocks of the F&O segment.
+    Returns:
+        dict: 'longs' and 'shorts', see open_high_low.
+    """
+    if nse is None:
+        from nsetools.nse import Nse
+        nse = Nse()
+    quotes = nse.get_stock_quote_in_index(index, fields=list(QUOTE_FIELDS.values()))
+    return open_high_low(quotes, tolerance, output, decimals)
@@ -0,0 +1,176 @@
+"""
+Market hours aware scheduling for pollers built on top of Nse
+"""
+import datetime as dt
+from time import sleep
+from nsetools.datemgr import default_calendar
+
+# NSE runs on Indian Standard Time, which has no daylight saving.
+IST = dt.timezone(dt.timedelta(hours=5, minutes=30), 'IST')
+
+PRE_OPEN = 'pre-open'
+CONTINUOUS = 'continuous'
+CLOSING = 'closing'
+CLOSED = 'closed'
+
+# phase name with its start and end time (IST) on a trading day
+SESSION_PHASES = (
+    (PRE_OPEN, dt.time(9, 0), dt.time(9, 15)),
+    (CONTINUOUS, dt.time(9, 15), dt.time(15, 30)),
+    (CLOSING, dt.time(15, 30), dt.time(16, 0)),
+)
+
+
+class MarketScheduler():
+    """Knows the NSE trading calendar and session phases and uses them to adapt
+    cache TTLs and polling intervals.
+
+    During pre-open and continuous trading, the base TTL and interval are used
+    as they are. During the closing session they are stretched by
+    `closing_factor`. Once the market is closed every response is frozen until
+    the next pre-open, so cached responses stay fresh and pollers sleep until
+    the next phase boundary.
+
+    Example:
+        >>> scheduler = MarketScheduler()
+        >>> scheduler.phase()
+        'continuous'
+        >>> for at, phase in scheduler.ticks(interval=30):
+        ...     quote = nse.get_quote('infy')
+    """
+
+    def __init__(self, closing_factor=4, clock=None, calendar=None):
+        """Initialize the scheduler.
+        Args:
+            closing_factor (int, optional): Multiplier applied to TTLs and polling intervals
+                during the closing session. Defaults to 4.
+            clock (callable, optional): Function returning the current time, useful for tests
+                and backtests. Defaults to the system clock.
+            calendar (TradingCalendar, optional): Trading calendar. Defaults to the one of the
+                holiday lists shipped with nsetools.
+        """
+        self.closing_factor = closing_factor
+        self.clock = clock or dt.datetime.now
+        self.calendar = calendar or default_calendar()
+
+    def now(self):
+        """Returns the current time as a timezone aware IST datetime."""
+        return self._to_ist(self.clock())
+
+    def _to_ist(self, at):
+        # naive datetimes are taken as system local time, same as dt.datetime.now()
+        return at.astimezone(IST)
+
+    def is_trading_day(self, d):
+        """Returns True if the market is open on the given date.
+        Args:
+            d (date): Date to check.
+        """
+        return self.calendar.is_trading_day(d)
+
+    def next_trading_day(self, d):
+        """Returns the first trading day strictly after the given date."""
+        return self.calendar.next_trading_day(d)
+
+    def previous_trading_day(self, d):
+        """Returns the last trading day strictly before the given date."""
+        return self.calendar.previous_trading_day(d)
+
+    def _boundaries(self, d):
+        """Returns the sorted phase boundaries of a trading day as IST datetimes."""
+        times = [SESSION_PHASES[0][1]] + [end for _, _, end in SESSION_PHASES]
+        return [dt.datetime.combine(d, t, tzinfo=IST) for t in times]
+
+    def phase(self, at=None):
+        """Returns the session phase at the given time.
+        Args:
+            at (datetime, optional): Time to check. Defaults to now.
+        Returns:
+            str: One of PRE_OPEN, CONTINUOUS, CLOSING or CLOSED.
+        """
+        at = self.now() if at is None else self._to_ist(at)
+        if not self.is_trading_day(at.date()):
+            return CLOSED
+        t = at.timetz().replace(tzinfo=None)
+        for name, start, end in SESSION_PHASES:
+            if start <= t < end:
+                return name
+        return CLOSED
+
+    def phase_start(self, at=None):
+        """Returns the time at which the current phase started."""
+        at = self.now() if at is None else self._to_ist(at)
+        d = at.date()
+        if self.is_trading_day(d):
+            started = [b for b in self._boundaries(d) if b <= at]
+            if started:
+                return started[-1]
+        return self._boundaries(self.previous_trading_day(d))[-1]
+
+    def next_boundary(self, at=None):
+        """Returns the time of the next phase change.
+        Args:
+            at (datetime, optional): Reference time. Defaults to now.
+        Returns:
+            datetime: Timezone aware IST datetime of the next phase boundary.
+        """
+        at = self.now() if at is None else self._to_ist(at)
+        d = at.date()
+        if self.is_trading_day(d):
+            for boundary in self._boundaries(d):
+                if boundary > at:
+                    return boundary
+        return self._boundaries(self.next_trading_day(d))[0]
+
+    def ttl(self, base, at=None):
+        """Returns the cache TTL in seconds for the current phase.
+        Args:
+            base (int): TTL used during market hours.
+            at (datetime, optional): Reference time. Defaults to now.
+        """
+        at = self.now() if at is None else self._to_ist(at)
+        phase = self.phase(at)
+        if phase == CLOSED:
+            return max(base, (self.next_boundary(at) - at).total_seconds())
+        elif phase == CLOSING:
+            return base * self.closing_factor
+        return base
+
+    def interval(self, base, at=None):
+        """Returns how long a poller should sleep, never crossing a phase boundary.
+        Args:
+            base (int): Polling interval used during market hours.
+            at (datetime, optional): Reference time. Defaults to now.
+        """
+        at = self.now() if at is None else self._to_ist(at)
+        until_boundary = (self.next_boundary(at) - at).total_seconds()
+        return min(self.ttl(base, at), until_boundary)
+
+    def is_fresh(self, cached_at, base, at=None):
+        """Checks whether a response cached at `cached_at` can still be served.
+        Outside market hours a response cached after the market closed stays
+        fresh until the next pre-open, irrespective of its age.
+        Args:
+            cached_at (datetime): Time at which the response was cached.
+            base (int): TTL used during market hours.
+            at (datetime, optional): Reference time. Defaults to now.
+        """
+        at = self.now() if at is None else self._to_ist(at)
+        cached_at = self._to_ist(cached_at)
+        if self.phase(at) == CLOSED and cached_at >= self.phase_start(at):
+            return True
+        ttl = base * self.closing_factor if self.phase(at) == CLOSING else base
+        return (at - cached_at).total_seconds() < ttl
+
+    def ticks(self, interval):
+        """Generator which wakes up once per polling interval and exactly at every
+        phase boundary.
+        Args:
+            interval (int): Polling interval in seconds during market hours.
+        Yields:
+            tuple: (datetime, phase) at every wake up.
+        """
+        while True:
+            at = self.now()
+            yield at, self.phase(at)
+            sleep(self.interval(interval, self.now()))
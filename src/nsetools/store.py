@@ -0,0 +1,714 @@
+"""
+Columnar store of bhavcopies, to analyse years of end of day data without
+parsing CSVs again.
+
+Each bhavcopy is ingested once into a date partition holding one NumPy .npy
+file per column. Text columns (symbol, series and ISIN) are dictionary
+encoded as int32 codes, the dictionaries being shared by all partitions, and
+the other columns are float64 or int64. Partitions are read memory-mapped, so
+loading a column of a date range costs a file open per date.
+
+    directory/
+        dictionaries/symbol.json, series.json, isin.json
+        2025/2025-01-24/symbol.npy, open.npy, ..., isin.npy
+
+A secondary SymbolIndex, kept up to date as partitions are written, maps every
+security to its rows across partitions, so the history of one symbol is read
+by direct offsets into the partitions of the dates asked for.
+History can be adjusted for splits and bonuses with the corporate actions table
+kept in the store, see nsetools.corporate_actions.
+
+FnoBhavcopyStore holds the F&O bhavcopies the same way, with the rows of each
+partition sorted by underlying, expiry, instrument, option type and strike, and
+an index of the row range of each contract group, so that the contracts asked
+for are read by range scans.
+
+Example:
+    >>> store = BhavcopyStore('/data/bhavcopy-store')
+    >>> store.ingest_directory('/data/bhavcopy')
+    >>> data = store.load_range('01-01-2015', '31-12-2024', columns=['symbol', 'close'])
+    >>> data['close'][data['symbol'] == store.symbol_code('INFY')]
+    >>> store.history('INFY', '01-01-2015', '31-12-2024')['close']
+"""
+import os
+import csv
+import json
+import shutil
+import datetime as dt
+from nsetools.datemgr import mkdate, match_datetime
+from nsetools.corporate_actions import CorporateActions
+
+# output column, column of the legacy bhavcopy CSV and kind: dictionary 'code', 'float', 'int'
+# or 'date'
+BHAVCOPY_COLUMNS = (
+    ('symbol', 'SYMBOL', 'code'),
+    ('series', 'SERIES', 'code'),
+    ('open', 'OPEN', 'float'),
+    ('high', 'HIGH', 'float'),
+    ('low', 'LOW', 'float'),
+    ('close', 'CLOSE', 'float'),
+    ('last', 'LAST', 'float'),
+    ('prev_close', 'PREVCLOSE', 'float'),
+    ('traded_quantity', 'TOTTRDQTY', 'int'),
+    ('turnover', 'TOTTRDVAL', 'float'),
+    ('trades', 'TOTALTRADES', 'int'),
+    ('isin', 'ISIN', 'code'),
+)
+
+# columns of the F&O bhavcopy, whose partitions are sorted by FNO_KEY
+FNO_COLUMNS = (
+    ('instrument', 'INSTRUMENT', 'code'),
+    ('symbol', 'SYMBOL', 'code'),
+    ('expiry', 'EXPIRY_DT', 'date'),
+    ('strike', 'STRIKE_PR', 'float'),
+    ('option_type', 'OPTION_TYP', 'code'),
+    ('open', 'OPEN', 'float'),
+    ('high', 'HIGH', 'float'),
+    ('low', 'LOW', 'float'),
+    ('close', 'CLOSE', 'float'),
+    ('settle_price', 'SETTLE_PR', 'float'),
+    ('contracts', 'CONTRACTS', 'int'),
+    ('value_lakh', 'VAL_INLAKH', 'float'),
+    ('open_interest', 'OPEN_INT', 'int'),
+    ('change_in_oi', 'CHG_IN_OI', 'int'),
+)
+# sort order of the rows of an F&O partition, the contracts of an underlying, expiry,
+# instrument and option type being contiguous and sorted by strike
+FNO_KEY = ('symbol', 'expiry', 'instrument', 'option_type', 'strike')
+# a group of contracts of an F&O partition, whose rows are start:stop
+GROUP_DTYPE = [('symbol', '<i4'), ('expiry', '<M8[D]'), ('instrument', '<i4'), ('option_type', '<i4'),
+               ('start', '<i8'), ('stop', '<i8')]
+
+DTYPES = {'code': 'int32', 'float': 'float64', 'int': 'int64', 'date': 'datetime64[D]'}
+
+# value of codes and int columns missing from a bhavcopy, like TOTALTRADES and ISIN in
+# the older ones. missing floats are NaN and missing dates NaT.
+MISSING = -1
+
+# file holding the number of partitions written to a store, which moves on with every
+# ingest, so that results computed from a store can be cached against it
+GENERATION_FILE = 'generation'
+
+# series of equities, in order of preference when a security has rows in both on a day
+EQUITY_SERIES = ('EQ', 'BE')
+HISTORY_COLUMNS = ('open', 'high', 'low', 'close', 'last', 'prev_close', 'traded_quantity')
+
+# a row of the SymbolIndex. entity is the ISIN code of the security, or -(symbol code + 2)
+# in the bhavcopies without ISIN.
+POSTING_DTYPE = [('entity', '<i8'), ('date', '<i4'), ('row', '<i4'), ('symbol', '<i4'), ('series', '<i4')]
+
+
+class Dictionary():
+    """Append only mapping of text values to int codes, saved as a JSON list."""
+
+    def __init__(self, path):
+        self.path = path
+        self.values = []
+        if os.path.exists(path):
+            with open(path) as fh:
+                self.values = json.load(fh)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        """Returns the code of `value`, adding it if new. Empty values are MISSING."""
+        if not value:
+            return MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self.dirty = True
+        return code
+
+    def save(self):
+        if self.dirty:
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as fh:
+                json.dump(self.values, fh)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+
+def _data_offset(fd):
+    # offset of the data of an open .npy file: magic string and version, then the header
+    # length on 2 bytes in version 1, 4 after
+    head = os.pread(fd, 12, 0)
+    if head[6] == 1:
+        return 10 + int.from_bytes(head[8:10], 'little')
+    return 12 + int.from_bytes(head[8:12], 'little')
+
+
+def _read_rows(path, row, count, itemsize):
+    # bytes of `count` values of a .npy column from `row` on, read by offset: mapping the
+    # file costs more than reading it when only a few rows are needed
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.pread(fd, count * itemsize, _data_offset(fd) + row * itemsize)
+    finally:
+        os.close(fd)
+
+
+def _gather_rows(path, rows, itemsize):
+    # bytes of the values of a .npy column at some rows, opening the file once for all
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        offset = _data_offset(fd)
+        return b''.join([os.pread(fd, itemsize, offset + row * itemsize) for row in rows])
+    finally:
+        os.close(fd)
+
+
+class SymbolIndex():
+    """Secondary index of a BhavcopyStore, locating the rows of every security across
+    partitions.
+
+    A security is identified by its ISIN, so that its history survives symbol renames
+    and series changes, and by its symbol in the bhavcopies without ISIN. The rows of
+    each partition are appended to a log on disk as it is written. When first queried,
+    the log is sorted by security and date, after which the rows of a security within
+    a date range are found by binary search.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._postings = None
+
+    def append(self, d, symbol, series, isin, replace=False):
+        """Adds the rows of the partition of date `d`. With `replace` the rows of a
+        previous partition of the same date are dropped, which rewrites the log."""
+        import numpy as np
+        symbol = np.asarray(symbol, dtype='int64')
+        isin = np.asarray(isin, dtype='int64')
+        postings = np.empty(len(symbol), dtype=POSTING_DTYPE)
+        postings['entity'] = np.where(isin >= 0, isin, -(symbol + 2))
+        postings['date'] = d.toordinal()
+        postings['row'] = np.arange(len(symbol))
+        postings['symbol'] = symbol
+        postings['series'] = series
+        if replace and os.path.exists(self.path):
+            existing = np.fromfile(self.path, dtype=POSTING_DTYPE)
+            existing = existing[existing['date'] != d.toordinal()]
+            tmp = self.path + '.tmp'
+            np.concatenate([existing, postings]).tofile(tmp)
+            os.replace(tmp, self.path)
+        else:
+            with open(self.path, 'ab') as fh:
+                postings.tofile(fh)
+        self._postings = None
+
+    def _load(self):
+        import numpy as np
+        if self._postings is None:
+            if os.path.exists(self.path):
+                postings = np.fromfile(self.path, dtype=POSTING_DTYPE)
+            else:
+                postings = np.empty(0, dtype=POSTING_DTYPE)
+            postings = postings[np.lexsort((postings['date'], postings['entity']))]
+            entities, starts = np.unique(postings['entity'], return_index=True)
+            self._postings = postings
+            self._entities = entities
+            self._bounds = np.append(starts, len(postings))
+            by_symbol = postings[np.lexsort((postings['date'], postings['symbol']))]
+            self._by_symbol = by_symbol[['symbol', 'date', 'entity']]
+        return self._postings
+
+    def entity_rows(self, entity, start, end):
+        """Returns the rows of a security between two date ordinals, both included."""
+        import numpy as np
+        postings = self._load()
+        i = np.searchsorted(self._entities, entity)
+        if i == len(self._entities) or self._entities[i] != entity:
+            return postings[:0]
+        rows = postings[self._bounds[i]:self._bounds[i + 1]]
+        lo, hi = np.searchsorted(rows['date'], [start, end + 1])
+        return rows[lo:hi]
+
+    def symbol_entities(self, symbol):
+        """Returns the (date, entity) rows of a symbol code, sorted by date."""
+        import numpy as np
+        self._load()
+        lo, hi = np.searchsorted(self._by_symbol['symbol'], [symbol, symbol + 1])
+        return self._by_symbol[lo:hi][['date', 'entity']]
+
+    def rows(self, symbol=None, isin=None, start=0, end=dt.date.max.toordinal()):
+        """Returns the rows of a security between two date ordinals, sorted by date.
+        Args:
+            symbol (int, optional): Symbol code. The security is the one the symbol had as of
+                `end`, so a symbol reused by another company doesn't mix both histories.
+            isin (int, optional): ISIN code, taking precedence over the symbol.
+            start, end (int): Date ordinals.
+        Returns:
+            numpy.ndarray: Rows of POSTING_DTYPE, for all the symbols the security had.
+        """
+        import numpy as np
+        symbols = set()
+        if isin is None and symbol is not None:
+            seen = self.symbol_entities(symbol)
+            seen = seen[(seen['date'] <= end) & (seen['entity'] >= 0)]
+            if len(seen):
+                isin = int(seen['entity'][-1])
+            else:
+                symbols.add(symbol)
+        if isin is not None:
+            # the symbols the security had, whose rows without ISIN may belong to it as well
+            symbols.update(np.unique(self.entity_rows(isin, 0, dt.date.max.toordinal())['symbol']).tolist())
+        parts = []
+        for code in sorted(symbols):
+            part = self.entity_rows(-(code + 2), start, end)
+            seen = self.symbol_entities(code)
+            seen = seen[seen['entity'] >= 0]
+            if isin is not None and len(part) and len(seen):
+                # rows without ISIN belong to the security the symbol had next, or last
+                after = np.minimum(np.searchsorted(seen['date'], part['date'], side='right'), len(seen) - 1)
+                part = part[seen['entity'][after] == isin]
+            parts.append(part)
+        if isin is not None:
+            parts.append(self.entity_rows(isin, start, end))
+        rows = np.concatenate(parts) if parts else self._load()[:0]
+        return rows[np.argsort(rows['date'], kind='stable')]
+
+
+def _float(value):
+    value = value.strip()
+    return float(value) if value else float('nan')
+
+
+def _int(value):
+    value = value.strip()
+    return int(float(value)) if value else MISSING
+
+
+def _date(value):
+    parsed = match_datetime(value.strip())
+    return parsed.date() if parsed is not None else None
+
+
+_CONVERTERS = {'float': _float, 'int': _int, 'date': _date}
+_MISSING_VALUES = {'float': float('nan'), 'int': MISSING, 'code': MISSING, 'date': None}
+
+
+class BhavcopyStore():
+    """Columnar, memory-mapped store of bhavcopies partitioned by date.
+    Args:
+        directory (str): Directory of the store, created if needed.
+        columns (tuple, optional): Columns as (name, CSV column, kind) tuples. Defaults to
+            BHAVCOPY_COLUMNS.
+    """
+
+    def __init__(self, directory, columns=BHAVCOPY_COLUMNS):
+        self.directory = directory
+        self.columns = columns
+        os.makedirs(os.path.join(directory, 'dictionaries'), exist_ok=True)
+        self.dictionaries = {
+            name: Dictionary(os.path.join(directory, 'dictionaries', name + '.json'))
+            for name, _, kind in columns if kind == 'code'
+        }
+        self._dates = None
+        self.index = SymbolIndex(os.path.join(directory, 'index.bin'))
+        self.actions = CorporateActions(os.path.join(directory, 'corporate_actions.json'))
+        if 'isin' in self.dictionaries and not os.path.exists(self.index.path) and self.dates():
+            # store written before the index existed
+            self.rebuild_index()
+
+    def partition_path(self, d):
+        """Returns the directory of the partition of the given date."""
+        return os.path.join(self.directory, str(d.year), d.isoformat())
+
+    def dates(self):
+        """Returns the sorted dates ingested so far."""
+        if self._dates is None:
+            dates = []
+            for year in os.listdir(self.directory):
+                if year.isdigit():
+                    for name in os.listdir(os.path.join(self.directory, year)):
+                        if not name.endswith('.tmp'):
+                            dates.append(dt.date.fromisoformat(name))
+            self._dates = sorted(dates)
+        return self._dates
+
+    def has(self, d):
+        return os.path.isdir(self.partition_path(mkdate(d)))
+
+    def generation(self):
+        """Returns the number of partitions written to the store so far, by any instance,
+        re-ingested ones included. Results computed from the store are stale once it
+        changed."""
+        try:
+            with open(os.path.join(self.directory, GENERATION_FILE)) as fh:
+                return int(fh.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _bump_generation(self):
+        path = os.path.join(self.directory, GENERATION_FILE)
+        with open(path + '.tmp', 'w') as fh:
+            fh.write(str(self.generation() + 1))
+        os.replace(path + '.tmp', path)
+
+    def write_partition(self, d, arrays):
+        """Writes the partition of a date from arrays of the stored types, codes for the
+        dictionary encoded columns, replacing any previous one. The partition is written
+        under a temporary name first so that readers never see it partial."""
+        import numpy as np
+        d = mkdate(d)
+        for dictionary in self.dictionaries.values():
+            dictionary.save()
+        path = self.partition_path(d)
+        tmp = path + '.tmp'
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+        os.makedirs(tmp)
+        for name, _, kind in self.columns:
+            np.save(os.path.join(tmp, name + '.npy'), np.asarray(arrays[name], dtype=DTYPES[kind]))
+        for name, values in self.partition_indexes(arrays).items():
+            np.save(os.path.join(tmp, name + '.npy'), values)
+        replace = os.path.exists(path)
+        if replace:
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+        self._dates = None
+        if 'isin' in self.dictionaries:
+            self.index.append(d, arrays['symbol'], arrays['series'], arrays['isin'], replace=replace)
+        self._bump_generation()
+
+    def partition_indexes(self, arrays):
+        """Returns the arrays saved in a partition along with its columns, none by default."""
+        return {}
+
+    def rebuild_index(self):
+        """Rebuilds the SymbolIndex from the partitions."""
+        if os.path.exists(self.index.path):
+            os.remove(self.index.path)
+        for d in self.dates():
+            arrays = self.load(d, ['symbol', 'series', 'isin'])
+            self.index.append(d, arrays['symbol'], arrays['series'], arrays['isin'])
+
+    def ingest(self, d, rows):
+        """Ingests the rows of the bhavcopy of a date, as dicts keyed by the CSV columns like
+        the ones of BaseBhavcopyDownloader.iter_rows, or as lists with the header first.
+        Args:
+            d: Date of the bhavcopy, in fuzzy format.
+            rows (Iterable[Union[dict, list]]): Rows of the bhavcopy.
+        Returns:
+            int: Number of rows ingested.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            header, records = [], []
+        elif isinstance(first, dict):
+            header = list(first)
+            records = [list(first.values())] + [[row.get(key, '') for key in header] for row in rows]
+        else:
+            header, records = first, list(rows)
+        index = {column.strip().upper(): i for i, column in enumerate(header)}
+        arrays = {}
+        for name, column, kind in self.columns:
+            i = index.get(column)
+            if i is None:
+                arrays[name] = [_MISSING_VALUES[kind]] * len(records)
+            elif kind == 'code':
+                encode = self.dictionaries[name].encode
+                arrays[name] = [encode(record[i].strip()) for record in records]
+            else:
+                convert = _CONVERTERS[kind]
+                arrays[name] = [convert(record[i]) for record in records]
+        self.write_partition(d, arrays)
+        return len(records)
+
+    def ingest_csv(self, path, d=None):
+        """Ingests a bhavcopy CSV file, like the YYYY-MM-DD.csv ones of
+        BhavcopyFileSystemDownloader. The date defaults to the one of the file name."""
+        if d is None:
+            d = os.path.splitext(os.path.basename(path))[0]
+        with open(path, newline='') as fh:
+            return self.ingest(d, csv.reader(fh))
+
+    def ingest_directory(self, directory, force=False):
+        """Ingests the YYYY-MM-DD.csv bhavcopies of a directory which are not in the store
+        yet, or all of them with `force`. Returns the dates ingested."""
+        ingested = []
+        for name in sorted(os.listdir(directory)):
+            stem, ext = os.path.splitext(name)
+            if ext != '.csv':
+                continue
+            try:
+                d = dt.date.fromisoformat(stem)
+            except ValueError:
+                continue
+            if force or not self.has(d):
+                self.ingest_csv(os.path.join(directory, name), d)
+                ingested.append(d)
+        return ingested
+
+    def load(self, d, columns=None):
+        """Returns the columns of the partition of a date as read-only memory-mapped arrays.
+        Args:
+            d: Date in fuzzy format.
+            columns (Iterable[str], optional): Columns to load. Defaults to all.
+        Returns:
+            dict: Column name to numpy array.
+        """
+        import numpy as np
+        path = self.partition_path(mkdate(d))
+        names = columns or [name for name, _, _ in self.columns]
+        return {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in names}
+
+    def partitions(self, start=None, end=None, columns=None):
+        """Returns the (date, columns) partitions of a date range, both ends included, with
+        memory-mapped columns, without copying any data."""
+        dates = self.dates()
+        start = mkdate(start) if start is not None else dt.date.min
+        end = mkdate(end) if end is not None else dt.date.max
+        return [(d, self.load(d, columns)) for d in dates if start <= d <= end]
+
+    def load_range(self, start=None, end=None, columns=None):
+        """Returns the columns of a date range, both ends included, concatenated along with
+        a 'date' column of datetime64[D].
+        Args:
+            start, end: Dates in fuzzy format. Default to the first and last dates ingested.
+            columns (Iterable[str], optional): Columns to load. Defaults to all.
+        Returns:
+            dict: Column name to numpy array.
+        """
+        import numpy as np
+        partitions = self.partitions(start, end, columns)
+        names = columns or [name for name, _, _ in self.columns]
+        result = {}
+        lengths = [len(next(iter(arrays.values()))) if arrays else 0 for _, arrays in partitions]
+        result['date'] = np.repeat(np.array([d for d, _ in partitions], dtype='datetime64[D]'), lengths)
+        for name in names:
+            if partitions:
+                result[name] = np.concatenate([arrays[name] for _, arrays in partitions])
+            else:
+                kinds = {column: kind for column, _, kind in self.columns}
+                result[name] = np.empty(0, dtype=DTYPES[kinds[name]])
+        return result
+
+    def history(self, symbol, start=None, end=None, columns=HISTORY_COLUMNS, series=EQUITY_SERIES,
+                adjust=False):
+        """Returns the daily history of a security, reading its rows by offset in the
+        partitions of the dates within range only.
+
+        The security is looked up by ISIN, so its history runs across symbol renames
+        and series changes, like a move from EQ to BE and back.
+        Args:
+            symbol (str): Symbol, as of `end`, or ISIN.
+            start, end: Dates in fuzzy format. Default to the whole store.
+            columns (Iterable[str], optional): Columns to read. Defaults to HISTORY_COLUMNS.
+            series (Iterable[str], optional): Series to keep, the first one being preferred
+                on days with rows in several. None keeps all. Defaults to EQUITY_SERIES.
+            adjust (Union[bool, CorporateActions], optional): If True the prices and
+                quantities are adjusted for the splits and bonuses of the store's `actions`
+                up to `end`, or for the ones of the given table. Defaults to False.
+        Returns:
+            dict: 'date' (datetime64[D]), 'symbol' and 'series' (the ones of each day) and
+                the columns asked for, as arrays.
+        Example:
+            >>> store.history('INFY', '01-01-2024', '31-12-2024')['close']
+            array([1568.2, 1578.6, ...])
+        """
+        import numpy as np
+        start = mkdate(start).toordinal() if start is not None else 0
+        end = mkdate(end).toordinal() if end is not None else dt.date.max.toordinal()
+        isin = self.dictionaries['isin'].codes.get(symbol)
+        rows = self.index.rows(self.symbol_code(symbol), isin, start, end)
+        if series is not None:
+            codes = self.dictionaries['series'].codes
+            preference = {codes[name]: i for i, name in enumerate(series) if name in codes}
+            rank = np.array([preference.get(code, -1) for code in rows['series'].tolist()], dtype='int64')
+            rows = rows[rank >= 0]
+            rank = rank[rank >= 0]
+            # one row per day, in the preferred series
+            order = np.lexsort((rank, rows['date']))
+            rows = rows[order]
+            rows = rows[np.unique(rows['date'], return_index=True)[1]]
+        kinds = {name: kind for name, _, kind in self.columns}
+        result = {'date': (rows['date'].astype('int64') - dt.date(1970, 1, 1).toordinal()).astype('datetime64[D]'),
+                  'symbol': self.decode('symbol', rows['symbol']),
+                  'series': self.decode('series', rows['series'])}
+        # the rows sorted by date, each partition's rows are read with one open of each column
+        ordinals, first = np.unique(rows['date'], return_index=True)
+        paths = [self.partition_path(dt.date.fromordinal(ordinal)) for ordinal in ordinals.tolist()]
+        groups = np.split(rows['row'], first[1:])
+        groups = [group.tolist() for group in groups] if len(rows) else []
+        for name in columns:
+            dtype = np.dtype(DTYPES[kinds[name]])
+            values = [_gather_rows(os.path.join(path, name + '.npy'), group, dtype.itemsize)
+                      for path, group in zip(paths, groups)]
+            result[name] = np.frombuffer(b''.join(values), dtype=dtype).copy()
+        if adjust is not False and len(rows):
+            actions = self.actions if adjust is True else adjust
+            # the actions are keyed by the latest symbol of the security
+            actions.adjust(result['symbol'][-1], result, dt.date.fromordinal(end))
+        return result
+
+    def symbol_code(self, symbol):
+        """Returns the code of a symbol, or None if the store has never seen it."""
+        return self.dictionaries['symbol'].codes.get(symbol)
+
+    def decode(self, name, codes):
+        """Returns the text values of codes of a dictionary encoded column, None for MISSING."""
+        import numpy as np
+        values = np.array(self.dictionaries[name].values + [None], dtype=object)
+        return values[np.asarray(codes)]
+
+
+class FnoBhavcopyStore(BhavcopyStore):
+    """Columnar, memory-mapped store of F&O bhavcopies partitioned by date, like
+    BhavcopyStore, with FNO_COLUMNS.
+
+    The rows of each partition are sorted by FNO_KEY as it is written, so the contracts
+    of an underlying, and within it of an expiry, instrument and option type, are a
+    contiguous range of rows, sorted by strike. A groups.npy index saved along with the
+    columns holds the first and last rows of each such group: queries find their groups
+    by binary search in it, then read only the rows of those groups by offset.
+    Args:
+        directory (str): Directory of the store, created if needed.
+    Example:
+        >>> store = FnoBhavcopyStore('/data/fno-store')
+        >>> store.ingest_directory('/data/fno-bhavcopy')
+        >>> calls = store.contracts('NIFTY', '01-01-2025', '31-01-2025', expiry='30-01-2025',
+        ...                         instrument='OPTIDX', option_type='CE')
+        >>> calls['strike'], calls['open_interest']
+    """
+
+    def __init__(self, directory, columns=FNO_COLUMNS):
+        super().__init__(directory, columns)
+        self._kinds = {name: kind for name, _, kind in columns}
+
+    def write_partition(self, d, arrays):
+        import numpy as np
+        kinds = self._kinds
+        arrays = {name: np.asarray(arrays[name], dtype=DTYPES[kinds[name]]) for name in kinds}
+        order = np.lexsort([arrays[name] for name in reversed(FNO_KEY)])
+        super().write_partition(d, {name: values[order] for name, values in arrays.items()})
+
+    def partition_indexes(self, arrays):
+        # the first row of each contract group, rows being sorted by FNO_KEY
+        import numpy as np
+        names = FNO_KEY[:-1]
+        count = len(arrays['symbol'])
+        first = np.zeros(count, dtype=bool)
+        first[:1] = True
+        for name in names:
+            values = arrays[name]
+            first[1:] |= values[1:] != values[:-1]
+        starts = np.flatnonzero(first)
+        groups = np.empty(len(starts), dtype=GROUP_DTYPE)
+        for name in names:
+            groups[name] = arrays[name][starts]
+        groups['start'] = starts
+        groups['stop'] = np.append(starts[1:], count)
+        return {'groups': groups}
+
+    def _key_bounds(self, symbol, expiry, instrument, option_type, strike):
+        # (column, low, high) bounds of the key columns in FNO_KEY order, None for the
+        # columns not filtered on, or None if a value was never seen
+        import numpy as np
+        bounds = []
+        for name, value in (('symbol', symbol), ('expiry', expiry), ('instrument', instrument),
+                            ('option_type', option_type), ('strike', strike)):
+            if value is None:
+                bounds.append((name, None, None))
+            elif name in self.dictionaries:
+                code = self.dictionaries[name].codes.get(value)
+                if code is None:
+                    return None
+                bounds.append((name, code, code))
+            elif name == 'expiry':
+                value = np.datetime64(mkdate(value), 'D')
+                bounds.append((name, value, value))
+            else:
+                low, high = value if isinstance(value, (tuple, list)) else (value, value)
+                bounds.append((name, float(low), float(high)))
+        return bounds
+
+    def _read(self, d, name, start, stop):
+        import numpy as np
+        dtype = np.dtype(DTYPES[self._kinds[name]])
+        path = os.path.join(self.partition_path(d), name + '.npy')
+        return np.frombuffer(_read_rows(path, start, stop - start, dtype.itemsize), dtype=dtype)
+
+    def contracts(self, symbol, start=None, end=None, expiry=None, instrument=None,
+                  option_type=None, strike=None, columns=None):
+        """Returns the contracts of an underlying over a date range. In each partition the
+        contract groups asked for are found by binary search in its groups index, and only
+        their rows are read.
+        Args:
+            symbol (str): Underlying, like 'NIFTY' or 'INFY'.
+            start, end: Dates in fuzzy format. Default to the whole store.
+            expiry (optional): Expiry date in fuzzy format. Defaults to all.
+            instrument (str, optional): 'FUTIDX', 'FUTSTK', 'OPTIDX' or 'OPTSTK'. Defaults
+                to all.
+            option_type (str, optional): 'CE', 'PE', or 'XX' for futures. Defaults to all.
+            strike (Union[float, tuple], optional): Strike, or (low, high) strikes both
+                included. Defaults to all.
+            columns (Iterable[str], optional): Columns to read. Defaults to all.
+        Returns:
+            dict: 'date' and the columns as arrays, the rows of each date in FNO_KEY order.
+        """
+        import numpy as np
+        names = list(columns or self._kinds)
+        bounds = self._key_bounds(symbol, expiry, instrument, option_type, strike)
+        start = mkdate(start) if start is not None else dt.date.min
+        end = mkdate(end) if end is not None else dt.date.max
+        dates = [d for d in self.dates() if start <= d <= end] if bounds is not None else []
+        parts = []
+        for d in dates:
+            groups = np.load(os.path.join(self.partition_path(d), 'groups.npy'))
+            # the leading key columns asked for narrow the range of groups, the next ones
+            # are masks over it
+            lo, hi = 0, len(groups)
+            mask = None
+            prefix = True
+            for name, low, high in bounds[:-1]:
+                if low is None:
+                    prefix = False
+                elif prefix:
+                    column = groups[name][lo:hi]
+                    lo, hi = (lo + int(np.searchsorted(column, low, 'left')),
+                              lo + int(np.searchsorted(column, high, 'right')))
+                else:
+                    column = groups[name][lo:hi]
+                    selected = (column >= low) & (column <= high)
+                    mask = selected if mask is None else mask & selected
+            if mask is not None:
+                kept = np.flatnonzero(mask)
+                if not len(kept):
+                    continue
+                # trimmed to the range from the first to the last group kept
+                mask = mask[kept[0]:kept[-1] + 1]
+                lo, hi = lo + int(kept[0]), lo + int(kept[-1]) + 1
+            if lo >= hi:
+                continue
+            row_lo, row_hi = int(groups['start'][lo]), int(groups['stop'][hi - 1])
+            rows = None
+            if mask is not None and not mask.all():
+                rows = np.repeat(mask, groups['stop'][lo:hi] - groups['start'][lo:hi])
+            _, low, high = bounds[-1]
+            if low is not None:
+                values = self._read(d, 'strike', row_lo, row_hi)
+                selected = (values >= low) & (values <= high)
+                rows = selected if rows is None else rows & selected
+            if rows is not None:
+                rows = np.flatnonzero(rows)
+                if not len(rows):
+                    continue
+            part = {}
+            for name in names:
+                values = self._read(d, name, row_lo, row_hi)
+                part[name] = values[rows] if rows is not None else values.copy()
+            parts.append((d, part))
+        lengths = [len(part[names[0]]) if names else 0 for _, part in parts]
+        result = {'date': np.repeat(np.array([d for d, _ in parts], dtype='datetime64[D]'), lengths)}
+        for name in names:
+            if parts:
+                result[name] = np.concatenate([part[name] for _, part in parts])
+            else:
+                result[name] = np.empty(0, dtype=DTYPES[self._kinds[name]])
+        return result
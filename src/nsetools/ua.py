@@ -1,4 +1,3 @@
-import requests
 import random
 from datetime import datetime as dt
 from nsetools import urls
@@ -8,18 +7,22 @@ from time import sleep
 class Session():
     __CACHE__ = {}
 
-    def __init__(self, session_refresh_interval=60, cache_timeout=60):
+    def __init__(self, session_refresh_interval=60, cache_timeout=60, scheduler=None):
         """Initialize the class instance with session and cache parameters.
         Args:
             session_refresh_interval (int, optional): Time interval in seconds to refresh session. Defaults to 60.
             cache_timeout (int, optional): Cache timeout duration in seconds. Defaults to 20.
+            scheduler (MarketScheduler, optional): If provided, cache timeout is stretched outside
+                market hours as per the scheduler. Defaults to None.
         Attributes:
             session_refresh_interval (int): Time interval for session refresh.
             cache_timeout (int): Duration for cache timeout.
+            scheduler (MarketScheduler): Market hours aware scheduler, if any.
         """
 
         self.session_refresh_interval = session_refresh_interval
         self.cache_timeout = cache_timeout  # cache timeout in seconds
+        self.scheduler = scheduler
         self.create_session()
         self.flush()
     
@@ -51,6 +54,8 @@ class Session():
             - Sets self._session_init_time with current timestamp
         """
 
+        # requests is the bulk of the import time of nsetools, it is loaded with the first session
+        import requests
         home_url = "https://nseindia.com"
         self._session = requests.Session()
         self._session.headers.update(self.nse_headers())
@@ -68,12 +73,27 @@ class Session():
         
         self.__class__.__CACHE__ = {}
 
-    def fetch(self, url):
+    def is_fresh(self, cache_time):
+        """Checks if a response cached at `cache_time` can still be served.
+        Args:
+            cache_time (datetime): Time at which the response was cached.
+        Returns:
+            bool: True if the cached response has not expired.
+        """
+        if self.scheduler is not None:
+            return self.scheduler.is_fresh(cache_time, self.cache_timeout)
+        return (dt.now() - cache_time).seconds < self.cache_timeout
+
+    def fetch(self, url, use_cache=True, stream=False):
         """Fetches data from a given URL with caching and session management.
         This method implements a caching mechanism and session refresh logic to optimize 
         network requests. It also includes random delays to prevent rate limiting.
         Args:
             url (str): The URL to fetch data from.
+            use_cache (bool, optional): If False the response is neither served from nor kept
+                in the cache, for large one-off downloads like bhavcopies. Defaults to True.
+            stream (bool, optional): If True the body is not read upfront but through
+                response.iter_content, and the response is never cached. Defaults to False.
         Returns:
             requests.Response: The response object from the request.
         Note:
@@ -82,10 +102,11 @@ class Session():
             - Auto-refreshes session if expired based on session_refresh_interval
         """
 
+        use_cache = use_cache and not stream
         # Check cache first
-        if url in self.__class__.__CACHE__:
+        if use_cache and url in self.__class__.__CACHE__:
             cache_time, response = self.__class__.__CACHE__[url]
-            if (dt.now() - cache_time).seconds < self.cache_timeout:
+            if self.is_fresh(cache_time):
                 # print("serving from cache")
                 return response
 
@@ -101,6 +122,7 @@ class Session():
         sleep(sleep_time)
 
         # Make actual request if not in cache or cache expired
-        response = self._session.get(url)
-        self.__class__.__CACHE__[url] = (dt.now(), response)
+        response = self._session.get(url, stream=stream)
+        if use_cache:
+            self.__class__.__CACHE__[url] = (dt.now(), response)
         return response
@@ -30,6 +30,8 @@ STOCKS_IN_INDEX_URL = f"{NSE_MAIN}/api/equity-stockIndices?index=%s"
 # Historical data URLs
 BHAVCOPY_BASE_URL = f"{NSE_LEGACY}/content/historical/EQUITIES/%s/%s/cm%s%s%sbhav.csv.zip"
 BHAVCOPY_BASE_FILENAME = "cm%s%s%sbhav.csv"
+FNO_BHAVCOPY_BASE_URL = f"{NSE_LEGACY}/content/historical/DERIVATIVES/%s/%s/fo%s%s%sbhav.csv.zip"
+FNO_BHAVCOPY_BASE_FILENAME = "fo%s%s%sbhav.csv"
 
 # Drivative URLs
 QUOTE_DRIVATIVE_URL = f"{NSE_MAIN}/api/quote-derivative?symbol=%s"
@@ -22,13 +22,16 @@
     SOFTWARE.
 
 """
-import six
+import io
 import re
-import operator
+import time
+import heapq
+from functools import lru_cache
+from nsetools.query import compile_query
+from nsetools.datemgr import date_parser, match_datetime
 
 def byte_adaptor(fbuffer):
-    """ provides py3 compatibility by converting byte based
-    file stream to string based file stream
+    """ converts byte based file stream to string based file stream
 
     Arguments:
         fbuffer: file like objects containing bytes
@@ -36,12 +39,8 @@ def byte_adaptor(fbuffer):
     Returns:
         string buffer
     """
-    if six.PY3:
-        strings = fbuffer.read().decode('latin-1')
-        fbuffer = six.StringIO(strings)
-        return fbuffer
-    else:
-        return fbuffer
+    strings = fbuffer.read().decode('latin-1')
+    return io.StringIO(strings)
 
 
 def js_adaptor(buffer):
@@ -60,7 +59,7 @@ def js_adaptor(buffer):
     buffer = re.sub('NaN', '"NaN"', buffer)
     return buffer
 
-def cast_intfloat_string_values_to_intfloat(data, round_digits=2):
+def cast_intfloat_string_values_to_intfloat(data, round_digits=2, inplace=False):
     """Recursively converts string representations of numbers to integers or floats in nested data structures.
     This function traverses through dictionaries and lists, converting string values that represent
     numbers into their corresponding numeric types (int or float). For float values, it rounds to
@@ -70,9 +69,13 @@ def cast_intfloat_string_values_to_intfloat(data, round_digits=2):
             Can be either a dictionary or a list, potentially nested.
         round_digits (int, optional): Number of decimal places to round float values to.
             Defaults to 2.
+        inplace (bool, optional): If True, the containers of `data` are updated in place
+            instead of being copied at every level. Use it only for payloads nobody else
+            holds, like one fresh from res.json(). Defaults to False.
     Returns:
         Union[dict, list]: A new data structure of the same type as input, with string
-            representations of numbers converted to their numeric types.
+            representations of numbers converted to their numeric types. With inplace,
+            `data` itself.
     Example:
         >>> data = {'a': '1', 'b': '2.5', 'c': 'text', 'd': {'e': '3.14'}}
         >>> cast_intfloat_string_values_to_intfloat(data)
@@ -80,7 +83,8 @@ def cast_intfloat_string_values_to_intfloat(data, round_digits=2):
     """
 
     if isinstance(data, dict):
-        data = data.copy()
+        if not inplace:
+            data = data.copy()
         for key, value in data.items():
             if isinstance(value, str):
                 try:
@@ -91,11 +95,12 @@ def cast_intfloat_string_values_to_intfloat(data, round_digits=2):
                     except ValueError:
                         pass
             elif isinstance(value, (dict, list)):
-                data[key] = cast_intfloat_string_values_to_intfloat(value, round_digits)
+                data[key] = cast_intfloat_string_values_to_intfloat(value, round_digits, inplace)
             elif isinstance(value, float):
                 data[key] = round(value, round_digits)
     elif isinstance(data, list):
-        data = data[:]
+        if not inplace:
+            data = data[:]
         for i, value in enumerate(data):
             if isinstance(value, str):
                 try:
@@ -106,11 +111,341 @@ def cast_intfloat_string_values_to_intfloat(data, round_digits=2):
                     except ValueError:
                         pass
             elif isinstance(value, (dict, list)):
-                data[i] = cast_intfloat_string_values_to_intfloat(value, round_digits)
+                data[i] = cast_intfloat_string_values_to_intfloat(value, round_digits, inplace)
             elif isinstance(value, float):
                 data[i] = round(value, round_digits)
     return data
 
+# superset of the strings int() and float() accept, apart from nan/inf spellings.
+# a cheap match rules out plain text without raising two exceptions per value.
+_NUMERIC_STRING = re.compile(r'\s*[-+]?(?:\d[\d_]*(?:\.[\d_]*)?|\.\d[\d_]*)(?:[eE][-+]?\d[\d_]*)?\s*\Z')
+_SPECIAL_FLOATS = frozenset(['nan', 'inf', 'infinity'])
+# numeric strings along with the nan/inf spellings, for the text step of the casting plans
+_CASTABLE_STRING = re.compile(_NUMERIC_STRING.pattern + r'|\s*[-+]?(?:nan|inf|infinity)\s*\Z',
+                              re.IGNORECASE)
+
+def cast_intfloat_string_value(value, round_digits=2):
+    """Scalar counterpart of cast_intfloat_string_values_to_intfloat.
+    Numeric strings are converted to int or float, floats are rounded to
+    `round_digits` and every other value is returned as it is.
+    Example:
+        >>> cast_intfloat_string_value('2.567')
+        2.57
+    """
+    if isinstance(value, str):
+        if not _NUMERIC_STRING.match(value) and \
+                value.strip().lstrip('+-').lower() not in _SPECIAL_FLOATS:
+            return value
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return round(float(value), round_digits)
+            except ValueError:
+                return value
+    elif isinstance(value, float):
+        return round(value, round_digits)
+    return value
+
+@lru_cache(maxsize=256)
+def _compile_fields(fields, round_digits):
+    getters = []
+    for path in fields:
+        keys = tuple(int(key) if key.isdigit() else key for key in path.split('.'))
+        getters.append((path, keys))
+
+    def project(data):
+        projected = {}
+        for path, keys in getters:
+            value = data
+            try:
+                for key in keys:
+                    value = value[key]
+            except (KeyError, IndexError, TypeError):
+                value = None
+            if isinstance(value, (dict, list)):
+                projected[path] = cast_intfloat_string_values_to_intfloat(value, round_digits)
+            else:
+                projected[path] = cast_intfloat_string_value(value, round_digits)
+        return projected
+    return project
+
+def compile_fields(fields, round_digits=2):
+    """Compiles dotted field paths into an accessor which extracts and casts only those paths.
+    The accessor is cached, so compiling the same fields again costs a dict lookup.
+    Args:
+        fields (Iterable[str]): Dotted paths like 'priceInfo.lastPrice'. Numeric components
+            index into lists, e.g. 'data.0.symbol'.
+        round_digits (int, optional): Number of decimal places float values are rounded to.
+            Defaults to 2.
+    Returns:
+        callable: Function which takes the decoded data and returns a dict of path to value.
+            Paths missing in the data map to None.
+    Example:
+        >>> project = compile_fields(['lastPrice', 'intraDayHighLow.max'])
+        >>> project({'lastPrice': '1580.5', 'intraDayHighLow': {'max': 1600}, 'vwap': 1590})
+        {'lastPrice': 1580.5, 'intraDayHighLow.max': 1600}
+    """
+    if isinstance(fields, str):
+        fields = [fields]
+    return _compile_fields(tuple(fields), round_digits)
+
+# steps of a casting plan. a dict node is a dict of key to step, a list node is
+# a _ListPlan holding the step of its items.
+_INT = 'int'        # string holding an int
+_FLOAT = 'float'    # string holding a float
+_ROUND = 'round'    # float to be rounded
+_KEEP = 'keep'      # int, bool or None, passed through
+_TEXT = 'text'      # string which isn't a number
+_ANY = 'any'        # seen with different types, cast the generic way
+
+# strings int() refuses, which the _FLOAT step can hand to float() directly
+_FLOAT_MARK = re.compile(r'[.eE]')
+
+class _SchemaDrift(Exception):
+    """raised when a payload doesn't fit the learned plan"""
+    pass
+
+class _ListPlan():
+    __slots__ = ('item',)
+
+    def __init__(self, item=None):
+        self.item = item
+
+class _DateStep():
+    """step of a date field, parsing its strings with the parser of the format learned
+    for it. None and text like '-' are passed through."""
+    __slots__ = ('parse',)
+
+    def __init__(self, parse):
+        self.parse = parse
+
+    def __call__(self, value):
+        if type(value) is not str:
+            return value
+        try:
+            return self.parse(value)
+        except ValueError:
+            # a value in another format, or not a date at all
+            parsed = match_datetime(value)
+            return value if parsed is None else parsed
+
+# date step of fields seen in more than one format
+_ANY_DATE = _DateStep(match_datetime)
+
+def _learn_date(value):
+    if type(value) is str:
+        parse = date_parser(value)
+        if parse is not None:
+            return _DateStep(parse), parse(value)
+    return None, value
+
+def _learn(value, round_digits, inplace=False, dates=frozenset()):
+    """Casts a value the generic way and returns (step, casted value). String values
+    of the dict keys in `dates` holding dates are parsed to datetimes."""
+    kind = type(value)
+    if kind is dict:
+        plan = {}
+        casted = value if inplace else {}
+        for key, item in value.items():
+            step = None
+            if key in dates:
+                step, item = _learn_date(item)
+            if step is None:
+                step, item = _learn(item, round_digits, inplace, dates)
+                if step is _TEXT and key in dates:
+                    # text like '-' in place of a date, the dates coming later are parsed
+                    step = _ANY_DATE
+            plan[key], casted[key] = step, item
+        return plan, casted
+    elif kind is list:
+        plan = _ListPlan()
+        casted = value if inplace else [None] * len(value)
+        for i, item in enumerate(value):
+            step, casted[i] = _learn(item, round_digits, inplace, dates)
+            plan.item = step if plan.item is None else _merge_steps(plan.item, step)
+        return plan, casted
+    elif kind is str:
+        casted = cast_intfloat_string_value(value, round_digits)
+        if type(casted) is int:
+            return _INT, casted
+        elif type(casted) is float:
+            return _FLOAT, casted
+        return _TEXT, casted
+    elif kind is float:
+        return _ROUND, round(value, round_digits)
+    elif kind is int or kind is bool or value is None:
+        return _KEEP, value
+    return _ANY, cast_intfloat_string_values_to_intfloat(value, round_digits, inplace)
+
+# steps whose values are also taken by a wider step, which the int and float
+# steps are for ints, floats and None, the way they come out of those steps
+_NUMERIC_MERGES = {}
+for _steps, _step in (((_INT, _KEEP), _INT), ((_FLOAT, _KEEP), _FLOAT), ((_FLOAT, _ROUND), _FLOAT),
+                      ((_INT, _FLOAT), _FLOAT)):
+    _NUMERIC_MERGES[_steps] = _NUMERIC_MERGES[_steps[::-1]] = _step
+
+def _merge_steps(left, right):
+    if left is None:
+        return right
+    elif right is None:
+        return left
+    elif type(left) is dict and type(right) is dict:
+        merged = dict(left)
+        for key, step in right.items():
+            merged[key] = _merge_steps(merged[key], step) if key in merged else step
+        return merged
+    elif type(left) is _ListPlan and type(right) is _ListPlan:
+        return _ListPlan(_merge_steps(left.item, right.item))
+    elif type(left) is _DateStep or type(right) is _DateStep:
+        # date fields holding None or text in some records keep the date step
+        if type(left) is _DateStep and type(right) is _DateStep:
+            return left if left.parse is right.parse else _ANY_DATE
+        return left if type(left) is _DateStep else right
+    elif left == right:
+        return left
+    elif type(left) is str and type(right) is str:
+        # numeric strings seen as numbers, or already cast, keep their step
+        return _NUMERIC_MERGES.get((left, right), _ANY)
+    return _ANY
+
+def _apply_value(step, value, round_digits, inplace=False):
+    kind = type(value)
+    if step is _ROUND and kind is float:
+        return round(value, round_digits)
+    elif step is _TEXT and kind is str:
+        return cast_intfloat_string_value(value, round_digits) \
+            if _CASTABLE_STRING.match(value) else value
+    elif step is _INT and kind is str:
+        return int(value)
+    elif step is _FLOAT and kind is str:
+        # an int string in a float field is cast to an int, as the generic way does
+        return round(float(value), round_digits) if _FLOAT_MARK.search(value) \
+            else cast_intfloat_string_value(value, round_digits)
+    elif step is _KEEP and (kind is int or kind is bool or value is None):
+        return value
+    elif (step is _INT or step is _FLOAT) and (kind is int or kind is bool or value is None):
+        # already cast, like the values before a drift in an in-place payload
+        return value
+    elif step is _FLOAT and kind is float:
+        return round(value, round_digits)
+    elif step.__class__ is dict and kind is dict:
+        return _apply_dict(step, value, round_digits, inplace)
+    elif step.__class__ is _ListPlan and kind is list:
+        if step.item is None and value:
+            raise _SchemaDrift(step)
+        if not inplace:
+            return [_apply_value(step.item, item, round_digits) for item in value]
+        for i, item in enumerate(value):
+            value[i] = _apply_value(step.item, item, round_digits, inplace)
+        return value
+    elif step.__class__ is _DateStep:
+        return step(value)
+    elif step is _ANY:
+        if kind is dict or kind is list:
+            return cast_intfloat_string_values_to_intfloat(value, round_digits, inplace)
+        return cast_intfloat_string_value(value, round_digits)
+    raise _SchemaDrift(step)
+
+def _apply_dict(plan, data, round_digits, inplace=False):
+    # same as _apply_value, with the scalar steps inlined as dicts hold most of the values
+    casted = data if inplace else {}
+    for key, value in data.items():
+        # unknown key raises KeyError, which is also taken as a drift
+        step = plan[key]
+        kind = type(value)
+        if step is _ROUND and kind is float:
+            casted[key] = round(value, round_digits)
+        elif step is _TEXT and kind is str:
+            casted[key] = cast_intfloat_string_value(value, round_digits) \
+                if _CASTABLE_STRING.match(value) else value
+        elif step is _INT and kind is str:
+            casted[key] = int(value)
+        elif step is _FLOAT and kind is str:
+            casted[key] = round(float(value), round_digits) if _FLOAT_MARK.search(value) \
+                else cast_intfloat_string_value(value, round_digits)
+        elif step is _KEEP and (kind is int or kind is bool or value is None):
+            casted[key] = value
+        else:
+            casted[key] = _apply_value(step, value, round_digits, inplace)
+    return casted
+
+class CastPlan():
+    """Casting plan of an endpoint, learned from its payloads.
+
+    The plan records which paths hold numeric strings, floats to be rounded or
+    values to pass through, so later payloads are cast without working out the
+    type of every value again and without try/except per value. When a payload
+    doesn't fit the plan, it is cast the generic way and the plan is widened.
+
+    The values of the keys in `dates` are parsed to datetimes, with the format
+    learned for each of them.
+    """
+
+    def __init__(self, round_digits=2, dates=None):
+        self.round_digits = round_digits
+        self.dates = frozenset(dates or ())
+        self.root = None
+        self.hits = 0
+        self.drifts = 0
+
+    def learn(self, data, inplace=False):
+        """Casts `data` the generic way and widens the plan with its shape."""
+        step, casted = _learn(data, self.round_digits, inplace, self.dates)
+        self.root = _merge_steps(self.root, step)
+        return casted
+
+    def apply(self, data, inplace=False):
+        """Casts `data` as per the plan, falling back to learn() on schema drift.
+        With inplace, the containers of `data` are updated instead of copied. A drift
+        then leaves `data` partly cast, and the values cast before it are learned as
+        numbers, which the int and float steps they came from take as they are.
+        """
+        if self.root is not None:
+            try:
+                casted = _apply_value(self.root, data, self.round_digits, inplace)
+            except (_SchemaDrift, KeyError, ValueError):
+                self.drifts += 1
+            else:
+                self.hits += 1
+                return casted
+        return self.learn(data, inplace)
+
+_CAST_PLANS = {}
+
+def cast_with_plan(data, endpoint, round_digits=2, inplace=False, dates=None):
+    """Casts `data` like cast_intfloat_string_values_to_intfloat, using a plan learned
+    from the earlier payloads of the same endpoint.
+    Args:
+        data (Union[dict, list]): Decoded payload.
+        endpoint (str): Key identifying the shape of the payload, like the URL template.
+        round_digits (int, optional): Number of decimal places float values are rounded to.
+            Defaults to 2.
+        inplace (bool, optional): If True, `data` is updated in place instead of being
+            copied, only for payloads nobody else holds. Defaults to False.
+        dates (Iterable[str], optional): Keys holding dates, like
+            nsetools.fields.DATE_FIELDS, whose string values are parsed to datetimes.
+            Each key's format is learned once per endpoint. Defaults to None.
+    Returns:
+        Union[dict, list]: A new data structure with numeric strings cast and floats rounded,
+            or `data` itself with inplace.
+    Example:
+        >>> cast_with_plan({'lastPrice': '1580.5'}, urls.QUOTE_API_URL)
+        {'lastPrice': 1580.5}
+    """
+    if not isinstance(data, (dict, list)):
+        return data
+    dates = frozenset(dates or ())
+    key = (endpoint, round_digits, dates)
+    plan = _CAST_PLANS.get(key)
+    if plan is None:
+        plan = _CAST_PLANS[key] = CastPlan(round_digits, dates)
+    return plan.apply(data, inplace)
+
+def flush_cast_plans():
+    """Forgets all the learned casting plans."""
+    _CAST_PLANS.clear()
+
 def camel_to_title(camel_str):
     """Converts a camel case string to title case.
     This function takes a camel case string and converts it to title case by adding
@@ -128,61 +463,102 @@ def camel_to_title(camel_str):
     
     return re.sub(r'(?<!^)(?=[A-Z])', ' ', camel_str).title()
 
-def _resolve_path(data, path, case_insensitive=True):
-    """Helper function to resolve dot notation paths in dictionaries."""
-    if not path:
-        return data
-    
-    parts = path.split('.')
-    current = data
-    
-    for part in parts:
-        if isinstance(current, dict):
-            if case_insensitive:
-                key_map = {k.lower(): k for k in current.keys()}
-                part_lower = part.lower()
-                if part_lower in key_map:
-                    current = current[key_map[part_lower]]
-                else:
-                    return None
-            else:
-                current = current.get(part)
+def _table_options(filter, ignore, sort, direction, query, limit, offset):
+    """Validates and normalizes the options of dict_to_table, raises ValueError with
+    the message to display if any is invalid."""
+    # Compile query if provided
+    if query:
+        try:
+            query = compile_query(query)
+        except ValueError:
+            raise ValueError("Invalid query format!")
+
+    # Validate direction
+    if direction not in ["asc", "desc"]:
+        raise ValueError("Direction must be 'asc' or 'desc'!")
+
+    if limit is not None and (not isinstance(limit, int) or limit < 0):
+        raise ValueError("Limit should be a non negative integer!")
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Offset should be a non negative integer!")
+
+    # Normalize filter, ignore and sort keys
+    if filter:
+        if not isinstance(filter, list):
+            raise ValueError("Filter should be a list of keys!")
+        filter = [str(key).lower() for key in filter]
+
+    if ignore:
+        if not isinstance(ignore, list):
+            raise ValueError("Ignore should be a list of keys!")
+        ignore = [str(key).lower() for key in ignore]
+    else:
+        ignore = []
+
+    if sort:
+        sort = str(sort).lower()
+    return filter, ignore, sort, query
+
+def _sort_keys(data, key):
+    """Extracts the sort key of every row once: floats if all values are numeric, else
+    strings."""
+    try:
+        return [float(item.get(key, 0)) for item in data]
+    except (ValueError, TypeError):
+        return [str(item.get(key, "")) for item in data]
+
+def _select_rows(data, filter, ignore, sort, direction, query, limit, offset):
+    """Returns the columns and the rows of a list of dicts to display, as per the
+    normalized options. Raises ValueError with the message to display if there's
+    nothing to display."""
+    # Get all unique keys, in the order they are first seen, and create key mapping
+    keys = {}
+    for item in data:
+        keys.update(dict.fromkeys(item))
+    key_map = {k.lower(): k for k in keys}
+
+    # Validate sort key if provided
+    if sort and sort not in key_map:
+        raise ValueError(f"Sort key '{sort}' not found in data!")
+
+    # Create ordered keys list
+    if filter:
+        ordered_keys = [key_map[f] for f in filter if f in key_map and f not in ignore]
+    else:
+        ordered_keys = [key_map[k.lower()] for k in keys if k.lower() not in ignore]
+
+    if not ordered_keys:
+        raise ValueError("No matching keys found!")
+
+    # Apply query filter before sorting
+    if query:
+        data = query.filter(data)
+        if not data:
+            raise ValueError("No data matches the query!")
+
+    end = None if limit is None else offset + limit
+    if sort and sort in key_map:
+        sort_keys = _sort_keys(data, key_map[sort])
+        order = range(len(data))
+        if end is None:
+            order = sorted(order, key=sort_keys.__getitem__, reverse=(direction == "desc"))
+        elif direction == "desc":
+            # same as sorted(...)[:end], stable as well, without sorting all the rows
+            order = heapq.nlargest(end, order, key=sort_keys.__getitem__)
         else:
-            return None
-    return current
-
-def _parse_query(query_str):
-    """Parse query string into (path, operator, value) tuple."""
-    operators = {
-        '==': operator.eq,
-        '!=': operator.ne,
-        '>=': operator.ge,
-        '<=': operator.le,
-        '>': operator.gt,
-        '<': operator.lt
-    }
-    
-    for op_str, op_func in operators.items():
-        if op_str in query_str:
-            path, value = query_str.split(op_str)
-            path = path.strip()
-            value = value.strip()
-            
-            # Try to convert value to number if possible
-            try:
-                value = int(value)
-            except ValueError:
-                try:
-                    value = float(value)
-                except ValueError:
-                    # Keep as string if not numeric
-                    pass
-                    
-            return path, op_func, value
-            
-    return None, None, None
-
-def dict_to_table(data, title="Data Table", filter=None, ignore=None, sort=None, direction="desc", query=None):
+            order = heapq.nsmallest(end, order, key=sort_keys.__getitem__)
+        rows = [data[i] for i in order[offset:end]]
+    else:
+        rows = data[offset:end]
+    return ordered_keys, rows
+
+def _format_cell(value):
+    if isinstance(value, (int, float)) and value < 0:
+        return f"[red]{value}[/red]"
+    return f"[bright_white]{value}[/bright_white]"
+
+def dict_to_table(data, title="Data Table", filter=None, ignore=None, sort=None, direction="desc", query=None,
+                  limit=None, offset=0):
     """Converts dictionary or list of dictionaries to a formatted table using Rich library.
     This function takes either a dictionary or a list of dictionaries and displays it as a
     formatted table in the console. It supports filtering specific keys, ignoring keys, and
@@ -200,10 +576,14 @@ def dict_to_table(data, title="Data Table", filter=None, ignore=None, sort=None,
             for numeric values and alphabetically for string values. Defaults to None.
         direction (str, optional): Sort direction - "asc" for ascending or "desc" for 
             descending. Defaults to "desc".
-        query (str, optional): Filter rows using dot notation path and comparison.
-            Supports operators: ==, !=, >, <, >=, <=
-            Example: "market.price>100" or "status.active==True"
+        query (str, optional): Filter rows with a query on dot notation paths, see
+            nsetools.query. Supports ==, !=, >, <, >=, <=, in, arithmetic and and/or/not.
+            Example: "market.price>100" or "pChange > 2 and totalTradedVolume > 1e6"
             Keys are matched case-insensitively. Defaults to None.
+        limit (int, optional): Maximum number of rows to display, after sorting. With sort,
+            only the top rows are selected instead of sorting all of them. Defaults to None.
+        offset (int, optional): Number of rows to skip before the displayed ones, to page
+            through the data along with limit. Defaults to 0.
     """
     from rich.console import Console
     from rich.table import Table
@@ -215,113 +595,28 @@ def dict_to_table(data, title="Data Table", filter=None, ignore=None, sort=None,
         console.print("[red]No data to display![/red]")
         return
 
-    # Parse query if provided
-    query_path = None
-    query_op = None
-    query_value = None
-    if query:
-        query_path, query_op, query_value = _parse_query(query)
-        if not all([query_path, query_op, query_value]):
-            console.print("[red]Invalid query format![/red]")
-            return
-
-    # Validate direction
-    if direction not in ["asc", "desc"]:
-        console.print("[red]Direction must be 'asc' or 'desc'![/red]")
+    try:
+        filter, ignore, sort, query = _table_options(
+            filter, ignore, sort, direction, query, limit, offset)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
         return
 
-    # Normalize filter, ignore and sort keys
-    if filter:
-        if not isinstance(filter, list):
-            console.print("[red]Filter should be a list of keys![/red]")
-            return
-        filter = [str(key).lower() for key in filter]
-    
-    if ignore:
-        if not isinstance(ignore, list):
-            console.print("[red]Ignore should be a list of keys![/red]")
-            return
-        ignore = [str(key).lower() for key in ignore]
-    else:
-        ignore = []
-
-    if sort:
-        sort = str(sort).lower()
-
     # Check if data is a list of dicts
     if isinstance(data, list) and all(isinstance(i, dict) for i in data):
-        # Get all unique keys and create key mapping
-        keys = set()
-        for item in data:
-            keys.update(item.keys())
-        key_map = {k.lower(): k for k in keys}
-
-        # Validate sort key if provided
-        if sort and sort not in key_map:
-            console.print(f"[red]Sort key '{sort}' not found in data![/red]")
-            return
-
-        # Create ordered keys list
-        if filter:
-            ordered_keys = [key_map[f] for f in filter if f in key_map and f not in ignore]
-        else:
-            ordered_keys = [key_map[k.lower()] for k in keys if k.lower() not in ignore]
-
-        if not ordered_keys:
-            console.print("[red]No matching keys found![/red]")
+        try:
+            ordered_keys, rows = _select_rows(
+                data, filter, ignore, sort, direction, query, limit, offset)
+        except ValueError as e:
+            console.print(f"[red]{e}[/red]")
             return
 
-        # Apply query filter before sorting
-        if query:
-            filtered_data = []
-            for item in data:
-                item_value = _resolve_path(item, query_path)
-                if item_value is not None:
-                    try:
-                        if query_op(item_value, query_value):
-                            filtered_data.append(item)
-                    except TypeError:
-                        # Handle type mismatch gracefully
-                        continue
-            data = filtered_data
-            
-            if not data:
-                console.print("[red]No data matches the query![/red]")
-                return
-
-        # Sort data if sort key is provided
-        if sort and sort in key_map:
-            original_key = key_map[sort]
-            # Try numeric sort first
-            try:
-                sorted_data = sorted(
-                    data,
-                    key=lambda x: float(x.get(original_key, 0)),
-                    reverse=(direction == "desc")
-                )
-            except (ValueError, TypeError):
-                # Fall back to string sort
-                sorted_data = sorted(
-                    data,
-                    key=lambda x: str(x.get(original_key, "")),
-                    reverse=(direction == "desc")
-                )
-        else:
-            sorted_data = data
-
         # Add columns and display table
         for key in ordered_keys:
             table.add_column(camel_to_title(key), style="bright_white")
 
-        for item in sorted_data:
-            row = []
-            for key in ordered_keys:
-                value = item.get(key, "")
-                if isinstance(value, (int, float)) and value < 0:
-                    row.append(f"[red]{value}[/red]")
-                else:
-                    row.append(f"[bright_white]{value}[/bright_white]")
-            table.add_row(*row)
+        for item in rows:
+            table.add_row(*[_format_cell(item.get(key, "")) for key in ordered_keys])
 
     elif isinstance(data, dict):
         # Single dict can't be queried for rows
@@ -357,11 +652,7 @@ def dict_to_table(data, title="Data Table", filter=None, ignore=None, sort=None,
 
         # Add rows
         for key, value in filtered_data.items():
-            if isinstance(value, (int, float)) and value < 0:
-                value_str = f"[red]{value}[/red]"
-            else:
-                value_str = f"[bright_white]{value}[/bright_white]"
-            table.add_row(camel_to_title(key), value_str)
+            table.add_row(camel_to_title(key), _format_cell(value))
 
     else:
         console.print("[red]Unsupported data format![/red]")
@@ -369,5 +660,138 @@ def dict_to_table(data, title="Data Table", filter=None, ignore=None, sort=None,
 
     console.print(table)
 
-
-
+class LiveTable():
+    """Live updating table of a list of dicts, to be fed from a polling loop.
+    Rows are matched across updates by `key`, along with their rank among the rows of
+    the same key, only the cells whose value changed are formatted again and the table
+    is redrawn only when something changed, at most `refresh_per_second` times a second.
+    A change held back by the rate is drawn by a later update or by stop().
+    Args:
+        title (str, optional): The title to display above the table. Defaults to "Data Table".
+        filter, ignore, sort, direction, query, limit, offset: Same as dict_to_table.
+        key (str, optional): Field identifying a row across updates. Defaults to 'symbol'.
+        console (rich.console.Console, optional): Console to draw on. Defaults to a new one.
+        refresh_per_second (float, optional): Maximum number of redraws per second.
+            Defaults to 4.
+    Raises:
+        ValueError: If any of the options is invalid.
+    Example:
+        >>> with LiveTable("NIFTY 50", sort='pChange', limit=10) as table:
+        ...     while True:
+        ...         table.update(nse.get_stock_quote_in_index())
+        ...         time.sleep(5)
+    """
+    def __init__(self, title="Data Table", filter=None, ignore=None, sort=None, direction="desc",
+                 query=None, limit=None, offset=0, key='symbol', console=None, refresh_per_second=4):
+        from rich.live import Live
+
+        self.title = title
+        self.filter, self.ignore, self.sort, self.query = _table_options(
+            filter, ignore, sort, direction, query, limit, offset)
+        self.direction = direction
+        self.limit = limit
+        self.offset = offset
+        self.key = key
+        # (row id, column) -> (value, markup) of the cells last drawn
+        self._cells = {}
+        self._layout = None
+        self._interval = 1.0 / refresh_per_second
+        self._refreshed_at = None
+        # a change which is in the renderable but not on the screen yet
+        self._pending = False
+        self._live = Live(console=console, refresh_per_second=refresh_per_second,
+                          auto_refresh=False)
+
+    def start(self):
+        self._live.start()
+
+    def stop(self):
+        # rich draws the last renderable on stop, pending changes included
+        self._live.stop()
+        self._pending = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _due(self):
+        now = time.monotonic()
+        if self._refreshed_at is not None and now - self._refreshed_at < self._interval:
+            return False
+        self._refreshed_at = now
+        return True
+
+    def _draw(self, renderable):
+        refresh = self._due()
+        self._live.update(renderable, refresh=refresh)
+        self._pending = not refresh
+
+    def _flush(self):
+        if self._pending and self._due():
+            self._live.refresh()
+            self._pending = False
+
+    def update(self, data):
+        """Updates the table with a new snapshot of the data.
+        Args:
+            data (List[dict]): Rows, like the ones returned by the list returning Nse APIs.
+        Returns:
+            int: Number of cells which changed since the previous update.
+        """
+        from rich.table import Table
+        from rich.text import Text
+
+        try:
+            if not data:
+                raise ValueError("No data to display!")
+            columns, rows = _select_rows(data, self.filter, self.ignore, self.sort,
+                                         self.direction, self.query, self.limit, self.offset)
+        except ValueError as e:
+            if self._layout != str(e):
+                self._layout = str(e)
+                self._cells = {}
+                self._draw(Text(str(e), style="red"))
+            else:
+                self._flush()
+            return 0
+
+        cells = {}
+        formatted = []
+        row_ids = []
+        seen = {}
+        changed = 0
+        for index, item in enumerate(rows):
+            key = item.get(self.key, index)
+            # rows sharing a key, like a symbol in two series, are told apart by their rank
+            rank = seen[key] = seen.get(key, -1) + 1
+            row_id = (key, rank)
+            row_ids.append(row_id)
+            row = []
+            for column in columns:
+                value = item.get(column, "")
+                cached = self._cells.get((row_id, column))
+                if cached is not None and type(cached[0]) is type(value) and cached[0] == value:
+                    markup = cached[1]
+                else:
+                    markup = _format_cell(value)
+                    changed += 1
+                cells[(row_id, column)] = (value, markup)
+                row.append(markup)
+            formatted.append(row)
+        self._cells = cells
+
+        layout = (tuple(columns), tuple(row_ids))
+        if changed or layout != self._layout:
+            self._layout = layout
+            table = Table(title=self.title)
+            for column in columns:
+                table.add_column(camel_to_title(column), style="bright_white")
+            for row in formatted:
+                table.add_row(*row)
+            self._draw(table)
+        else:
+            self._flush()
+        return changed
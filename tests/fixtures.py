@@ -0,0 +1,74 @@
+"""
+Recorded NSE payloads and an offline session to run Nse against them
+"""
+import os
+import json
+from nsetools import Nse, urls
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# payload file for every endpoint the recorded data covers
+PAYLOADS = {
+    urls.QUOTE_API_URL: 'quote_equity',
+    urls.STOCKS_IN_INDEX_URL: 'equity_stockIndices',
+    urls.ALL_INDICES_URL: 'allIndices',
+    urls.TOP_GAINERS_URL: 'live_analysis_variations',
+    urls.TOP_LOSERS_URL: 'live_analysis_variations',
+    urls.FIFTYTWO_WEEK_HIGH_URL: '52weekhighstock',
+    urls.FIFTYTWO_WEEK_LOW_URL: '52weekhighstock',
+    urls.QUOTE_DRIVATIVE_URL: 'quote_derivative',
+}
+
+# a quote-derivative record with every field the future quote flattens
+FUTURE_RECORD = {
+    'metadata': {'instrumentType': 'Stock Futures', 'expiryDate': '27-Mar-2025',
+                 'lastPrice': 1246, 'openPrice': 1245.25, 'highPrice': 1260.85,
+                 'lowPrice': 1236.2, 'closePrice': 0, 'prevClose': 1240, 'change': 6,
+                 'pChange': 0.48, 'numberOfContractsTraded': 100, 'totalTurnover': 12345.6},
+    'underlyingValue': 1241.55,
+    'marketDeptOrderBook': {
+        'tradeInfo': {'tradedVolume': 5000, 'openInterest': 257812, 'changeinOpenInterest': 7144,
+                      'pchangeinOpenInterest': 2.857, 'marketLot': 500},
+        'otherInfo': {'dailyvolatility': 1.2, 'annualisedVolatility': 22.9},
+    },
+}
+
+
+def payload_names():
+    return sorted(set(PAYLOADS.values()))
+
+
+def load_payload(name):
+    """Returns the raw bytes of a recorded payload."""
+    with open(os.path.join(DATA_DIR, name + '.json'), 'rb') as fh:
+        return fh.read()
+
+
+class FakeResponse():
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSession():
+    """Serves recorded payloads in place of nsetools.ua.Session"""
+    def __init__(self):
+        self.fetched = []
+
+    def fetch(self, url):
+        self.fetched.append(url)
+        for template, name in PAYLOADS.items():
+            prefix = template.split('%s')[0]
+            if url == template or ('%s' in template and url.startswith(prefix)):
+                return FakeResponse(load_payload(name))
+        raise KeyError("no recorded payload for %s" % url)
+
+
+def offline_nse():
+    """Returns an Nse instance which serves recorded payloads without network."""
+    nse = Nse.__new__(Nse)
+    nse.session_refresh_interval = 120
+    nse.session = FakeSession()
+    return nse
@@ -0,0 +1,248 @@
+import os
+import shutil
+import tempfile
+import unittest
+import datetime as dt
+import numpy as np
+from nsetools.analytics import (Panel, Indicators, resample, sma, ema, rsi, atr, volatility,
+                                correlation, beta, risk_matrices)
+from nsetools.store import BhavcopyStore
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def random_panel(seed=0, symbols=5, days=60):
+    rng = np.random.default_rng(seed)
+    dates = np.arange('2024-01-01', '2024-06-30', dtype='datetime64[D]')
+    dates = dates[np.is_busday(dates)][:days]
+    rows = {'symbol': [], 'date': [], 'close': [], 'high': [], 'low': []}
+    for code in range(symbols):
+        # listings of different lengths, the last symbol having a single row
+        count = 1 if code == symbols - 1 else int(rng.integers(days // 2, days + 1))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, count)))
+        rows['symbol'].append(np.full(count, code))
+        rows['date'].append(dates[days - count:])
+        rows['close'].append(close)
+        rows['high'].append(close * (1 + rng.uniform(0, 0.02, count)))
+        rows['low'].append(close * (1 - rng.uniform(0, 0.02, count)))
+    data = {name: np.concatenate(values) for name, values in rows.items()}
+    # rows come by date from the store, not by symbol
+    order = rng.permutation(len(data['date']))
+    return Panel({name: values[order] for name, values in data.items()})
+
+
+@unittest.skipIf(pd is None, "pandas not installed")
+class TestIndicators(unittest.TestCase):
+    def setUp(self):
+        self.panel = random_panel()
+        self.df = pd.DataFrame(self.panel.data)
+        self.grouped = self.df.groupby('symbol', sort=False)
+
+    def assertSeries(self, values, expected):
+        np.testing.assert_allclose(values, np.asarray(expected, dtype='float64'), rtol=1e-9, atol=1e-9)
+
+    def test_panel(self):
+        panel = self.panel
+        self.assertEqual(panel.keys.tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(panel.offsets[-1], len(panel['close']))
+        segment = panel.segment(2)
+        self.assertTrue((np.diff(segment['date']) > np.timedelta64(0, 'D')).all())
+        self.assertEqual(len(panel.segment(4)['close']), 1)
+        with self.assertRaises(KeyError):
+            panel.segment(9)
+
+    def test_against_pandas(self):
+        panel, grouped = self.panel, self.grouped
+        close = grouped['close']
+        self.assertSeries(sma(panel['close'], panel.offsets, 10),
+                          close.transform(lambda s: s.rolling(10).mean()))
+        self.assertSeries(ema(panel['close'], panel.offsets, 10),
+                          close.transform(lambda s: s.ewm(span=10, adjust=False, min_periods=10).mean()))
+
+        def wilder(s, window):
+            return s.ewm(alpha=1.0 / window, adjust=False, min_periods=window).mean()
+
+        change = close.diff()
+        gain = change.clip(lower=0).groupby(self.df['symbol']).transform(lambda s: wilder(s.iloc[1:], 14))
+        loss = (-change).clip(lower=0).groupby(self.df['symbol']).transform(lambda s: wilder(s.iloc[1:], 14))
+        self.assertSeries(rsi(panel['close'], panel.offsets, 14), 100 * gain / (gain + loss))
+
+        previous = close.shift()
+        tr = pd.concat([self.df['high'] - self.df['low'], (self.df['high'] - previous).abs(),
+                        (self.df['low'] - previous).abs()], axis=1).max(axis=1)
+        self.assertSeries(atr(panel['high'], panel['low'], panel['close'], panel.offsets, 14),
+                          tr.groupby(self.df['symbol']).transform(lambda s: wilder(s, 14)))
+
+        returns = np.log(self.df['close'] / previous)
+        expected = returns.groupby(self.df['symbol']).transform(lambda s: s.rolling(20).std()) * np.sqrt(252)
+        self.assertSeries(volatility(panel['close'], panel.offsets, 20), expected)
+
+    def test_resample(self):
+        weekly = resample(self.panel, 'W')
+        self.assertEqual(weekly.keys.tolist(), self.panel.keys.tolist())
+        df = self.df.assign(week=self.df['date'].dt.to_period('W-SUN'))
+        expected = df.groupby(['symbol', 'week'], sort=False).agg(
+            date=('date', 'last'), high=('high', 'max'), low=('low', 'min'), close=('close', 'last'))
+        self.assertEqual(weekly['date'].tolist(), expected['date'].dt.date.tolist())
+        for name in ('high', 'low', 'close'):
+            self.assertSeries(weekly[name], expected[name])
+        self.assertEqual(np.diff(weekly.offsets).tolist(),
+                         expected.groupby(level=0, sort=False).size().tolist())
+        monthly = resample(self.panel, 'M')
+        self.assertEqual(len(monthly.segment(0)['date']), len(np.unique(
+            self.panel.segment(0)['date'].astype('datetime64[M]'))))
+        with self.assertRaises(ValueError):
+            resample(self.panel, 'Q')
+
+    def test_incremental_update(self):
+        panel = self.panel
+        last = panel['date'] == panel['date'].max()
+        history = Panel({name: values[~last] for name, values in panel.data.items()})
+        indicators = Indicators(sma=(5, 20), ema=(10,), rsi=(14,), atr=(14,), volatility=(5, 20))
+        full = indicators.compute(panel)
+        indicators.compute(history)
+        # a new symbol, whose code is past the state arrays
+        day = {name: np.append(values[last], values[last][:1]) for name, values in panel.data.items()}
+        day['symbol'][-1] = 40
+        updated = indicators.update(day)
+        self.assertEqual(sorted(updated), sorted(indicators.names()))
+        for name in indicators.names():
+            self.assertSeries(updated[name][:-1], full[name][last])
+            self.assertTrue(np.isnan(updated[name][-1]))
+        self.assertEqual(indicators.count[40], 1)
+
+
+class TestMissingValues(unittest.TestCase):
+    def test_nan_close_is_carried_over(self):
+        panel = random_panel(seed=3, symbols=2)
+        start, end = panel.offsets[0], panel.offsets[1]
+        halted = start + 25
+        close = panel['close'].copy()
+        close[halted] = np.nan
+        high, low = panel['high'].copy(), panel['low'].copy()
+        high[halted] = low[halted] = np.nan
+        data = dict(panel.data, close=close, high=high, low=low)
+        # the same segment without the halted day
+        kept = np.ones(len(close), dtype=bool)
+        kept[halted] = False
+        skipped = Panel({name: values[kept] for name, values in data.items()})
+        offsets, skipped_offsets = panel.offsets, skipped.offsets
+
+        for name, values, expected in (
+                ('ema', ema(close, offsets, 10), ema(skipped['close'], skipped_offsets, 10)),
+                ('rsi', rsi(close, offsets, 14), rsi(skipped['close'], skipped_offsets, 14)),
+                ('atr', atr(high, low, close, offsets, 14),
+                 atr(skipped['high'], skipped['low'], skipped['close'], skipped_offsets, 14))):
+            with self.subTest(indicator=name):
+                segment = values[start:end]
+                self.assertFalse(np.isnan(segment[25:]).any())
+                self.assertEqual(segment[25], segment[24])
+                np.testing.assert_allclose(np.delete(segment, 25)[25:],
+                                           expected[skipped_offsets[0]:skipped_offsets[1]][25:])
+
+        # the incremental update carries it over the same way
+        indicators = Indicators(sma=(5,), ema=(10,), rsi=(14,), atr=(14,), volatility=(5,))
+        nan_panel = Panel(data)
+        full = indicators.compute(nan_panel)
+        cut = nan_panel.offsets[0] + 26
+        before = np.ones(len(close), dtype=bool)
+        before[start + 24:end] = False
+        indicators.compute(Panel({name: values[before] for name, values in nan_panel.data.items()}))
+        for row in range(start + 24, cut + 4):
+            day = {name: values[row:row + 1] for name, values in nan_panel.data.items()}
+            updated = indicators.update(day)
+        for name in indicators.names():
+            np.testing.assert_allclose(updated[name], full[name][row:row + 1], err_msg=name)
+
+
+class TestPanelFromStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = BhavcopyStore(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_series_preference(self):
+        store = self.store
+        store.ingest('2025-01-23', [{'SYMBOL': 'INFY', 'SERIES': 'EQ', 'CLOSE': '10'},
+                                    {'SYMBOL': 'INFY', 'SERIES': 'BL', 'CLOSE': '11'},
+                                    {'SYMBOL': 'TCS', 'SERIES': 'BE', 'CLOSE': '20'}])
+        store.ingest('2025-01-24', [{'SYMBOL': 'TCS', 'SERIES': 'EQ', 'CLOSE': '21'},
+                                    {'SYMBOL': 'TCS', 'SERIES': 'BE', 'CLOSE': '22'},
+                                    {'SYMBOL': 'INFY', 'SERIES': 'EQ', 'CLOSE': '12'}])
+        panel = Panel.from_store(store, columns=['close'])
+        self.assertEqual(panel.segment(store.symbol_code('INFY'))['close'].tolist(), [10, 12])
+        self.assertEqual(panel.segment(store.symbol_code('TCS'))['close'].tolist(), [20, 21])
+        self.assertEqual(panel['date'][:2].tolist(), [dt.date(2025, 1, 23), dt.date(2025, 1, 24)])
+        self.assertEqual(len(Panel.from_store(store, columns=['close'], series=None)['close']), 6)
+
+
+@unittest.skipIf(pd is None, "pandas not installed")
+class TestRisk(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        market = rng.normal(0, 0.01, 300)
+        self.betas = rng.uniform(0.5, 1.5, 40)
+        self.returns = market[:, None] * self.betas + rng.normal(0, 0.01, (300, 40))
+        self.returns[rng.random(self.returns.shape) < 0.05] = np.nan
+        self.returns[:, 3] = np.nan
+        self.market = market
+
+    def test_correlation(self):
+        expected = pd.DataFrame(self.returns).corr(min_periods=20).to_numpy()
+        values = correlation(self.returns, block=16)
+        np.testing.assert_allclose(values, expected, atol=1e-10)
+        values = correlation(self.returns, block=7, dtype='float32')
+        self.assertEqual(values.dtype, np.float32)
+        np.testing.assert_allclose(values, expected, atol=1e-4)
+
+    def test_beta(self):
+        values = beta(self.returns, self.market)
+        expected = [pd.Series(self.returns[:, i]).cov(pd.Series(self.market)) /
+                    pd.Series(self.market)[~np.isnan(self.returns[:, i])].var()
+                    for i in range(self.returns.shape[1])]
+        np.testing.assert_allclose(values, expected, atol=1e-10)
+        self.assertTrue(np.isnan(values[3]))
+        self.assertLess(np.nanmax(np.abs(values - self.betas)), 0.2)
+
+    def test_risk_matrices(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = BhavcopyStore(directory)
+            dates = np.arange('2024-01-01', '2024-03-01', dtype='datetime64[D]')
+            returns = np.nan_to_num(np.column_stack([self.market, self.returns[:, :2]])[:len(dates)])
+            closes = 100 * np.cumprod(1 + returns, axis=0)
+            for d, row in zip(dates.tolist(), closes):
+                store.ingest(d, [['SYMBOL', 'SERIES', 'CLOSE'], ['NIFTYBEES', 'EQ', str(row[0])],
+                                 ['A', 'EQ', str(row[1])], ['B', 'EQ', str(row[2])]])
+            risk = risk_matrices(store, ['A', 'B', 'MISSING'], window=30, min_periods=10)
+            self.assertEqual(len(risk['dates']), 30)
+            self.assertEqual(risk['dates'][-1], dates[-1])
+            self.assertEqual(risk['correlation'].shape, (3, 3))
+            self.assertEqual(risk['correlation'][0, 0], 1)
+            self.assertTrue(np.isnan(risk['beta'][2]))
+            cached = risk_matrices(store, ['A', 'B', 'MISSING'], window=30, min_periods=10)
+            self.assertIs(cached['correlation'], risk['correlation'])
+            self.assertIsNot(risk_matrices(store, ['A', 'B', 'MISSING'], window=30, min_periods=10,
+                                           end=dates[-2].tolist())['correlation'], risk['correlation'])
+            # cached results can't be modified in place
+            with self.assertRaises(ValueError):
+                cached['correlation'][np.isnan(cached['correlation'])] = 0
+            with self.assertRaises(ValueError):
+                cached['beta'][0] = 1
+            # re-ingesting a day of the window moves on to new results
+            store.ingest(dates[-1].tolist(), [['SYMBOL', 'SERIES', 'CLOSE'], ['NIFTYBEES', 'EQ', '1'],
+                                               ['A', 'EQ', '1'], ['B', 'EQ', '1']])
+            fresh = risk_matrices(store, ['A', 'B', 'MISSING'], window=30, min_periods=10)
+            self.assertIsNot(fresh['correlation'], risk['correlation'])
+            self.assertNotEqual(fresh['beta'][0], risk['beta'][0])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from nsetools.columnar import records_to_columns, build_columns, validate_output
+from nsetools.fields import flatten_future_quote, future_quote_columns
+from fixtures import FUTURE_RECORD
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+RECORDS = [
+    {'symbol': 'INFY', 'series': 'EQ', 'lastPrice': '1580.55', 'totalTradedVolume': 120000,
+     'pChange': -1.234, 'meta': {'isFNOSec': True}},
+    {'symbol': 'TCS', 'series': 'EQ', 'lastPrice': 3500, 'totalTradedVolume': '9000',
+     'pChange': '-'},
+]
+
+
+class TestColumnar(unittest.TestCase):
+    def test_validate_output(self):
+        validate_output('records')
+        with self.assertRaises(ValueError):
+            validate_output('csv')
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_numpy_columns(self):
+        columns = records_to_columns(RECORDS, 'numpy')
+        # nested values are skipped
+        self.assertNotIn('meta', columns)
+        self.assertEqual(columns['lastPrice'].dtype, np.float64)
+        self.assertEqual(columns['lastPrice'].tolist(), [1580.55, 3500.0])
+        self.assertEqual(columns['totalTradedVolume'].dtype, np.int64)
+        self.assertEqual(columns['pChange'][0], -1.23)
+        self.assertTrue(np.isnan(columns['pChange'][1]))
+        self.assertEqual(columns['symbol'].tolist(), ['INFY', 'TCS'])
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_whole_number_prices(self):
+        # prices stay float64 when a snapshot has only whole numbers, quantities stay int64
+        records = [{'symbol': 'INFY', 'lastPrice': '1580', 'pChange': 2, 'totalTradedVolume': '10'},
+                   {'symbol': 'TCS', 'lastPrice': 3500, 'pChange': '-1', 'totalTradedVolume': 20}]
+        columns = records_to_columns(records, 'numpy')
+        self.assertEqual(columns['lastPrice'].dtype, np.float64)
+        self.assertEqual(columns['lastPrice'].tolist(), [1580.0, 3500.0])
+        self.assertEqual(columns['pChange'].dtype, np.float64)
+        self.assertEqual(columns['totalTradedVolume'].dtype, np.int64)
+
+    @unittest.skipIf(pd is None, "pandas not installed")
+    def test_pandas_columns(self):
+        frame = records_to_columns(RECORDS, 'pandas')
+        self.assertEqual(str(frame['symbol'].dtype), 'category')
+        self.assertEqual(str(frame['lastPrice'].dtype), 'float64')
+        self.assertEqual(len(frame), 2)
+
+    def test_flatten_future_quote(self):
+        flat = flatten_future_quote(FUTURE_RECORD)
+        self.assertEqual(flat['expiryDate'], '27-Mar-2025')
+        self.assertEqual(flat['dailyVolatility'], 1.2)
+        self.assertAlmostEqual(flat['premium'], 4.45)
+        columns = future_quote_columns([FUTURE_RECORD])
+        self.assertEqual(list(columns), list(flat))
+        self.assertEqual(columns['openInterest'], [257812])
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_future_columns(self):
+        columns = build_columns(future_quote_columns([FUTURE_RECORD]), 'numpy')
+        self.assertEqual(columns['premium'].tolist(), [4.45])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+import datetime as dt
+import numpy as np
+from nsetools.corporate_actions import CorporateActions, parse_purpose
+from nsetools.store import BhavcopyStore
+from fixtures import offline_nse
+
+
+class TestParsePurpose(unittest.TestCase):
+    def test_purposes(self):
+        split = 'Face Value Split (Sub-Division) - From Rs 5/- Per Share To Re 1/- Per Share'
+        self.assertAlmostEqual(parse_purpose(split), 0.2)
+        self.assertAlmostEqual(parse_purpose('Face Value Split From Rs.10/- To Rs.2/-'), 0.2)
+        self.assertAlmostEqual(parse_purpose('FV SPLIT RS 10 TO RE 1'), 0.1)
+        self.assertEqual(parse_purpose('Bonus 1:1'), 0.5)
+        self.assertAlmostEqual(parse_purpose('BONUS 3:2'), 0.4)
+        self.assertAlmostEqual(parse_purpose('Bonus 1:1 And Face Value Split From Rs 2 To Re 1'), 0.25)
+        for purpose in ('Dividend - Rs 10 Per Share', 'Rights 1:5 @ Premium Rs 100', '', None):
+            self.assertIsNone(parse_purpose(purpose), purpose)
+
+
+class TestCorporateActions(unittest.TestCase):
+    def test_adjustments(self):
+        actions = CorporateActions()
+        self.assertEqual(actions.add('INFY', '10-01-2024', 'Bonus 1:1'), 0.5)
+        actions.add('INFY', '10-01-2024', 'Bonus 1:1')
+        actions.add('INFY', '20-01-2024', 'Face Value Split From Rs 5 To Re 1')
+        actions.add('INFY', '20-01-2024', 'Dividend - Rs 10 Per Share')
+        self.assertEqual(len(actions), 3)
+        dates = np.array(['2024-01-09', '2024-01-10', '2024-01-19', '2024-01-20'], dtype='datetime64[D]')
+        np.testing.assert_allclose(actions.adjustments('INFY', dates), [0.1, 0.2, 0.2, 1])
+        # prices after as_of are scaled back to its share count
+        np.testing.assert_allclose(actions.adjustments('INFY', dates, as_of='15-01-2024'), [0.5, 1, 1, 5])
+        np.testing.assert_allclose(actions.adjustments('TCS', dates), [1, 1, 1, 1])
+
+        history = {'date': dates, 'close': np.array([1000.0, 500, 500, 100]),
+                   'traded_quantity': np.array([10, 20, 20, 100])}
+        actions.adjust('INFY', history)
+        np.testing.assert_allclose(history['close'], [100, 100, 100, 100])
+        np.testing.assert_allclose(history['traded_quantity'], [100, 100, 100, 100])
+
+    def test_records_and_save(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'actions.json')
+            actions = CorporateActions(path)
+            gainers = offline_nse().get_top_gainers(parse_dates=True)
+            self.assertGreater(actions.add_records(gainers), 0)
+            actions.save()
+            loaded = CorporateActions(path)
+            self.assertEqual(len(loaded), len(actions))
+            symbol = next(record['symbol'] for record in gainers if record.get('ca_purpose'))
+            self.assertEqual(loaded.actions(symbol), actions.actions(symbol))
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestAdjustedHistory(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = BhavcopyStore(self.directory)
+        header = ['SYMBOL', 'SERIES', 'CLOSE', 'TOTTRDQTY', 'ISIN']
+        for d, close, quantity in (('2024-01-09', '1000', '10'), ('2024-01-10', '510', '20'),
+                                   ('2024-01-11', '520', '30')):
+            self.store.ingest(d, [header, ['INFY', 'EQ', close, quantity, 'INE009A01021']])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_history(self):
+        store = self.store
+        store.actions.add('INFY', dt.date(2024, 1, 10), 'Bonus 1:1')
+        self.assertEqual(store.history('INFY', columns=['close'])['close'].tolist(), [1000, 510, 520])
+        history = store.history('INFY', columns=['close', 'traded_quantity'], adjust=True)
+        self.assertEqual(history['close'].tolist(), [500, 510, 520])
+        self.assertEqual(history['traded_quantity'].tolist(), [20, 20, 30])
+        # as of a date before the bonus nothing is adjusted
+        self.assertEqual(store.history('INFY', end='2024-01-09', adjust=True)['close'].tolist(), [1000])
+        other = CorporateActions()
+        other.add('INFY', '11-01-2024', 'Face Value Split From Rs 10 To Rs 5')
+        self.assertEqual(store.history('INE009A01021', columns=['close'], adjust=other)['close'].tolist(),
+                         [500, 255, 520])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import warnings
+import datetime as dt
+from nsetools.datemgr import (TradingCalendar, default_calendar, is_known_holiday,
+                              get_nearest_business_day, get_date_range, match_datetime,
+                              parse_datetime, mkdate)
+from nsetools.cleaners import parse_values
+from nsetools.errors import HolidaysNotCoveredWarning
+
+# weekday holidays from 2023 to mid March 2025, typed in from the NSE circulars
+# rather than read from the shipped holidays file
+HOLIDAYS = frozenset(dt.date.fromisoformat(d) for d in (
+    '2023-01-26', '2023-03-07', '2023-03-30', '2023-04-04', '2023-04-07', '2023-04-14',
+    '2023-05-01', '2023-06-29', '2023-08-15', '2023-09-19', '2023-10-02', '2023-10-24',
+    '2023-11-14', '2023-11-27', '2023-12-25',
+    '2024-01-22', '2024-01-26', '2024-03-08', '2024-03-25', '2024-03-29', '2024-04-11',
+    '2024-04-17', '2024-05-01', '2024-05-20', '2024-06-17', '2024-07-17', '2024-08-15',
+    '2024-10-02', '2024-11-01', '2024-11-15', '2024-11-20', '2024-12-25',
+    '2025-02-26',
+))
+
+
+def brute_force(d):
+    return d.weekday() < 5 and d not in HOLIDAYS
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = TradingCalendar.from_csv()
+
+    def test_holidays(self):
+        c = self.calendar
+        self.assertTrue(c.is_trading_day(dt.date(2025, 1, 24)))
+        self.assertFalse(c.is_trading_day(dt.date(2025, 1, 25)))
+        self.assertTrue(c.is_holiday(dt.date(2025, 8, 15)))
+        self.assertTrue(c.is_holiday(dt.date(2025, 3, 14)))     # holi
+        self.assertFalse(c.is_holiday(dt.date(2025, 1, 25)))    # weekend
+        for d in ('2026-01-15', '2026-03-03', '2026-04-03', '2026-10-20', '2026-11-10'):
+            self.assertTrue(c.is_holiday(dt.date.fromisoformat(d)), d)
+        for d in ('2026-03-02', '2026-03-04', '2026-11-09', '2026-11-11'):
+            self.assertTrue(c.is_trading_day(dt.date.fromisoformat(d)), d)
+        # years outside of the holidays file fall back to the fixed holidays, with a warning
+        with self.assertWarns(HolidaysNotCoveredWarning):
+            self.assertTrue(c.is_holiday(dt.datetime(2030, 10, 2, 10, 0)))
+        with warnings.catch_warnings():
+            # warned once per year
+            warnings.simplefilter('error')
+            self.assertTrue(c.is_trading_day(dt.date(2030, 10, 3)))
+        with self.assertWarns(HolidaysNotCoveredWarning):
+            c.trading_days(dt.date(2026, 12, 1), dt.date(2027, 1, 31))
+
+    def test_is_known_holiday(self):
+        # labour day used to return a date instead of True
+        self.assertIs(is_known_holiday(dt.date(2025, 5, 1)), True)
+        self.assertIs(is_known_holiday(dt.date(2031, 5, 1)), True)
+        self.assertIs(is_known_holiday(dt.date(2025, 5, 2)), False)
+
+    def test_against_brute_force(self):
+        c = self.calendar
+        start = dt.date(2023, 1, 1)
+        days = [start + dt.timedelta(days=i) for i in range(800)]
+        trading = [d for d in days if brute_force(d)]
+        self.assertEqual([d for d in days if c.is_trading_day(d)], trading)
+        self.assertEqual(c.trading_days(days[0], days[-1]), trading)
+        self.assertEqual(c.trading_days_between(days[0], days[-1]), len(trading))
+        for d in days[3:-10]:
+            self.assertEqual(c.next_trading_day(d), min(t for t in trading if t > d))
+            self.assertEqual(c.previous_trading_day(d), max(t for t in trading if t < d))
+        self.assertEqual(c.shift(trading[10], 5), trading[15])
+        self.assertEqual(c.shift(trading[10], -10), trading[0])
+        self.assertEqual(c.trading_days_between(days[5], days[2]), 0)
+
+    def test_window_grows(self):
+        c = TradingCalendar([dt.date(2025, 8, 15)])
+        with self.assertWarns(HolidaysNotCoveredWarning):
+            self.assertEqual(c.next_trading_day(dt.date(1999, 12, 31)), dt.date(2000, 1, 3))
+        with self.assertWarns(HolidaysNotCoveredWarning):
+            self.assertEqual(c.previous_trading_day(dt.date(2041, 1, 1)), dt.date(2040, 12, 31))
+        self.assertTrue(c.is_holiday(dt.date(2025, 8, 15)))
+
+    def test_numpy_range(self):
+        c = self.calendar
+        frm, to = dt.date(2024, 1, 1), dt.date(2026, 1, 31)
+        self.assertEqual(c.trading_days_array(frm, to).tolist(), c.trading_days(frm, to))
+        self.assertEqual(len(c.trading_days_array(to, frm)), 0)
+
+    def test_helpers(self):
+        self.assertIs(default_calendar(), default_calendar())
+        self.assertEqual(get_nearest_business_day(dt.date(2025, 8, 17)), dt.date(2025, 8, 14))
+        at = dt.datetime(2025, 1, 26, 11, 30)
+        self.assertEqual(get_nearest_business_day(at), dt.datetime(2025, 1, 24, 11, 30))
+        self.assertEqual(get_date_range('14-08-2025', '19-08-2025'),
+                         [dt.date(2025, 8, 14), dt.date(2025, 8, 18), dt.date(2025, 8, 19)])
+
+
+class TestParseDates(unittest.TestCase):
+    def test_match_datetime(self):
+        expected = dt.datetime(2025, 3, 27)
+        for text in ('27-Mar-2025', '27-MAR-2025', '2025-03-27', '27-03-2025', ' 27-Mar-2025 '):
+            self.assertEqual(match_datetime(text), expected, text)
+        self.assertEqual(match_datetime('17-Jan-2025 16:00:00'), dt.datetime(2025, 1, 17, 16))
+        self.assertEqual(match_datetime('2025-01-17T09:15'), dt.datetime(2025, 1, 17, 9, 15))
+        for text in ('31-Feb-2025', '27-Foo-2025', 'INFY', '-', '2025', '27-Mar-2025 later'):
+            self.assertIsNone(match_datetime(text), text)
+        self.assertIs(match_datetime('27-Mar-2025'), match_datetime('27-Mar-2025'))
+
+    def test_fallback(self):
+        self.assertEqual(parse_datetime('27/03/2025'), dt.datetime(2025, 3, 27))
+        self.assertEqual(mkdate('5 Jan 2024'), dt.date(2024, 1, 5))
+        self.assertEqual(mkdate('01-02-2024'), dt.date(2024, 2, 1))
+        with self.assertRaises(ValueError):
+            parse_datetime('not a date')
+
+    def test_parse_values(self):
+        record = {'expiryDate': '27-Mar-2025', 'ca_ex_dt': '2024-08-02', 'symbol': 'INFY',
+                  'lastPrice': '1500.5', 'meta': {'listingDate': '08-02-1995'}}
+        parse_values(record)
+        self.assertEqual(record['expiryDate'], dt.datetime(2025, 3, 27))
+        self.assertEqual(record['ca_ex_dt'], dt.datetime(2024, 8, 2))
+        self.assertEqual(record['meta']['listingDate'], dt.datetime(1995, 2, 8))
+        self.assertEqual(record['symbol'], 'INFY')
+        self.assertEqual(record['lastPrice'], 1500.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import unittest
+import datetime as dt
+from nsetools import decoder
+from nsetools.fields import flatten_future_quote
+from nsetools.utils import cast_intfloat_string_values_to_intfloat
+from fixtures import payload_names, load_payload, offline_nse
+
+TRICKY = b'''{"int": "12", "float": "12.3456", "spaced": " 42 ", "exp": "1e5", "dash": "-",
+"text": "INFY", "inf": "-Infinity", "under": "1_000", "bad": "1._5", "date": "21-Mar-2025",
+"num": 3.14159, "big": 12345678901234567890, "flag": true, "none": null,
+"list": ["1", "2.555", "x", ["3", 4.444], {"a": "5"}], "nested": {"deep": [{"b": "6.789"}]}}'''
+
+
+class TestDecoder(unittest.TestCase):
+    def expected(self, content):
+        return cast_intfloat_string_values_to_intfloat(json.loads(content))
+
+    def test_differential_recorded_payloads(self):
+        for name in payload_names():
+            content = load_payload(name)
+            for backend in decoder.DECODERS:
+                with self.subTest(payload=name, decoder=backend):
+                    self.assertEqual(decoder.loads(content, decoder=backend),
+                                     self.expected(content))
+
+    def test_differential_with_plans(self):
+        for name in payload_names():
+            content = load_payload(name)
+            for backend in decoder.DECODERS:
+                # first call learns the plan, second one applies it
+                for _ in range(2):
+                    with self.subTest(payload=name, decoder=backend):
+                        self.assertEqual(decoder.loads(content, decoder=backend, endpoint=name),
+                                         self.expected(content))
+
+    def test_differential_tricky_values(self):
+        for backend in decoder.DECODERS:
+            with self.subTest(decoder=backend):
+                self.assertEqual(decoder.loads(TRICKY, decoder=backend), self.expected(TRICKY))
+
+    def test_top_level_values(self):
+        for content in (b'["1", "2.5", "x"]', b'"12"', b'1.2345'):
+            for backend in decoder.DECODERS:
+                self.assertEqual(decoder.loads(content, decoder=backend), self.expected(content))
+
+    def test_round_digits(self):
+        self.assertEqual(decoder.loads(b'{"a": "1.23456"}', round_digits=3, decoder='json'),
+                         {'a': 1.235})
+
+    def test_no_cast(self):
+        self.assertEqual(decoder.loads(b'{"a": "1"}', cast=False), {'a': '1'})
+
+    def test_nan_literals(self):
+        content = b'{"a": NaN, "b": [Infinity, "1.5"]}'
+        for backend in decoder.DECODERS:
+            with self.subTest(decoder=backend):
+                data = decoder.loads(content, decoder=backend)
+                self.assertEqual(repr(data), repr({'a': float('nan'), 'b': [float('inf'), 1.5]}))
+                self.assertEqual(repr(decoder.loads(content, cast=False, decoder=backend)),
+                                 repr(json.loads(content)))
+
+    def test_dates_need_endpoint(self):
+        with self.assertRaises(ValueError):
+            decoder.loads(b'{"ca_ex_dt": "12-Aug-2024"}', dates=['ca_ex_dt'])
+
+    def test_register_decoder(self):
+        decoder.register_decoder('test', json.loads)
+        try:
+            self.assertEqual(decoder.loads(b'{"a": "1"}', decoder='test'), {'a': 1})
+        finally:
+            del decoder.DECODERS['test']
+
+
+class TestNseDecoding(unittest.TestCase):
+    def setUp(self):
+        self.nse = offline_nse()
+
+    def test_outputs_match_previous_pipeline(self):
+        raw = json.loads(load_payload('equity_stockIndices'))
+        expected = [r for r in cast_intfloat_string_values_to_intfloat(raw)['data'] if r['priority'] == 0]
+        self.assertEqual(self.nse.get_stock_quote_in_index('NIFTY 50'), expected)
+
+        raw = json.loads(load_payload('quote_equity'))
+        self.assertEqual(self.nse.get_quote('infy'),
+                         cast_intfloat_string_values_to_intfloat(raw['priceInfo']))
+
+        raw = json.loads(load_payload('quote_derivative'))
+        futures = [flatten_future_quote(s) for s in raw['stocks']
+                   if s['metadata']['instrumentType'] == 'Stock Futures']
+        self.assertEqual(self.nse.get_future_quote('reliance'),
+                         cast_intfloat_string_values_to_intfloat(futures))
+
+    def test_parse_dates(self):
+        futures = self.nse.get_future_quote('reliance', parse_dates=True)
+        plain = self.nse.get_future_quote('reliance')
+        for parsed, record in zip(futures, plain):
+            self.assertEqual(parsed['expiryDate'],
+                             dt.datetime.strptime(record['expiryDate'], '%d-%b-%Y'))
+            self.assertEqual(parsed['lastPrice'], record['lastPrice'])
+        quote = self.nse.get_future_quote('reliance', plain[0]['expiryDate'], parse_dates=True)
+        self.assertEqual(quote, futures[0])
+
+        high = self.nse.get_52_week_high(parse_dates=True)
+        self.assertEqual(high[0]['prevHLDate'], dt.datetime(2025, 3, 13))
+        # the second call goes through the learned plan, None is passed through
+        for _ in range(2):
+            gainers = self.nse.get_top_gainers(index='ALL', parse_dates=True)
+            dates = set(type(record['ca_ex_dt']) for record in gainers)
+            self.assertLessEqual(dates, {dt.datetime, type(None)})
+        self.assertIsInstance(self.nse.get_top_losers()[0]['perChange'], float)
+
+        with self.assertRaises(ValueError):
+            self.nse.get_top_gainers(typed=True, parse_dates=True)
+        with self.assertRaises(ValueError):
+            self.nse.get_52_week_low(output='numpy', parse_dates=True)
+
+    def test_date_plans(self):
+        records = [{'ca_ex_dt': None, 'x': '1'}, {'ca_ex_dt': '12-Aug-2024', 'x': '2'}]
+        self.assertEqual(decoder.loads(json.dumps(records), endpoint='test_dates_none',
+                                       dates=['ca_ex_dt']),
+                         [{'ca_ex_dt': None, 'x': 1}, {'ca_ex_dt': dt.datetime(2024, 8, 12), 'x': 2}])
+        # a value in another format or not a date at all doesn't break the plan
+        records = [{'ca_ex_dt': '2024-08-12'}, {'ca_ex_dt': '-'}]
+        self.assertEqual(decoder.loads(json.dumps(records), endpoint='test_dates_text',
+                                       dates=['ca_ex_dt']),
+                         [{'ca_ex_dt': dt.datetime(2024, 8, 12)}, {'ca_ex_dt': '-'}])
+        # a date field seen first as '-' still parses the dates of the later payloads
+        for payload, expected in (({'ca_ex_dt': '-'}, '-'),
+                                  ({'ca_ex_dt': '12-Aug-2024'}, dt.datetime(2024, 8, 12)),
+                                  ({'ca_ex_dt': '13-Aug-2024'}, dt.datetime(2024, 8, 13))):
+            self.assertEqual(decoder.loads(json.dumps(payload), endpoint='test_date_plans',
+                                           dates=['ca_ex_dt']), {'ca_ex_dt': expected})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import io
+import os
+import json
+import shutil
+import zipfile
+import tempfile
+import threading
+import unittest
+import tracemalloc
+import datetime as dt
+from nsetools.downloader import (BhavcopyFileSystemDownloader, FnoBhavcopyFileSystemDownloader,
+                                 Manifest, CHUNK_SIZE, MISSING)
+from nsetools import urls
+from nsetools.errors import BhavcopyNotAvailableError
+
+
+def bhavcopy_zip(d, rows=1):
+    name = "cm%s%s%dbhav.csv" % (d.strftime("%d"), d.strftime("%b").upper(), d.year)
+    lines = ["SYMBOL,SERIES,CLOSE,\n"] + ["INFY,EQ,%d,\n" % (d.toordinal() + i) for i in range(rows)]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(name, ''.join(lines))
+    return buffer.getvalue()
+
+
+class Response():
+    def __init__(self, status_code, content=b''):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise IOError("HTTP %d" % self.status_code)
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class BhavcopySession():
+    """Serves generated bhavcopies, with 404 for `missing` dates and `flaky` dates failing
+    the number of times given before succeeding."""
+    def __init__(self, missing=(), flaky=None, rows=1):
+        self.rows = rows
+        self.zips = {}
+        self.missing = set(missing)
+        self.flaky = dict(flaky or {})
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def fetch(self, url, use_cache=True, stream=False):
+        assert stream and not use_cache
+        d = dt.datetime.strptime(url.rsplit('/cm', 1)[1][:9], '%d%b%Y').date()
+        with self.lock:
+            self.fetched.append(d)
+            if self.flaky.get(d):
+                self.flaky[d] -= 1
+                return Response(503)
+        if d in self.missing:
+            return Response(404)
+        if d not in self.zips:
+            self.zips[d] = bhavcopy_zip(d, self.rows)
+        return Response(200, self.zips[d])
+
+
+class FnoSession():
+    """Serves the same F&O bhavcopy under the name of any archive asked for."""
+    csv = ("INSTRUMENT,SYMBOL,EXPIRY_DT,STRIKE_PR,OPTION_TYP,CLOSE,OPEN_INT,TIMESTAMP,\n"
+           "OPTIDX,NIFTY,30-Jan-2025,23000,CE,120.5,1000,24-JAN-2025,\n")
+
+    def __init__(self):
+        self.urls = []
+
+    def fetch(self, url, use_cache=True, stream=False):
+        self.urls.append(url)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            zf.writestr(url.rsplit('/', 1)[1][:-len('.zip')], self.csv)
+        return Response(200, buffer.getvalue())
+
+
+class TestBhavcopyDownloader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def downloader(self, session, **kwargs):
+        return BhavcopyFileSystemDownloader(self.directory, from_date='01-07-2024',
+                                            to_date='31-07-2024', session=session,
+                                            backoff=0, **kwargs)
+
+    def test_download_and_resume(self):
+        missing, flaky, broken = dt.date(2024, 7, 10), dt.date(2024, 7, 11), dt.date(2024, 7, 12)
+        session = BhavcopySession(missing=[missing], flaky={flaky: 2, broken: 10})
+        downloader = self.downloader(session, retries=2, workers=4)
+        self.assertEqual(len(downloader.dates), 22)     # muharram on the 17th
+        result = downloader.download()
+        # a trading day without a bhavcopy isn't given up, the URL may be wrong
+        self.assertEqual(result['missing'], [])
+        self.assertEqual(result['failed'], [missing, broken])
+        self.assertEqual(len(result['fetched']), 20)
+        self.assertIn(flaky, result['fetched'])
+        with open(os.path.join(self.directory, '2024-07-01.csv')) as fh:
+            self.assertEqual(fh.read().splitlines()[1], 'INFY,EQ,%d,' % dt.date(2024, 7, 1).toordinal())
+        with open(os.path.join(self.directory, 'manifest.json')) as fh:
+            dates = json.load(fh)['dates']
+            self.assertIn('HTTP 503', dates['2024-07-12']['error'])
+            self.assertIn('trading day', dates['2024-07-10']['error'])
+
+        # a restarted job only retries the failed dates
+        session = BhavcopySession(missing=[missing])
+        result = self.downloader(session).download()
+        self.assertEqual(sorted(session.fetched), [missing, broken])
+        self.assertEqual(result['fetched'], [broken])
+        self.assertEqual(result['failed'], [missing])
+        manifest = Manifest(os.path.join(self.directory, 'manifest.json'))
+        self.assertEqual(manifest.by_status('failed'), [missing])
+        self.assertEqual(len(manifest.by_status('fetched')), 21)
+
+    def test_missing_dates(self):
+        # muharram, which the calendar knows, is given up at once
+        holiday = dt.date(2024, 7, 17)
+        session = BhavcopySession(missing=[holiday])
+        downloader = self.downloader(session)
+        self.assertEqual(downloader.download([holiday])['missing'], [holiday])
+        self.assertEqual(downloader.download([holiday])['missing'], [])
+        self.assertEqual(session.fetched, [holiday])
+
+        # a trading day recorded as missing by an older run is tried again with verify
+        d = dt.date(2024, 7, 10)
+        downloader.manifest.mark(d, MISSING)
+        self.assertEqual(downloader.download([d])['fetched'], [])
+        self.assertEqual(downloader.download([d], verify=True)['fetched'], [d])
+
+    def test_update(self):
+        session = BhavcopySession()
+        start = dt.date.today() - dt.timedelta(days=20)
+        downloader = BhavcopyFileSystemDownloader(self.directory, from_date=start, session=session,
+                                                  backoff=0)
+        fetched = downloader.update()['fetched']
+        self.assertGreater(len(fetched), 10)
+        self.assertEqual(downloader.update()['fetched'], [])
+        self.assertEqual(len(session.fetched), len(fetched))
+
+        # a deleted, a partial and a corrupted file of the right size
+        deleted, partial, corrupted = fetched[:3]
+        os.remove(downloader.get_path(deleted))
+        with open(downloader.get_path(partial), 'r+b') as fh:
+            fh.truncate(10)
+        with open(downloader.get_path(corrupted), 'r+b') as fh:
+            fh.write(b'X')
+        self.assertEqual(downloader.update()['fetched'], [deleted, partial])
+        self.assertEqual(downloader.update(verify=True)['fetched'], [corrupted])
+        self.assertEqual(downloader.update(verify=True)['fetched'], [])
+
+    def test_legacy_files_are_adopted(self):
+        d = dt.date(2024, 7, 1)
+        with open(os.path.join(self.directory, '2024-07-01.csv'), 'w') as fh:
+            fh.write('SYMBOL\n')
+        downloader = self.downloader(BhavcopySession())
+        self.assertTrue(downloader.is_done(d, verify=True))
+        self.assertEqual(downloader.manifest.entry(d)['size'], 7)
+
+    def test_streaming(self):
+        d = dt.date(2024, 7, 1)
+        downloader = self.downloader(BhavcopySession(rows=200000))
+        content = downloader.download_one(d)
+        self.assertEqual(len(content.splitlines()), 200001)
+        rows = downloader.iter_rows(d)
+        self.assertEqual(next(rows), {'SYMBOL': 'INFY', 'SERIES': 'EQ', 'CLOSE': str(d.toordinal())})
+        self.assertEqual(sum(1 for _ in rows), 199999)
+
+        # the CSV is written in chunks, only the spooled archive is held in memory
+        archive = len(downloader.session.zips[d])
+        tracemalloc.start()
+        info = downloader.save_one(d)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertEqual(info['size'], len(content))
+        self.assertLess(peak, 2 * archive + 4 * CHUNK_SIZE)
+        self.assertLess(peak, len(content) / 2)
+        with self.assertRaises(BhavcopyNotAvailableError):
+            self.downloader(BhavcopySession(missing=[d])).download_one(d)
+
+
+class TestFnoBhavcopyDownloader(unittest.TestCase):
+    def test_download(self):
+        directory = tempfile.mkdtemp()
+        try:
+            session = FnoSession()
+            downloader = FnoBhavcopyFileSystemDownloader(directory, from_date='24-01-2025',
+                                                         to_date='24-01-2025', session=session)
+            self.assertEqual(downloader.download()['fetched'], [dt.date(2025, 1, 24)])
+            self.assertEqual(session.urls, [urls.NSE_LEGACY + '/content/historical/DERIVATIVES/'
+                                            '2025/JAN/fo24JAN2025bhav.csv.zip'])
+            with open(os.path.join(directory, '2025-01-24.csv')) as fh:
+                self.assertEqual(fh.read(), FnoSession.csv)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import copy
+import pickle
+import unittest
+from decimal import Decimal
+from nsetools.columnar import records_to_columns, validate_output
+from nsetools.fixedpoint import (to_fixed, to_scaled_decimal, to_fixed_point, from_fixed,
+                                 ScaledDict, SCALES)
+from fixtures import offline_nse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+RECORDS = [
+    {'symbol': 'INFY', 'lastPrice': '1580.555', 'pChange': -1.23456, 'totalTradedVolume': '1200',
+     'meta': {'open': 1.005}},
+    {'symbol': 'TCS', 'lastPrice': 3500, 'pChange': '-', 'totalTradedVolume': 9000.123},
+]
+
+
+class TestFixedPoint(unittest.TestCase):
+    def test_to_fixed(self):
+        self.assertEqual(to_fixed('1580.555', 2), 158056)
+        self.assertEqual(to_fixed('-1580.555', 2), -158056)
+        # the float is taken as written, not as its binary value 1.00499999...
+        self.assertEqual(to_fixed(1.005, 2), 101)
+        self.assertEqual(to_fixed(2.857, 4), 28570)
+        self.assertEqual(to_fixed(1246, 2), 124600)
+        for value in ('-', '', 'NaN', 'Infinity', None, True, 'INFY'):
+            self.assertIsNone(to_fixed(value, 2), value)
+        self.assertEqual(from_fixed(158056, 2), 1580.56)
+
+    def test_to_scaled_decimal(self):
+        self.assertEqual(to_scaled_decimal('1580.555', 2), Decimal('1580.56'))
+        self.assertEqual(str(to_scaled_decimal(3500, 2)), '3500.00')
+
+    def test_to_fixed_point(self):
+        records = to_fixed_point(RECORDS)
+        self.assertEqual(records[0], {'symbol': 'INFY', 'lastPrice': 158056, 'pChange': -12346,
+                                      'totalTradedVolume': 1200, 'meta': {'open': 101}})
+        self.assertEqual(records[0].scales, {'lastPrice': 2, 'pChange': 4})
+        self.assertEqual(records[0]['meta'].scales, {'open': 2})
+        # not numeric values of registered fields and unregistered fields are cast as usual
+        self.assertEqual(records[1]['pChange'], '-')
+        self.assertEqual(records[1]['totalTradedVolume'], 9000.12)
+        self.assertEqual(records[1].scales, {'lastPrice': 2})
+        self.assertEqual(pickle.loads(pickle.dumps(records[0])).scales, records[0].scales)
+        self.assertEqual(copy.deepcopy(records[0]).scales, records[0].scales)
+
+    def test_decimal_and_float_modes(self):
+        records = to_fixed_point(RECORDS, 'decimal')
+        self.assertEqual(records[0]['lastPrice'], Decimal('1580.56'))
+        self.assertEqual(records[0]['pChange'], Decimal('-1.2346'))
+        self.assertEqual(to_fixed_point(RECORDS, 'float')[0]['lastPrice'], 1580.56)
+        with self.assertRaises(ValueError):
+            to_fixed_point(RECORDS, 'paise')
+
+    def test_validate_output(self):
+        validate_output('pandas', numeric='fixed')
+        with self.assertRaises(ValueError):
+            validate_output('records', typed=True, numeric='fixed')
+        with self.assertRaises(ValueError):
+            validate_output('records', fields=['lastPrice'], numeric='decimal')
+
+    def test_scaled_dict(self):
+        self.assertEqual(ScaledDict(a=1).scales, {})
+        self.assertEqual(SCALES['pchangeinOpenInterest'], 4)
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_numpy_columns(self):
+        columns = records_to_columns(RECORDS, 'numpy', numeric='fixed')
+        self.assertEqual(columns.scales, {'lastPrice': 2, 'pChange': 4})
+        self.assertEqual(columns['lastPrice'].dtype, np.int64)
+        self.assertEqual(columns['lastPrice'].tolist(), [158056, 350000])
+        self.assertEqual(columns['pChange'].tolist(), [-12346, None])
+        self.assertEqual(columns['totalTradedVolume'].dtype, np.float64)
+
+    @unittest.skipIf(pd is None, "pandas not installed")
+    def test_pandas_columns(self):
+        frame = records_to_columns(RECORDS, 'pandas', numeric='fixed')
+        self.assertEqual(frame.attrs['scales'], {'lastPrice': 2, 'pChange': 4})
+        self.assertEqual(str(frame['pChange'].dtype), 'Int64')
+        self.assertTrue(pd.isna(frame['pChange'][1]))
+        self.assertEqual(frame['lastPrice'].sum(), 508056)
+        frame = records_to_columns(RECORDS, 'pandas', numeric='decimal')
+        self.assertEqual(frame['lastPrice'][0], Decimal('1580.56'))
+        self.assertNotIn('scales', records_to_columns(RECORDS, 'pandas').attrs)
+
+
+class TestNseFixedPoint(unittest.TestCase):
+    def setUp(self):
+        self.nse = offline_nse()
+
+    def test_matches_float_mode(self):
+        for fixed, floats in [
+                (self.nse.get_quote('infy', numeric='fixed'), self.nse.get_quote('infy')),
+                (self.nse.get_future_quote('reliance', numeric='fixed')[0],
+                 self.nse.get_future_quote('reliance')[0]),
+                (self.nse.get_stock_quote_in_index(numeric='fixed')[0],
+                 self.nse.get_stock_quote_in_index()[0])]:
+            self.assertEqual(fixed.keys(), floats.keys())
+            self.assertTrue(fixed.scales)
+            for key, scale in fixed.scales.items():
+                self.assertAlmostEqual(from_fixed(fixed[key], scale), floats[key], places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
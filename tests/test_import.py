@@ -0,0 +1,34 @@
+import os
+import sys
+import subprocess
+import unittest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def loaded_modules(statement, modules):
+    """Runs `statement` in a fresh interpreter and returns which of `modules` it loaded."""
+    code = "import sys\n%s\nprint(' '.join(m for m in %r if m in sys.modules))" % (statement, modules)
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True,
+                            text=True, check=True)
+    return result.stdout.split()
+
+
+class TestLazyImports(unittest.TestCase):
+    HEAVY = ('requests', 'urllib3', 'six', 'csv', 'dateutil', 'numpy')
+
+    def test_package_import_is_light(self):
+        statement = "import nsetools, nsetools.datemgr, nsetools.utils, nsetools.decoder"
+        self.assertEqual(loaded_modules(statement, self.HEAVY), [])
+
+    def test_nse_is_loaded_on_first_use(self):
+        self.assertEqual(loaded_modules("import nsetools", ('nsetools.nse',)), [])
+        statement = "from nsetools import Nse\nassert Nse.__module__ == 'nsetools.nse'"
+        self.assertEqual(loaded_modules(statement, ('nsetools.nse', 'requests')), ['nsetools.nse'])
+        with self.assertRaises(subprocess.CalledProcessError):
+            loaded_modules("from nsetools import Bse", ())
+
+
+if __name__ == '__main__':
+    unittest.main()
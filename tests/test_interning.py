@@ -0,0 +1,53 @@
+import unittest
+from nsetools import decoder
+from nsetools.interning import InternPool
+from fixtures import load_payload, offline_nse
+
+
+class TestInternPool(unittest.TestCase):
+    def test_intern(self):
+        pool = InternPool()
+        a = ''.join(['IN', 'FY'])
+        b = ''.join(['INF', 'Y'])
+        self.assertIsNot(a, b)
+        self.assertIs(pool.intern(a), a)
+        self.assertIs(pool.intern(b), a)
+        self.assertEqual(len(pool), 1)
+
+    def test_bounded(self):
+        pool = InternPool(maxsize=10)
+        for i in range(25):
+            pool.intern('SYMBOL%d' % i)
+        self.assertLessEqual(len(pool), 10)
+
+    def test_intern_tree(self):
+        pool = InternPool()
+        content = load_payload('equity_stockIndices')
+        first = pool.intern_tree(decoder.loads(content, decoder='json'))
+        second = decoder.loads(content, decoder='json')
+        expected = decoder.loads(content, decoder='json')
+        self.assertIs(pool.intern_tree(second), second)
+        self.assertEqual(second, expected)
+        # the first record is the index itself, without meta
+        for a, b in zip(first['data'][1:], second['data'][1:]):
+            self.assertEqual(list(b), list(a))
+            for key_a, key_b in zip(a, b):
+                self.assertIs(key_a, key_b)
+            self.assertIs(a['symbol'], b['symbol'])
+            self.assertIs(a['meta']['companyName'], b['meta']['companyName'])
+
+    def test_loads_and_nse(self):
+        pool = InternPool()
+        content = load_payload('equity_stockIndices')
+        a = decoder.loads(content, endpoint='test', pool=pool)
+        b = decoder.loads(content, cast=False, pool=pool)
+        self.assertIs(a['data'][1]['series'], b['data'][1]['series'])
+
+        nse = offline_nse()
+        nse.intern_pool = pool
+        quotes = nse.get_stock_quote_in_index('NIFTY 50')
+        self.assertIs(quotes[0]['symbol'], pool.intern(quotes[0]['symbol']))
+
+
+if __name__ == '__main__':
+    unittest.main()
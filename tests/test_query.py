@@ -0,0 +1,63 @@
+import unittest
+from nsetools.query import compile_query, filter, Query
+
+RECORDS = [
+    {'symbol': 'INFY', 'series': 'EQ', 'open': 100, 'lastPrice': 102, 'pChange': 2.5,
+     'totalTradedVolume': 1200000, 'meta': {'isFNOSec': True, 'activeSeries': ['EQ']}},
+    {'symbol': 'TCS', 'series': 'BE', 'open': 0, 'lastPrice': 5, 'pChange': -1,
+     'totalTradedVolume': 100, 'meta': {'isFNOSec': False, 'activeSeries': []}},
+    {'symbol': 'NIFTY 50', 'lastPrice': 22500.5},
+]
+
+
+def symbols(expr):
+    return [record['symbol'] for record in filter(RECORDS, expr)]
+
+
+class TestQuery(unittest.TestCase):
+    def test_boolean_operators(self):
+        self.assertEqual(symbols("pChange > 2 and totalTradedVolume > 1e6"), ['INFY'])
+        self.assertEqual(symbols("pChange > 2 or series == 'BE'"), ['INFY', 'TCS'])
+        self.assertEqual(symbols("not (pChange > 2) AND lastPrice < 10"), ['TCS'])
+        self.assertEqual(symbols("pChange < -2 or pChange > 2 and series = 'EQ'"), ['INFY'])
+
+    def test_in(self):
+        self.assertEqual(symbols("series in ('EQ', 'BE')"), ['INFY', 'TCS'])
+        self.assertEqual(symbols("series not in ['EQ']"), ['TCS'])
+        self.assertEqual(symbols("'EQ' in meta.activeSeries"), ['INFY'])
+        self.assertEqual(symbols("pChange in (-1, 2.5)"), ['INFY', 'TCS'])
+
+    def test_arithmetic(self):
+        self.assertEqual(symbols("(lastPrice - open) / open * 100 >= 1.5"), ['INFY'])
+        # division by zero and missing fields make the comparison false
+        self.assertEqual(symbols("lastPrice / open > 0"), ['INFY'])
+        self.assertEqual(symbols("lastPrice + -open > 4"), ['TCS'])
+
+    def test_paths(self):
+        self.assertEqual(symbols("META.ISFNOSEC == true"), ['INFY'])
+        self.assertEqual(symbols("not meta.isFNOSec"), ['TCS', 'NIFTY 50'])
+        self.assertEqual(symbols("meta.activeSeries.0 == 'EQ'"), ['INFY'])
+        self.assertEqual(symbols("series == none"), ['NIFTY 50'])
+        self.assertEqual(symbols("series != 'EQ'"), ['TCS'])
+
+    def test_single_predicates(self):
+        # the syntax of the earlier dict_to_table queries
+        self.assertEqual(symbols("symbol==INFY"), ['INFY'])
+        self.assertEqual(symbols("symbol==NIFTY 50"), ['NIFTY 50'])
+        self.assertEqual(symbols("pchange>0"), ['INFY'])
+        self.assertEqual(symbols("lastPrice>=22500.5"), ['NIFTY 50'])
+        self.assertEqual(symbols("symbol!=TCS"), ['INFY', 'NIFTY 50'])
+
+    def test_compile_cache_and_errors(self):
+        query = compile_query("pChange > 2")
+        self.assertIsInstance(query, Query)
+        self.assertIs(compile_query("pChange > 2"), query)
+        self.assertTrue(query(RECORDS[0]))
+        self.assertEqual(filter(RECORDS, query), RECORDS[:1])
+        for expr in ("pChange >> 2", "(pChange > 2", "pChange > 2 and", "a $ b", ""):
+            with self.assertRaises(ValueError, msg=expr):
+                compile_query(expr)
+
+
+if __name__ == '__main__':
+    unittest.main()
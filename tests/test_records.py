@@ -0,0 +1,73 @@
+import unittest
+from nsetools.records import Quote, IndexQuote, FutureQuote, MoverRecord, make_record
+from nsetools.fields import flatten_future_quote
+from nsetools.utils import cast_intfloat_string_values_to_intfloat
+from fixtures import FUTURE_RECORD, offline_nse
+
+PRICE_INFO = {
+    'lastPrice': 5189.1, 'change': 70.55, 'pChange': 1.3783, 'previousClose': '5118.55',
+    'open': 5160, 'close': 5187.65, 'vwap': 5162.91, 'stockIndClosePrice': 0,
+    'lowerCP': '4606.70', 'upperCP': '5630.40', 'pPriceBand': 'No Band', 'basePrice': 5118.55,
+    'intraDayHighLow': {'min': 5101, 'max': 5218.45, 'value': 5189.1},
+    'weekHighLow': {'min': 4890, 'minDate': '04-Jun-2024', 'minDateFormat': '04-Jun-2024',
+                    'max': 9149.95, 'maxDate': '30-Jul-2024', 'maxDateFormat': '30-Jul-2024',
+                    'value': 5189.1},
+    'iNavValue': None, 'checkINAV': False, 'tickSize': 0.05, 'ieq': '',
+}
+
+
+class TestRecords(unittest.TestCase):
+    def test_quote_round_trip(self):
+        quote = Quote.from_raw(PRICE_INFO)
+        self.assertEqual(quote.pChange, 1.38)
+        self.assertEqual(quote.lowerCP, 4606.7)
+        self.assertEqual(quote.intraDayHigh, 5218.45)
+        self.assertEqual(quote.to_dict(), cast_intfloat_string_values_to_intfloat(PRICE_INFO))
+
+    def test_slots(self):
+        quote = Quote.from_raw(PRICE_INFO)
+        self.assertFalse(hasattr(quote, '__dict__'))
+        with self.assertRaises(AttributeError):
+            quote.unknown = 1
+
+    def test_future_quote_matches_dict_mode(self):
+        record = FutureQuote.from_raw(FUTURE_RECORD)
+        expected = cast_intfloat_string_values_to_intfloat(flatten_future_quote(FUTURE_RECORD))
+        self.assertEqual(record.to_dict(), expected)
+        self.assertEqual(list(record.to_dict()), list(expected))
+
+    def test_recorded_payloads_match_dict_mode(self):
+        # every typed API over the recorded payloads, against its dict mode cast the same way
+        nse = offline_nse()
+        calls = [
+            ('get_quote', ('INFY',)), ('get_index_quote', ('NIFTY 50',)),
+            ('get_all_index_quote', ()), ('get_top_gainers', ()), ('get_top_losers', ()),
+            ('get_future_quote', ('INFY',)),
+        ]
+        for name, args in calls:
+            with self.subTest(name=name):
+                typed = getattr(nse, name)(*args, typed=True)
+                expected = cast_intfloat_string_values_to_intfloat(getattr(nse, name)(*args))
+                if isinstance(typed, list):
+                    self.assertEqual(len(typed), len(expected))
+                    self.assertEqual([record.to_dict() for record in typed], expected)
+                else:
+                    self.assertEqual(typed.to_dict(), expected)
+
+    def test_missing_values(self):
+        index = IndexQuote.from_raw({'indexSymbol': 'NIFTY 50', 'last': '22508.75'})
+        self.assertEqual(index.last, 22508.75)
+        self.assertIsNone(index.pe)
+        mover = MoverRecord.from_raw({'symbol': 'DRREDDY', 'ltp': 1151.5})
+        self.assertEqual(mover.symbol, 'DRREDDY')
+
+    def test_make_record(self):
+        Point = make_record('Point', (('x', ('a', 'x')), ('y', lambda raw: raw['b'] * 2)))
+        point = Point.from_raw({'a': {'x': '1'}, 'b': 2})
+        self.assertEqual(point, Point(1, 4))
+        self.assertEqual(repr(point), 'Point(x=1, y=4)')
+        self.assertEqual(point.to_dict(), {'x': 1, 'y': 4})
+
+
+if __name__ == '__main__':
+    unittest.main()
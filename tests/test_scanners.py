@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+from nsetools.scanners import open_high_low, scan_open_high_low, sparklines, quote_columns
+from fixtures import offline_nse
+
+QUOTES = [
+    {'symbol': 'INFY', 'open': 1900, 'dayHigh': 1950, 'dayLow': 1900, 'lastPrice': 1940},
+    {'symbol': 'TCS', 'open': 4100, 'dayHigh': 4100, 'dayLow': 4000, 'lastPrice': 4090},
+    {'symbol': 'SBIN', 'open': 800, 'dayHigh': 820, 'dayLow': 800, 'lastPrice': 801},
+    {'symbol': 'ITC', 'open': 400, 'dayHigh': 410, 'dayLow': 395, 'lastPrice': 405},
+    {'symbol': 'FLAT', 'open': 100, 'dayHigh': 100, 'dayLow': 100, 'lastPrice': 100},
+    {'symbol': 'WIPRO', 'open': 300.1, 'dayHigh': 305, 'dayLow': 300, 'lastPrice': 303},
+    {'symbol': 'HALTED', 'open': '-', 'dayHigh': None, 'dayLow': None, 'lastPrice': 50},
+]
+
+
+def legacy_graph(pir):
+    # the text graph of exp/ohl.py
+    rnd = round(pir / 10)
+    return ''.join('^' if i == rnd - 1 else '.' for i in range(10))
+
+
+class TestOpenHighLow(unittest.TestCase):
+    def test_scan(self):
+        scan = open_high_low(QUOTES)
+        longs, shorts = scan['longs'], scan['shorts']
+        self.assertEqual([stock['symbol'] for stock in longs], ['INFY', 'SBIN', 'FLAT'])
+        self.assertEqual(longs[0], {'symbol': 'INFY', 'open': 1900.0, 'high': 1950.0, 'low': 1900.0,
+                                    'last': 1940.0, 'pir': 80.0, 'graph': '.......^..'})
+        self.assertEqual((longs[1]['pir'], longs[1]['graph']), (5.0, '..........'))
+        self.assertTrue(np.isnan(longs[2]['pir']))
+        self.assertEqual([stock['symbol'] for stock in shorts], ['TCS', 'FLAT'])
+        self.assertEqual((shorts[0]['pir'], shorts[0]['graph']), (10.0, '^.........'))
+
+        scan = open_high_low(QUOTES, tolerance=0.05)
+        self.assertIn('WIPRO', [stock['symbol'] for stock in scan['longs']])
+
+    def test_outputs(self):
+        scan = open_high_low(quote_columns(QUOTES), output='numpy')
+        self.assertEqual(scan['longs']['symbol'].tolist(), ['INFY', 'SBIN', 'FLAT'])
+        self.assertEqual(scan['longs']['pir'].dtype, np.float64)
+        with self.assertRaises(ValueError):
+            open_high_low(QUOTES, output='arrow')
+
+    def test_sparklines_match_legacy(self):
+        pir = np.round(np.linspace(0, 100, 401), 2)
+        self.assertEqual(sparklines(pir).tolist(), [legacy_graph(value) for value in pir])
+
+    def test_scan_index(self):
+        nse = offline_nse()
+        quotes = nse.get_stock_quote_in_index('NIFTY 50')
+        # the recorded quotes have no exact match, a tolerance of 2% takes some in
+        scan = scan_open_high_low(nse, 'NIFTY 50', tolerance=2, output='numpy')
+        for side, price in (('longs', 'dayLow'), ('shorts', 'dayHigh')):
+            expected = {quote['symbol'] for quote in quotes
+                        if abs(quote['open'] - quote[price]) <= quote['open'] * 0.02}
+            self.assertTrue(expected)
+            self.assertEqual(set(scan[side]['symbol'].tolist()), expected)
+            pir = scan[side]['pir']
+            self.assertTrue((np.diff(pir[~np.isnan(pir)]) <= 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
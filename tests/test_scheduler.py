@@ -0,0 +1,66 @@
+import unittest
+import datetime as dt
+from nsetools.scheduler import (MarketScheduler, IST, PRE_OPEN, CONTINUOUS,
+                                CLOSING, CLOSED)
+
+
+def ist(*args):
+    return dt.datetime(*args, tzinfo=IST)
+
+
+class TestMarketScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = MarketScheduler(closing_factor=4)
+
+    def test_phases_on_trading_day(self):
+        # 24-Jan-2025 was a Friday
+        self.assertEqual(self.scheduler.phase(ist(2025, 1, 24, 8, 59)), CLOSED)
+        self.assertEqual(self.scheduler.phase(ist(2025, 1, 24, 9, 0)), PRE_OPEN)
+        self.assertEqual(self.scheduler.phase(ist(2025, 1, 24, 9, 15)), CONTINUOUS)
+        self.assertEqual(self.scheduler.phase(ist(2025, 1, 24, 15, 29)), CONTINUOUS)
+        self.assertEqual(self.scheduler.phase(ist(2025, 1, 24, 15, 45)), CLOSING)
+        self.assertEqual(self.scheduler.phase(ist(2025, 1, 24, 16, 0)), CLOSED)
+
+    def test_phases_on_holidays(self):
+        # weekend and independence day
+        self.assertEqual(self.scheduler.phase(ist(2025, 1, 25, 11, 0)), CLOSED)
+        self.assertEqual(self.scheduler.phase(ist(2025, 8, 15, 11, 0)), CLOSED)
+
+    def test_phase_accepts_other_timezones(self):
+        utc = dt.datetime(2025, 1, 24, 4, 0, tzinfo=dt.timezone.utc)
+        self.assertEqual(self.scheduler.phase(utc), CONTINUOUS)
+
+    def test_next_boundary(self):
+        self.assertEqual(self.scheduler.next_boundary(ist(2025, 1, 24, 9, 5)),
+                         ist(2025, 1, 24, 9, 15))
+        # friday evening wakes up on monday pre-open
+        self.assertEqual(self.scheduler.next_boundary(ist(2025, 1, 24, 17, 0)),
+                         ist(2025, 1, 27, 9, 0))
+
+    def test_ttl_and_interval(self):
+        self.assertEqual(self.scheduler.ttl(60, ist(2025, 1, 24, 11, 0)), 60)
+        self.assertEqual(self.scheduler.ttl(60, ist(2025, 1, 24, 15, 40)), 240)
+        self.assertEqual(self.scheduler.ttl(60, ist(2025, 1, 24, 8, 0)), 3600)
+        # interval never crosses a boundary
+        self.assertEqual(self.scheduler.interval(60, ist(2025, 1, 24, 15, 29, 30)), 30)
+        self.assertEqual(self.scheduler.interval(60, ist(2025, 1, 24, 15, 58)), 120)
+
+    def test_is_fresh(self):
+        # cached after close on friday, still fresh on sunday
+        self.assertTrue(self.scheduler.is_fresh(ist(2025, 1, 24, 16, 5), 60,
+                                                ist(2025, 1, 26, 12, 0)))
+        # cached before close is not
+        self.assertFalse(self.scheduler.is_fresh(ist(2025, 1, 24, 15, 58), 60,
+                                                 ist(2025, 1, 24, 16, 5)))
+        self.assertTrue(self.scheduler.is_fresh(ist(2025, 1, 24, 11, 0), 60,
+                                                ist(2025, 1, 24, 11, 0, 30)))
+        self.assertFalse(self.scheduler.is_fresh(ist(2025, 1, 24, 11, 0), 60,
+                                                 ist(2025, 1, 24, 11, 2)))
+
+    def test_clock(self):
+        scheduler = MarketScheduler(clock=lambda: ist(2025, 1, 24, 10, 0))
+        self.assertEqual(scheduler.phase(), CONTINUOUS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import os
+import shutil
+import tempfile
+import unittest
+import datetime as dt
+import numpy as np
+from nsetools.store import BhavcopyStore, FnoBhavcopyStore, MISSING
+
+HEADER = "SYMBOL,SERIES,OPEN,HIGH,LOW,CLOSE,LAST,PREVCLOSE,TOTTRDQTY,TOTTRDVAL,TIMESTAMP,TOTALTRADES,ISIN,\n"
+ROWS = {
+    '2025-01-23': ["INFY,EQ,1900,1925.5,1890,1920.1,1921,1899.9,1000,1920100.5,23-JAN-2025,50,INE009A01021,\n",
+                   "TCS,EQ,4100,4150,4080,4120,4121,4090,500,2060000,23-JAN-2025,30,INE467B01029,\n"],
+    '2025-01-24': ["TCS,EQ,4120,4130,4000,4010,4011,4120,700,2807000,24-JAN-2025,45,INE467B01029,\n",
+                   "INFY,EQ,1920,1930,1900,1910,1909,1920.1,1200,2292000,24-JAN-2025,60,INE009A01021,\n",
+                   "NEWCO,BE,10,,9,9.5,9.5,10,100,950,24-JAN-2025,,,\n"],
+}
+
+
+class TestBhavcopyStore(unittest.TestCase):
+    def setUp(self):
+        self.csv_dir = tempfile.mkdtemp()
+        self.store_dir = tempfile.mkdtemp()
+        for d, rows in ROWS.items():
+            with open(os.path.join(self.csv_dir, d + '.csv'), 'w') as fh:
+                fh.write(HEADER + ''.join(rows))
+        self.store = BhavcopyStore(self.store_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.csv_dir)
+        shutil.rmtree(self.store_dir)
+
+    def test_ingest_and_load(self):
+        self.assertEqual(len(self.store.ingest_directory(self.csv_dir)), 2)
+        self.assertEqual(self.store.ingest_directory(self.csv_dir), [])
+        self.assertEqual(self.store.dates(), [dt.date(2025, 1, 23), dt.date(2025, 1, 24)])
+
+        day = self.store.load('24-01-2025')
+        self.assertIsInstance(day['close'], np.memmap)
+        self.assertEqual(day['close'].tolist(), [4010, 1910, 9.5])
+        self.assertEqual(day['symbol'].dtype, np.int32)
+        self.assertEqual(list(self.store.decode('symbol', day['symbol'])), ['TCS', 'INFY', 'NEWCO'])
+        self.assertTrue(np.isnan(day['high'][2]))
+        self.assertEqual(day['trades'][2], MISSING)
+        self.assertEqual(list(self.store.decode('isin', day['isin'])),
+                         ['INE467B01029', 'INE009A01021', None])
+
+        data = self.store.load_range('2025-01-01', '2025-01-31', columns=['symbol', 'close'])
+        self.assertEqual(sorted(data), ['close', 'date', 'symbol'])
+        infy = data['symbol'] == self.store.symbol_code('INFY')
+        self.assertEqual(data['close'][infy].tolist(), [1920.1, 1910])
+        self.assertEqual(data['date'][infy].tolist(), [dt.date(2025, 1, 23), dt.date(2025, 1, 24)])
+        self.assertEqual(len(self.store.load_range('2025-02-01', '2025-02-28')['close']), 0)
+
+    def test_codes_are_stable(self):
+        self.store.ingest_directory(self.csv_dir)
+        code = self.store.symbol_code('TCS')
+        store = BhavcopyStore(self.store_dir)
+        store.ingest('2025-01-27', [{'SYMBOL': 'WIPRO', 'SERIES': 'EQ', 'CLOSE': '300'},
+                                    {'SYMBOL': 'TCS', 'SERIES': 'EQ', 'CLOSE': '4000'}])
+        self.assertEqual(store.symbol_code('TCS'), code)
+        self.assertEqual(list(store.decode('symbol', store.load('2025-01-27')['symbol'])), ['WIPRO', 'TCS'])
+        self.assertEqual(store.load('2025-01-27', ['traded_quantity'])['traded_quantity'].tolist(),
+                         [MISSING, MISSING])
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = BhavcopyStore(self.directory)
+        ingest = self.store.ingest
+        # no ISIN in the oldest bhavcopies
+        ingest('2024-01-01', [['SYMBOL', 'SERIES', 'CLOSE'], ['OLDCO', 'EQ', '10'], ['OTHER', 'EQ', '1']])
+        ingest('2024-01-02', [['SYMBOL', 'SERIES', 'CLOSE', 'ISIN'], ['OLDCO', 'EQ', '11', 'INE0X'],
+                              ['OTHER', 'EQ', '2', 'INE0O']])
+        # moved to the trade for trade segment
+        ingest('2024-01-03', [['SYMBOL', 'SERIES', 'CLOSE', 'ISIN'], ['OTHER', 'EQ', '3', 'INE0O'],
+                              ['OLDCO', 'BE', '12', 'INE0X']])
+        # renamed, and the old symbol taken by another company
+        ingest('2024-01-04', [['SYMBOL', 'SERIES', 'CLOSE', 'ISIN'], ['NEWCO', 'BL', '99', 'INE0X'],
+                              ['NEWCO', 'EQ', '13', 'INE0X'], ['OLDCO', 'EQ', '50', 'INE0Y']])
+        ingest('2024-01-05', [['SYMBOL', 'SERIES', 'CLOSE', 'ISIN'], ['OLDCO', 'EQ', '51', 'INE0Y'],
+                              ['NEWCO', 'EQ', '14', 'INE0X']])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_renames_and_series(self):
+        history = self.store.history('NEWCO', columns=['close'])
+        self.assertEqual(history['close'].tolist(), [10, 11, 12, 13, 14])
+        self.assertEqual(list(history['symbol']), ['OLDCO'] * 3 + ['NEWCO'] * 2)
+        self.assertEqual(list(history['series']), ['EQ', 'EQ', 'BE', 'EQ', 'EQ'])
+        self.assertEqual(history['date'][0], np.datetime64('2024-01-01'))
+        self.assertEqual(self.store.history('INE0X', columns=['close'])['close'].tolist(), [10, 11, 12, 13, 14])
+
+        # a symbol resolves to the security it had as of the end date
+        self.assertEqual(self.store.history('OLDCO', columns=['close'])['close'].tolist(), [50, 51])
+        self.assertEqual(self.store.history('OLDCO', end='2024-01-03', columns=['close'])['close'].tolist(),
+                         [10, 11, 12])
+        self.assertEqual(self.store.history('NEWCO', '2024-01-02', '2024-01-04', ['close'],
+                                            series=['EQ'])['close'].tolist(), [11, 13])
+        self.assertEqual(len(self.store.history('NOSUCH')['close']), 0)
+        # all the rows of a day, read along with one another
+        history = self.store.history('NEWCO', columns=['close'], series=None)
+        self.assertEqual(history['close'].tolist(), [10, 11, 12, 99, 13, 14])
+        self.assertEqual(list(history['series']), ['EQ', 'EQ', 'BE', 'BL', 'EQ', 'EQ'])
+
+    def test_reingest_and_rebuild(self):
+        self.store.ingest('2024-01-05', [['SYMBOL', 'SERIES', 'CLOSE', 'ISIN'], ['NEWCO', 'EQ', '15', 'INE0X']])
+        self.assertEqual(self.store.history('NEWCO', columns=['close'])['close'].tolist(), [10, 11, 12, 13, 15])
+        os.remove(self.store.index.path)
+        store = BhavcopyStore(self.directory)
+        self.assertEqual(store.history('NEWCO', columns=['close'])['close'].tolist(), [10, 11, 12, 13, 15])
+
+
+FNO_HEADER = ['INSTRUMENT', 'SYMBOL', 'EXPIRY_DT', 'STRIKE_PR', 'OPTION_TYP', 'CLOSE', 'OPEN_INT']
+
+
+def fno_rows(day):
+    rows = [['FUTIDX', 'NIFTY', '30-Jan-2025', '0', 'XX', 23000 + day, 100],
+            ['OPTSTK', 'INFY', '30-Jan-2025', '1900', 'CE', 10 + day, 5]]
+    for expiry in ('30-Jan-2025', '27-Feb-2025'):
+        for strike in (23200, 22800, 23000):
+            for option_type in ('PE', 'CE'):
+                rows.append(['OPTIDX', 'NIFTY', expiry, strike, option_type, strike / 100 + day, day])
+    return [FNO_HEADER] + [[str(value) for value in row] for row in rows]
+
+
+class TestFnoBhavcopyStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = FnoBhavcopyStore(self.directory)
+        for day in (23, 24, 27):
+            self.store.ingest(dt.date(2025, 1, day), fno_rows(day))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sorted_partitions(self):
+        day = self.store.load('24-01-2025')
+        self.assertEqual(day['expiry'].dtype, np.dtype('datetime64[D]'))
+        keys = list(zip(day['symbol'], day['expiry'], day['instrument'], day['option_type'], day['strike']))
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(keys), 14)
+        groups = np.load(os.path.join(self.store.partition_path(dt.date(2025, 1, 24)), 'groups.npy'))
+        # a future, INFY calls, and NIFTY calls and puts of two expiries
+        self.assertEqual(len(groups), 6)
+        self.assertEqual(groups['stop'][-1], 14)
+        self.assertEqual(groups['start'][1:].tolist(), groups['stop'][:-1].tolist())
+
+    def test_contracts(self):
+        store = self.store
+        calls = store.contracts('NIFTY', '24-01-2025', '27-01-2025', expiry='30-01-2025',
+                                instrument='OPTIDX', option_type='CE', columns=['strike', 'close'])
+        self.assertEqual(sorted(calls), ['close', 'date', 'strike'])
+        self.assertEqual(calls['strike'].tolist(), [22800, 23000, 23200] * 2)
+        self.assertEqual(calls['date'].tolist(), [dt.date(2025, 1, 24)] * 3 + [dt.date(2025, 1, 27)] * 3)
+        self.assertEqual(calls['close'].tolist()[:2], [252, 254])
+
+        # filters after a key column left open are applied on the range of the underlying
+        puts = store.contracts('NIFTY', strike=(22900, 23300), option_type='PE')
+        self.assertEqual(len(puts['date']), 3 * 2 * 2)
+        self.assertEqual(set(store.decode('option_type', puts['option_type'])), {'PE'})
+        futures = store.contracts('NIFTY', instrument='FUTIDX')
+        self.assertEqual(futures['close'].tolist(), [23023, 23024, 23027])
+        self.assertEqual(len(store.contracts('INFY')['date']), 3)
+        self.assertEqual(len(store.contracts('NIFTY', expiry='27-03-2025')['date']), 0)
+        self.assertEqual(len(store.contracts('UNKNOWN')['close']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,17 @@ import sys
 
 # sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from nsetools.utils import cast_intfloat_string_values_to_intfloat
+import io
+import copy
+import random
+from nsetools.utils import (cast_intfloat_string_values_to_intfloat, compile_fields,
+                            CastPlan, cast_with_plan, flush_cast_plans, LiveTable,
+                            _select_rows, _table_options)
+
+try:
+    from rich.console import Console
+except ImportError:
+    Console = None
 
 class TestUtils(unittest.TestCase):
     def test_cast_dict_values(self):
@@ -93,5 +103,256 @@ class TestUtils(unittest.TestCase):
         result = cast_intfloat_string_values_to_intfloat(input_data)
         self.assertEqual(result, expected_data)
 
+    def test_inplace(self):
+        # Test inplace casting mutates and returns the same containers
+        input_data = {'outer': {'val': '123'}, 'numbers': ['456.78', 'abc', 1.2345]}
+        expected_data = cast_intfloat_string_values_to_intfloat(input_data)
+        inner, numbers = input_data['outer'], input_data['numbers']
+        result = cast_intfloat_string_values_to_intfloat(input_data, inplace=True)
+        self.assertIs(result, input_data)
+        self.assertIs(result['outer'], inner)
+        self.assertIs(result['numbers'], numbers)
+        self.assertEqual(result, expected_data)
+
+class TestCompileFields(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            'info': {'symbol': 'INFY'},
+            'priceInfo': {'lastPrice': '1580.555', 'vwap': 1590.123,
+                          'intraDayHighLow': {'min': '1570', 'max': '1600.5'}},
+            'data': [{'symbol': 'TCS'}],
+        }
+
+    def test_projection(self):
+        project = compile_fields(['priceInfo.lastPrice', 'priceInfo.vwap', 'info.symbol'])
+        self.assertEqual(project(self.data), {
+            'priceInfo.lastPrice': 1580.56,
+            'priceInfo.vwap': 1590.12,
+            'info.symbol': 'INFY',
+        })
+
+    def test_nested_and_list_paths(self):
+        project = compile_fields(['priceInfo.intraDayHighLow', 'data.0.symbol'])
+        self.assertEqual(project(self.data), {
+            'priceInfo.intraDayHighLow': {'min': 1570, 'max': 1600.5},
+            'data.0.symbol': 'TCS',
+        })
+
+    def test_missing_paths(self):
+        project = compile_fields(['priceInfo.close', 'data.5.symbol', 'info.symbol.x'])
+        self.assertEqual(set(project(self.data).values()), {None})
+
+    def test_source_untouched(self):
+        compile_fields('priceInfo.lastPrice')(self.data)
+        self.assertEqual(self.data['priceInfo']['lastPrice'], '1580.555')
+
+    def test_compiled_once(self):
+        self.assertIs(compile_fields(['info.symbol']), compile_fields(('info.symbol',)))
+
+class TestCastPlan(unittest.TestCase):
+    def setUp(self):
+        self.payload = {
+            'data': [
+                {'symbol': 'INFY', 'open': '1580', 'pChange': '-1.234', 'ltp': 1580.555,
+                 'volume': 1200, 'meta': {'isFNOSec': True, 'series': ['EQ']}},
+                {'symbol': 'TCS', 'open': '3500', 'pChange': '0.5', 'ltp': 3500.1,
+                 'volume': 900, 'meta': {'isFNOSec': False, 'series': []}},
+            ],
+            'timestamp': '21-Mar-2025 16:00:00',
+            'advances': '32',
+        }
+
+    def assertSameAsGeneric(self, plan, data):
+        self.assertEqual(plan.apply(data), cast_intfloat_string_values_to_intfloat(data))
+
+    def test_learned_plan_matches_generic(self):
+        plan = CastPlan()
+        self.assertSameAsGeneric(plan, self.payload)
+        self.assertSameAsGeneric(plan, self.payload)
+        self.assertEqual((plan.hits, plan.drifts), (1, 0))
+
+    def test_source_untouched(self):
+        plan = CastPlan()
+        before = copy.deepcopy(self.payload)
+        plan.apply(self.payload)
+        plan.apply(self.payload)
+        self.assertEqual(self.payload, before)
+
+    def test_drift_falls_back_to_generic(self):
+        plan = CastPlan()
+        plan.apply(self.payload)
+        drifts = [
+            ('open', '-'),              # numeric string turns into text
+            ('ltp', '1580.5'),          # float turns into a string
+            ('volume', '1200'),         # int turns into a string
+            ('newKey', '12'),           # key never seen
+            ('meta', 'x'),              # container turns into a scalar
+        ]
+        for key, value in drifts:
+            with self.subTest(key=key):
+                payload = copy.deepcopy(self.payload)
+                payload['data'][0][key] = value
+                self.assertSameAsGeneric(plan, payload)
+        self.assertEqual(plan.drifts, len(drifts))
+        # the plan is widened, so the drifted shapes fit from now on
+        for key, value in drifts:
+            payload = copy.deepcopy(self.payload)
+            payload['data'][0][key] = value
+            self.assertSameAsGeneric(plan, payload)
+        self.assertEqual(plan.drifts, len(drifts))
+
+    def test_text_turning_numeric(self):
+        plan = CastPlan()
+        plan.apply(self.payload)
+        payload = copy.deepcopy(self.payload)
+        payload['data'][0]['symbol'] = '500325'
+        self.assertSameAsGeneric(plan, payload)
+
+    def test_special_floats_in_text_field(self):
+        plan = CastPlan()
+        plan.apply({'a': 'INFY'})
+        for value in ('NaN', 'nan', ' -Infinity ', 'inf', '+INF', 'infx'):
+            with self.subTest(value=value):
+                casted = plan.apply({'a': value})['a']
+                expected = cast_intfloat_string_values_to_intfloat({'a': value})['a']
+                self.assertEqual(repr(casted), repr(expected))
+
+    def test_int_string_in_float_field(self):
+        plan = CastPlan()
+        plan.apply({'a': '1.5'})
+        for value in ('2', '-3', '2.50', '1e3'):
+            with self.subTest(value=value):
+                self.assertSameAsGeneric(plan, {'a': value})
+        self.assertIs(type(plan.apply({'a': '2'})['a']), int)
+        self.assertEqual(plan.drifts, 0)
+
+    def test_inplace(self):
+        plan = CastPlan()
+        expected = cast_intfloat_string_values_to_intfloat(self.payload)
+        for _ in range(2):
+            payload = copy.deepcopy(self.payload)
+            rows = payload['data']
+            casted = plan.apply(payload, inplace=True)
+            self.assertIs(casted, payload)
+            self.assertIs(casted['data'], rows)
+            self.assertEqual(casted, expected)
+        self.assertEqual((plan.hits, plan.drifts), (1, 0))
+
+    def test_inplace_drift(self):
+        # a drift found half way through the payload leaves it partly cast, which
+        # the generic fallback has to cast to the same result
+        plan = CastPlan()
+        plan.apply(copy.deepcopy(self.payload), inplace=True)
+        payload = copy.deepcopy(self.payload)
+        payload['data'][1]['open'] = '-'
+        expected = cast_intfloat_string_values_to_intfloat(payload)
+        self.assertEqual(plan.apply(payload, inplace=True), expected)
+        self.assertEqual(plan.drifts, 1)
+
+    def test_inplace_drift_keeps_plan(self):
+        plan = CastPlan()
+        plan.apply({'a': '1', 'b': 'x', 'c': '2.5'}, inplace=True)
+        self.assertEqual(plan.apply({'a': '1', 'b': 'x', 'c': '2.5', 'd': '3'}, inplace=True),
+                         {'a': 1, 'b': 'x', 'c': 2.5, 'd': 3})
+        self.assertEqual(plan.root, {'a': 'int', 'b': 'text', 'c': 'float', 'd': 'int'})
+        self.assertEqual(plan.apply({'a': '4', 'b': 'y', 'c': '5.25', 'd': '6'}, inplace=True),
+                         {'a': 4, 'b': 'y', 'c': 5.25, 'd': 6})
+        self.assertEqual((plan.hits, plan.drifts), (1, 1))
+
+    def test_list_items_seen_late(self):
+        plan = CastPlan()
+        plan.apply(self.payload)
+        payload = copy.deepcopy(self.payload)
+        payload['data'][1]['meta']['series'] = ['BE', '1']
+        self.assertSameAsGeneric(plan, payload)
+
+    def test_cast_with_plan(self):
+        flush_cast_plans()
+        for _ in range(3):
+            self.assertEqual(cast_with_plan(self.payload, 'test'),
+                             cast_intfloat_string_values_to_intfloat(self.payload))
+        self.assertEqual(cast_with_plan('12', 'test'), '12')
+        flush_cast_plans()
+
+class TestTableRows(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.data = [{'symbol': 'S%d' % i, 'pChange': rng.choice([-1, 0, 0.5, 2, '3']),
+                      'series': rng.choice(['EQ', 'BE'])} for i in range(200)]
+
+    def select(self, **options):
+        options.setdefault('direction', 'desc')
+        normalized = _table_options(options.get('filter'), options.get('ignore'), options.get('sort'),
+                                    options['direction'], options.get('query'),
+                                    options.get('limit'), options.get('offset', 0))
+        filter, ignore, sort, query = normalized
+        return _select_rows(self.data, filter, ignore, sort, options['direction'], query,
+                            options.get('limit'), options.get('offset', 0))
+
+    def test_limit_offset_match_full_sort(self):
+        for direction in ('asc', 'desc'):
+            _, everything = self.select(sort='PCHANGE', direction=direction)
+            expected = sorted(self.data, key=lambda x: float(x['pChange']),
+                              reverse=(direction == 'desc'))
+            self.assertEqual(everything, expected)
+            for offset, limit in ((0, 10), (25, 10), (195, 10), (0, 0)):
+                _, rows = self.select(sort='pChange', direction=direction, limit=limit, offset=offset)
+                self.assertEqual(rows, expected[offset:offset + limit])
+
+    def test_string_sort_and_paging_without_sort(self):
+        columns, rows = self.select(sort='series', direction='asc', limit=5)
+        self.assertEqual(columns, ['symbol', 'pChange', 'series'])
+        self.assertEqual([row['series'] for row in rows], ['BE'] * 5)
+        _, rows = self.select(limit=3, offset=10)
+        self.assertEqual(rows, self.data[10:13])
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            self.select(limit=-1)
+        with self.assertRaises(ValueError):
+            self.select(sort='missing')
+
+    @unittest.skipIf(Console is None, "rich not installed")
+    def test_live_table(self):
+        console = Console(file=io.StringIO(), width=120)
+        with LiveTable(sort='pChange', limit=5, console=console) as table:
+            self.assertEqual(table.update(self.data), 15)
+            self.assertEqual(table.update(copy.deepcopy(self.data)), 0)
+            data = copy.deepcopy(self.data)
+            _, top = self.select(sort='pChange', limit=5)
+            next(row for row in data if row['symbol'] == top[-1]['symbol'])['series'] = 'XX'
+            self.assertEqual(table.update(data), 1)
+            self.assertEqual(table.update([]), 0)
+        self.assertIn('No data to display!', console.file.getvalue())
+
+    @unittest.skipIf(Console is None, "rich not installed")
+    def test_live_table_duplicate_keys(self):
+        console = Console(file=io.StringIO(), width=120)
+        data = [{'symbol': 'INFY', 'series': 'EQ', 'ltp': 1580},
+                {'symbol': 'INFY', 'series': 'BE', 'ltp': 1570}]
+        with LiveTable(console=console) as table:
+            self.assertEqual(table.update(data), 6)
+            self.assertEqual(table.update(copy.deepcopy(data)), 0)
+            data[1]['ltp'] = 1575
+            self.assertEqual(table.update(data), 1)
+            self.assertEqual(table._cells[('INFY', 0), 'ltp'][0], 1580)
+            self.assertEqual(table._cells[('INFY', 1), 'ltp'][0], 1575)
+
+    @unittest.skipIf(Console is None, "rich not installed")
+    def test_live_table_refresh_rate(self):
+        console = Console(file=io.StringIO(), width=120)
+        table = LiveTable(console=console, refresh_per_second=0.001)
+        refreshes = []
+        update = table._live.update
+        table._live.update = lambda renderable, refresh=False: (refreshes.append(refresh),
+                                                                update(renderable, refresh=refresh))
+        with table:
+            for ltp in (1580, 1581, 1582):
+                table.update([{'symbol': 'INFY', 'ltp': ltp}])
+        # the first update is drawn, the next ones wait for the rate and are drawn on stop
+        self.assertEqual(refreshes, [True, False, False])
+        self.assertIn('1582', console.file.getvalue())
+
+
 if __name__ == '__main__':
     unittest.main()